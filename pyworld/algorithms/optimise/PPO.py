@@ -51,20 +51,21 @@ class PPO(Optimiser):
 
         self.gamma = gamma
         self.eps_clip = eps_clip
-        self.cma = du.CMA('loss', 'policy_loss', 'value_loss', 'entropy_loss', 'reward')
+        self.cma = du.accumulate.CMA('loss', 'policy_loss', 'value_loss', 'entropy_loss', 'reward')
         
+        self.logits = logits
         if logits: 
             self.__categorical = lambda p: Categorical(logits = p)
         else:
             self.__categorical = lambda p: Categorical(probs = p)
         
     def step(self, episode):
-        states, actions, rewards = episode
+        states, actions, rewards, *dones = episode # dones are given for concatenated episodes
         rewards = rewards.astype(np.float32)
         
         total_reward = rewards.sum()
     
-        returns = gu.returns(rewards)
+        returns = gu.discount.returns(rewards, *dones, gamma=self.gamma)
         #states = gu.transformation.stack(states, frames=3, step=1)
         
         states, actions, returns = du.shuffle(states, actions, returns) #shuffle the data... sigh...
@@ -139,8 +140,10 @@ class PPO(Optimiser):
         return action_logprobs, torch.squeeze(state_value), dist_entropy
 
     def policy(self, action_space):
-        actor = lambda state: tu.to_numpy(self.__categorical(self.actor(torch.as_tensor(state[np.newaxis], device=self.model.device).detach())).probs.squeeze())
-        return gu.policy.probabilistic_policy(action_space, actor)
+        def actor(states): # actions are sampled on the device (see gu.policy.categorical)
+            with torch.no_grad():
+                return self.actor(torch.as_tensor(states, device=self.model.device))
+        return gu.policy.probabilistic_policy(action_space, actor, logits=self.logits)
 
         
 if __name__ == "__main__":
@@ -34,20 +34,21 @@ class TDO(Optimiser):
 
         self.gamma = gamma
 
-        self.cma = du.CMA('loss')
+        self.cma = du.accumulate.CMA('loss')
         
+        self.logits = logits
         if logits: 
             self.__categorical = lambda p: Categorical(logits = p)
         else:
             self.__categorical = lambda p: Categorical(probs = p)
         
     def step(self, episode):
-        states, actions, rewards = episode
+        states, actions, rewards, *dones = episode # dones are given for concatenated episodes
         rewards = rewards.astype(np.float32)
         
         total_reward = rewards.sum()
     
-        returns = gu.returns(rewards)
+        returns = gu.discount.returns(rewards, *dones, gamma=self.gamma)
         #states = gu.transformation.stack(states, frames=3, step=1)
         
         states, actions, returns = du.shuffle(states, actions, returns) #shuffle the data... sigh...
@@ -92,6 +93,8 @@ class TDO(Optimiser):
         
         return action_logprobs, torch.squeeze(state_value), dist_entropy
 
-    def policy(self, env):
-        action_probs = lambda state: tu.to_numpy(self.__categorical(self.actor(torch.FloatTensor(state[np.newaxis]))).probs.squeeze())
-        return gu.policy.probabilistic_policy(env, action_probs)
+    def policy(self, action_space):
+        def actor(states): # action probabilities (or logits) of the model, sampled on the device (see gu.policy.categorical)
+            with torch.no_grad():
+                return self.model(torch.as_tensor(states, device=self.model.device))
+        return gu.policy.probabilistic_policy(action_space, actor, logits=self.logits)
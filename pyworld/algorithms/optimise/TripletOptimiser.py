@@ -172,6 +172,8 @@ class SASTripletOptimiser(TripletOptimiser):
             self.action_space = torch.as_tensor(np.identity(action_shape, dtype=np.float32), device=self.device)
         
         def forward(self, s1, a, s2, **kwargs):
+            if not a.dtype.is_floating_point: # action indices are expanded to 1-hot format
+                a = self.action_space[a.reshape(-1).long().to(self.action_space.device)]
             assert len(a.shape) > 1 and a.shape[1] > 1 # actions should be in 1-hot format
   
             # | x1 | x2 | a |.is used by the optimiser!
@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+import torch
+import torch.nn as nn
+import gym
+
+from pyworld.algorithms.optimise.TDOptimiser import TDO
+
+class Model(nn.Module):
+
+    def __init__(self, n):
+        super(Model, self).__init__()
+        self.linear = nn.Linear(4, n)
+        self.device = 'cpu'
+
+    def forward(self, x):
+        return self.linear(x)
+
+class TestTDO(unittest.TestCase):
+
+    def test_policy(self):
+        action_space = gym.spaces.Discrete(3)
+        policy = TDO(Model(3), logits=True).policy(action_space)
+        states = np.random.uniform(size=(8,4)).astype(np.float32)
+        self.assertTrue(action_space.contains(int(policy(states[0]))))
+        actions = policy.sample_batch(states)
+        self.assertEqual(actions.shape, (8,))
+        self.assertTrue(np.all((actions >= 0) & (actions < 3)))
+
+if __name__ == "__main__":
+    unittest.main()
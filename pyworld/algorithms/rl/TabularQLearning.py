@@ -21,27 +21,31 @@ class TabularQLearning:
         self.action_space = action_space
         self.gamma = gamma
         self.alpha = alpha
-        self.boltzman_dist = policy.value.boltzmann(temp)
+        self.temp = temp
     
     def update(self, s, a, r, sn):
         q = self.values[s][a]
         mq = self.values[sn][self.greedy_action(sn)] #max action or random by default
         self.values[s][a] = (1-self.alpha) * q + self.alpha * (r + self.gamma * mq)
 
-    def action_probs(self, state):
-        action_values = np.array([[k,v] for k,v in self.values[state].items()])
-
-        if action_values.shape[0] == 0:
-            return np.full(self.action_space.n, 1./self.action_space.n), np.zeros(self.action_space.n) #default uniform when we got no values yet!
+    def action_values(self, states):
+        values = np.zeros((len(states), self.action_space.n)) #default Q(s,a) = 0
+        for i, state in enumerate(states):
+            action_values = self.values[state]
+            if action_values: #update the actions we have values for
+                values[i, list(action_values.keys())] = list(action_values.values())
+        return values
 
-        values = np.zeros(self.action_space.n)      #default Q(s,a) = 0
-        values[action_values[:,0].astype(np.int8)] = action_values[:,1] #update the actions we have values for
-        probs = self.boltzman_dist(values)           #get action probabilities
-        return probs, values
+    def action_probs(self, state):
+        values = self.action_values((state,))[0]
+        return policy.softmax(values, self.temp), values #default uniform when we got no values yet!
         
     def policy(self, state):
-        probs, _ = self.action_probs(state)
-        return np.random.choice(np.arange(self.action_space.n), p=probs)
+        return self.policy_batch((state,))[0]
+
+    def policy_batch(self, states):
+        """ Sample an action (boltzmann) for each state in a batch with a single call to the sampler. """
+        return policy.categorical(policy.softmax(self.action_values(states), self.temp))
     
     def state_value(self, state):
         probs, values = self.action_probs(state)
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Created on 17-10-2026 16:20:12
+
+    Rollout throughput benchmarks (steps/sec and allocations per step) over pyworld environments, iterator
+    modes and wrapper stacks. Results are JSON so that runs can be compared:
+
+        python -m pyworld.benchmark -o after.json --compare before.json
+"""
+__author__ = "Benedict Wilkins"
+__email__ = "benrjw@gmail.com"
+__status__ = "Development"
+
+from . import envs
+from . import rollout
+
+from .rollout import Case, cases, run, run_all, compare
+
+__all__ = ('envs', 'rollout', 'Case', 'cases', 'run', 'run_all', 'compare')
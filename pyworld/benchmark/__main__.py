@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run the rollout benchmarks and write the results as JSON.
+
+    python -m pyworld.benchmark -o results.json [--compare baseline.json] [--env AtariLike] [--mode sars]
+
+Created on 2026-10-17 16:20:12
+
+author: Benedict Wilkins
+"""
+import sys
+import json
+import argparse
+
+from . import rollout
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pyworld.benchmark", description="Rollout throughput benchmarks.")
+    parser.add_argument('-o', '--output', default=None, help="JSON file to write the results to (default: stdout).")
+    parser.add_argument('--compare', default=None, help="JSON file of a previous run, regressions are reported (exit status 1).")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="relative drop in steps/sec that is a regression.")
+    parser.add_argument('--env', nargs='*', default=None, choices=list(rollout.ENVS.keys()))
+    parser.add_argument('--stack', nargs='*', default=None, choices=list(rollout.STACKS.keys()))
+    parser.add_argument('--mode', nargs='*', default=None, choices=list(rollout.MODES.keys()))
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-allocations', action='store_true', help="do not measure allocations per step.")
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        if 'error' in result:
+            print("{env}/{stack}/{mode}: {error}".format(**result), file=sys.stderr)
+        else:
+            print("{env}/{stack}/{mode}: {steps_per_sec:.1f} steps/sec".format(**result), file=sys.stderr)
+
+    cases = rollout.cases(envs=args.env, stacks=args.stack, modes=args.mode)
+    results = rollout.run_all(cases, steps=args.steps, repeat=args.repeat, allocations=not args.no_allocations, progress=progress)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        comparison = rollout.compare(baseline, results, tolerance=args.tolerance)
+        for c in comparison:
+            print("{env}/{stack}/{mode}: {before:.1f} -> {after:.1f} ({ratio:.2f}x){0}".format(" REGRESSION" if c['regression'] else "", **c), file=sys.stderr)
+        return int(any(c['regression'] for c in comparison))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Environments used by the benchmarks.
+
+Created on 2026-10-17 16:20:12
+
+author: Benedict Wilkins
+"""
+import gym
+import numpy as np
+
+class AtariLike(gym.Env):
+
+    '''
+        A stand-in for an Atari environment (no emulator), observations are (210,160,3) uint8 frames taken in
+        turn from a small pool of random frames. The cost of a step is (almost) only the cost of the
+        wrappers/iterators that consume it.
+    '''
+
+    def __init__(self, length=1000, actions=6, pool=16, seed=0):
+        rng = np.random.RandomState(seed)
+        self.frames = rng.randint(0, 256, size=(pool, 210, 160, 3)).astype(np.uint8)
+        self.length = length
+        self.observation_space = gym.spaces.Box(np.uint8(0), np.uint8(255), shape=(210, 160, 3), dtype=np.uint8)
+        self.action_space = gym.spaces.Discrete(actions)
+        self.t = 0
+
+    def step(self, action):
+        self.t += 1
+        return self.frames[self.t % len(self.frames)], 0., self.t >= self.length, None
+
+    def reset(self):
+        self.t = 0
+        return self.frames[0]
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rollout throughput benchmarks. A case is an environment, a wrapper stack and a GymIterator mode, each case is
+run for a fixed number of steps (best of repeat runs) and then once more under tracemalloc to measure the
+memory allocated per step.
+
+Example:
+    results = run_all(cases(envs=['AtariLike'], modes=['sars']), steps=2000)
+    json.dump(results, open('baseline.json', 'w'))
+    regressions = compare(json.load(open('baseline.json')), results, tolerance=0.1)
+
+Created on 2026-10-17 16:20:12
+
+author: Benedict Wilkins
+"""
+import gc
+import sys
+import time
+import platform
+import itertools
+import tracemalloc
+
+import gym
+import numpy as np
+
+import pyworld.environment # registers the pyworld environments
+from pyworld.environment.counter.counter import Counter
+from pyworld.environment.catmouse.catmouse import CatMouse
+from pyworld.toolkit.tools import gymutils as gu
+
+from .envs import AtariLike
+
+ENVS = {'Counter': Counter,
+        'ObjectMover-v0': lambda: gym.make('ObjectMover-v0'),
+        'ObjectMover-v1': lambda: gym.make('ObjectMover-v1'),
+        'ObjectMover-v2': lambda: gym.make('ObjectMover-v2'),
+        'ObjectMover-v3': lambda: gym.make('ObjectMover-v3'),
+        'CatMouse': CatMouse,
+        'AtariLike': AtariLike}
+
+W = gu.wrappers
+
+# wrapper stacks of an Atari (210,160,3) uint8 environment
+STACKS = {'none': lambda env: env,
+          'Float': lambda env: W.Float(env),
+          'CHW': lambda env: W.CHW(env),
+          'Float-CHW-Stack': lambda env: W.Stack(W.CHW(W.Float(env)), lazy=True),
+          'Atari': lambda env: W.Atari(env),
+          'Atari-integer': lambda env: W.Atari(env, integer=True),
+          'Atari-Stack': lambda env: W.Stack(W.Atari(env), lazy=True),
+          'make': lambda env: gu.preprocess(env, binary=0.5, stack=3),
+          'make-integer': lambda env: gu.preprocess(env, stack=3, integer=True)}
+
+MODES = {'s': gu.mode.s, 'sars': gu.mode.sars}
+
+ATARI = ('AtariLike',) # environments that the wrapper stacks apply to
+
+class Case:
+
+    '''
+        A benchmark case: an environment, a wrapper stack and an iterator mode (keys of ENVS, STACKS and MODES).
+    '''
+
+    def __init__(self, env, stack='none', mode='s'):
+        self.env = env
+        self.stack = stack
+        self.mode = mode
+
+    @property
+    def name(self):
+        return "{0}/{1}/{2}".format(self.env, self.stack, self.mode)
+
+    def make(self):
+        env = STACKS[self.stack](ENVS[self.env]())
+        if isinstance(env.action_space, gym.spaces.Discrete):
+            policy = gu.policy.uniform(env.action_space)
+        else:
+            policy = lambda _: env.action_space.sample()
+        return env, policy
+
+    def __str__(self):
+        return "Case({0})".format(self.name)
+
+    def __repr__(self):
+        return str(self)
+
+def cases(envs=None, stacks=None, modes=None):
+    """ All benchmark cases, wrapper stacks (other than 'none') are only applied to Atari-like environments.
+
+    Args:
+        envs (list, optional): environment names. Defaults to None (all of ENVS).
+        stacks (list, optional): wrapper stack names. Defaults to None (all of STACKS).
+        modes (list, optional): mode names. Defaults to None (all of MODES).
+
+    Returns:
+        list: cases
+    """
+    envs = list(ENVS.keys()) if envs is None else envs
+    stacks = list(STACKS.keys()) if stacks is None else stacks
+    modes = list(MODES.keys()) if modes is None else modes
+    result = []
+    for env, stack, mode in itertools.product(envs, stacks, modes):
+        if stack == 'none' or env in ATARI:
+            result.append(Case(env, stack, mode))
+    return result
+
+def _steps(env, policy, mode):
+    ''' Iterate over observations indefinitely (episode after episode). '''
+    iterator = gu.iterators.GymIterator(env, policy, mode)
+    while True:
+        yield from iterator
+
+def _time(case, steps):
+    env, policy = case.make()
+    observations = _steps(env, policy, MODES[case.mode])
+    for _ in itertools.islice(observations, 0, min(steps, 100)): # warm up
+        pass
+    gc.collect()
+    start = time.perf_counter()
+    for _ in itertools.islice(observations, 0, steps):
+        pass
+    return steps / (time.perf_counter() - start)
+
+def _allocations(case, steps):
+    env, policy = case.make()
+    observations = _steps(env, policy, MODES[case.mode])
+    for _ in itertools.islice(observations, 0, min(steps, 100)):
+        pass
+    gc.collect()
+    tracemalloc.start()
+    try:
+        nbytes, blocks = 0, sys.getallocatedblocks()
+        for _ in range(steps):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            next(observations)
+            nbytes += tracemalloc.get_traced_memory()[1] - current # peak memory allocated during the step
+        blocks = sys.getallocatedblocks() - blocks
+    finally:
+        tracemalloc.stop()
+    return nbytes / steps, blocks / steps
+
+def run(case, steps=2000, repeat=3, allocations=True):
+    """ Run a benchmark case.
+
+    Args:
+        case (Case): to run.
+        steps (int, optional): number of steps of each run. Defaults to 2000.
+        repeat (int, optional): number of timed runs, the fastest is reported. Defaults to 3.
+        allocations (bool, optional): measure allocations per step (an extra, slower run). Defaults to True.
+
+    Returns:
+        dict: env, stack, mode, steps, steps_per_sec, alloc_bytes_per_step (peak memory allocated during a step),
+              blocks_per_step (net number of memory blocks still allocated per step)
+    """
+    result = dict(env=case.env, stack=case.stack, mode=case.mode, steps=steps)
+    result['steps_per_sec'] = max([_time(case, steps) for _ in range(repeat)])
+    if allocations:
+        result['alloc_bytes_per_step'], result['blocks_per_step'] = _allocations(case, min(steps, 1000))
+    return result
+
+def meta():
+    ''' Description of the machine and package versions. '''
+    return dict(time=time.strftime("%Y-%m-%d %H:%M:%S"), python=platform.python_version(), platform=platform.platform(),
+                processor=platform.processor(), numpy=np.__version__, gym=gym.__version__)
+
+def run_all(cases, steps=2000, repeat=3, allocations=True, progress=None):
+    """ Run benchmark cases.
+
+    Args:
+        cases (list): cases to run (see ``cases``).
+        progress (callable, optional): called with each result. Defaults to None.
+
+    Returns:
+        dict: {'meta':..., 'results':[...]} (JSON serialisable), a case that fails (e.g. a missing resource) is given with its error.
+    """
+    results = []
+    for case in cases:
+        try:
+            results.append(run(case, steps=steps, repeat=repeat, allocations=allocations))
+        except Exception as e:
+            results.append(dict(env=case.env, stack=case.stack, mode=case.mode, steps=steps, error=repr(e)))
+        if progress is not None:
+            progress(results[-1])
+    return dict(meta=meta(), results=results)
+
+def _key(result):
+    return (result['env'], result['stack'], result['mode'])
+
+def compare(baseline, results, tolerance=0.1):
+    """ Compare two benchmark runs (as given by ``run_all``).
+
+    Args:
+        baseline (dict): previous run.
+        results (dict): new run.
+        tolerance (float, optional): relative drop in steps/sec that is a regression. Defaults to 0.1.
+
+    Returns:
+        list: a dict for each case in both runs with the baseline and new steps/sec, their ratio and whether it is a regression.
+    """
+    baseline = {_key(r):r for r in baseline['results']}
+    comparison = []
+    for result in results['results']:
+        if _key(result) not in baseline or 'error' in result or 'error' in baseline[_key(result)]:
+            continue
+        before, after = baseline[_key(result)]['steps_per_sec'], result['steps_per_sec']
+        ratio = after / before
+        comparison.append(dict(env=result['env'], stack=result['stack'], mode=result['mode'],
+                               before=before, after=after, ratio=ratio, regression=ratio < 1. - tolerance))
+    return comparison
@@ -0,0 +1,28 @@
+import unittest
+import json
+
+import pyworld.benchmark as benchmark
+
+class TestRollout(unittest.TestCase):
+
+    def test_cases(self):
+        cases = benchmark.cases(envs=['Counter', 'AtariLike'], stacks=['none', 'Atari'], modes=['s'])
+        self.assertEqual([c.name for c in cases], ['Counter/none/s', 'AtariLike/none/s', 'AtariLike/Atari/s'])
+
+    def test_run(self):
+        results = benchmark.run_all(benchmark.cases(envs=['Counter'], modes=['sars']), steps=50, repeat=1)
+        results = json.loads(json.dumps(results))
+        result, = results['results']
+        self.assertEqual((result['env'], result['stack'], result['mode']), ('Counter', 'none', 'sars'))
+        self.assertGreater(result['steps_per_sec'], 0)
+        self.assertIn('alloc_bytes_per_step', result)
+
+    def test_compare(self):
+        before = {'results':[dict(env='Counter', stack='none', mode='s', steps_per_sec=100.)]}
+        after = {'results':[dict(env='Counter', stack='none', mode='s', steps_per_sec=80.)]}
+        comparison, = benchmark.compare(before, after, tolerance=0.1)
+        self.assertTrue(comparison['regression'])
+        self.assertAlmostEqual(comparison['ratio'], 0.8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,10 +32,14 @@ class Object:
     
 class CatMouse(gym.Env):
     
-    
+    '''
+        The frame is rendered incrementally, each step the previous rectangles of the cat and mouse are erased and
+        they are drawn at their new positions. Observations are copies of the frame unless copy_obs is False, the
+        frame is then given directly and is modified by the next step (or reset).
+    '''
         
-    def __init__(self, cat_img=None, mouse_img=None, cat_speed = 1.0, mouse_speed = 1.0, height = 84, width = 84):
-        if cat_img == None:
+    def __init__(self, cat_img=None, mouse_img=None, cat_speed = 1.0, mouse_speed = 1.0, height = 84, width = 84, copy_obs = True):
+        if cat_img is None:
             cat_img = vu.images.character("c")
         if mouse_img is None:
             mouse_img = vu.images.character("m")
@@ -48,6 +52,8 @@ class CatMouse(gym.Env):
         self.__initial_objects  = copy.deepcopy(self.objects)
         
         self.state = np.copy(self.__empty_state)
+        self.copy_obs = copy_obs
+        self.__rects = [] # (y,x,h,w) of the objects in the frame
         self.__update_state()
 
         self.base_vel = 2.
@@ -70,13 +76,19 @@ class CatMouse(gym.Env):
         self.action_space = gym.spaces.Box(low=0, high=2*np.pi, shape=(2,))
         
     def __update_state(self):
-        self.state = np.copy(self.__empty_state)
+        for y, x, h, w in self.__rects: # erase all objects before drawing any (they may overlap)
+            self.state[:, y:y+h, x:x+w] = self.__empty_state[:, y:y+h, x:x+w]
+        self.__rects = []
         for obj in self.objects.values():
             obj.pos[0] = np.clip(obj.pos[0], 0, self.state.shape[2] - obj.img.shape[2])
             obj.pos[1] = np.clip(obj.pos[1], 0, self.state.shape[1] - obj.img.shape[1])
             x = int(obj.pos[0])
             y = int(obj.pos[1])
             self.state[:, y:y+obj.img.shape[1], x:x+obj.img.shape[2]] = obj.img
+            self.__rects.append((y, x, obj.img.shape[1], obj.img.shape[2]))
+    
+    def __observation(self):
+        return self.state.copy() if self.copy_obs else self.state
     
     def __random_pos(self, img, state):
         return np.array([np.random.randint(low=0, high=state.shape[1]-img.shape[1]),
@@ -87,14 +99,14 @@ class CatMouse(gym.Env):
         self.cat.update(np.array([np.cos(action[0]), np.sin(action[0])]))
         self.mouse.update(np.array([np.cos(action[1]), np.sin(action[1])]))
         self.__update_state()
-        return self.state, 0, False, None
+        return self.__observation(), 0, False, None
         
     def reset(self):
         self.cat = copy.deepcopy(self.__initial_objects['cat'])
         self.mouse = copy.deepcopy(self.__initial_objects['mouse'])
         self.objects = {'cat':self.cat, 'mouse':self.mouse}
         self.__update_state()
-        return self.state
+        return self.__observation()
         
     
 def chase_policy(env):
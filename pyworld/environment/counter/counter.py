@@ -6,6 +6,7 @@ Created on Mon Sep 30 16:24:29 2019
 @author: ben
 """
 import gym
+import numpy as np
 
 class Counter(gym.Env):
     
@@ -21,7 +22,16 @@ class Counter(gym.Env):
         
     def reset(self):
         self.i = 0
-        return self.i
+        return np.array([self.i])
+
+    def clone_full_state(self):
+        return np.array([self.i])
+
+    def restore_full_state(self, state):
+        self.i = int(state[0])
+
+    def _get_obs(self):
+        return np.array([self.i])
         
     def render(self):
         print("[{0}]".format(self.i))
@@ -31,8 +31,11 @@ class ObjectMover(gym.Env):
     
     '''
         ObjectMover is an environment in which a single object can be moved around in the cardinal directions.
+        The frame is rendered incrementally, each step the previous rectangle of the object is erased and the 
+        object is drawn at its new position. Observations are copies of the frame unless copy_obs is False, 
+        the frame is then given directly and is modified by the next step (or reset).
     '''
-    def __init__(self, shape, obj, base_vel=1.0, cinvert=False, mode=mode_image, noop=False):
+    def __init__(self, shape, obj, base_vel=1.0, cinvert=False, mode=mode_image, noop=False, copy_obs=True):
         super(ObjectMover, self).__init__()
         assert len(shape) == 3
         assert shape[0] == 1 or shape[0] == 3
@@ -41,6 +44,8 @@ class ObjectMover(gym.Env):
         self.__empty_state[:,1:-1,1:-1] = int(cinvert)
         
         self.state = np.copy(self.__empty_state)
+        self.copy_obs = copy_obs
+        self.__rect = None # (y,x) of the object in the frame
 
         self.obj = obj
         self.__obj_init = copy.deepcopy(obj)
@@ -99,23 +104,27 @@ class ObjectMover(gym.Env):
         return x == minx or y == miny or x == maxx or y == maxy
     
     def mode_image(self):
-        return self.state
+        return self.state.copy() if self.copy_obs else self.state
     
     def mode_position(self):
         return self.__real_position(self.obj.pos)
     
     def mode_image_position(self):
         real_position = self.__real_position(self.obj.pos)
-        return self.state, real_position
+        return self.mode_image(), real_position
     
     def __place(self):
-        self.state = np.copy(self.__empty_state)
+        _, h, w = self.obj.img.shape
         x = int(self.obj.pos[0])
         y = int(self.obj.pos[1])
-        x = np.clip(x, 0, self.state.shape[2] - self.obj.img.shape[2])
-        y = np.clip(y, 0, self.state.shape[1] - self.obj.img.shape[1])
+        x = np.clip(x, 0, self.state.shape[2] - w)
+        y = np.clip(y, 0, self.state.shape[1] - h)
+        if self.__rect is not None: # erase the object
+            py, px = self.__rect
+            self.state[:, py:py+h, px:px+w] = self.__empty_state[:, py:py+h, px:px+w]
         #(C,H,W)
-        self.state[:, y:y+self.obj.img.shape[1], x:x+self.obj.img.shape[2]] = self.obj.img
+        self.state[:, y:y+h, x:x+w] = self.obj.img
+        self.__rect = (y, x)
     
     def __real_position(self, position):
         return (position + np.array(self.obj.img.shape[1:3])/2.) / np.array(self.state.shape[1:3])
@@ -124,6 +133,20 @@ class ObjectMover(gym.Env):
         self.obj = copy.deepcopy(self.__obj_init)
         self.__place()
         return self.mode()
+
+    def clone_full_state(self):
+        '''
+            The state of the environment (position and velocity of the object) as an array, see restore_full_state.
+        '''
+        return np.concatenate([self.obj.pos, self.obj.vel]).astype(np.float64)
+
+    def restore_full_state(self, state):
+        self.obj.pos = np.array(state[:2], dtype=self.obj.pos.dtype)
+        self.obj.vel = np.array(state[2:], dtype=self.obj.vel.dtype)
+        self.__place()
+
+    def _get_obs(self):
+        return self.mode()
     
     def render(self):
         cv2.imshow('BlockMove-v0', vu.channels_to_cv(self.state))
@@ -149,11 +172,11 @@ def a(shape=(1,64,64), mode=mode_image, noop=False):
     return ObjectMover(shape, Object(obj_image, obj_pos), 2., mode=mode, noop=noop)    
 
 
-def default(*args, **kwargs):
-    return ObjectMover((1,64,64), Object(np.ones((1,12,12)), np.array([26.,26.])), 2., mode=mode_image, noop=False)
+def default(*args, copy_obs=True, **kwargs):
+    return ObjectMover((1,64,64), Object(np.ones((1,12,12)), np.array([26.,26.])), 2., mode=mode_image, noop=False, copy_obs=copy_obs)
 
-def noop(*args, **kwargs):
-    return ObjectMover((1,64,64), Object(np.ones((1,12,12)), np.array([26.,26.])), 2., mode=mode_image, noop=True)
+def noop(*args, copy_obs=True, **kwargs):
+    return ObjectMover((1,64,64), Object(np.ones((1,12,12)), np.array([26.,26.])), 2., mode=mode_image, noop=True, copy_obs=copy_obs)
 
 def stochastic1():
     class vmap:
@@ -168,4 +191,11 @@ def stochastic1():
     env.v_map = vmap()
 
     return env
-        
\ No newline at end of file
+        
+from .batch import BatchObjectMover
+
+def vector(n, noop=False, copy_obs=True):
+    '''
+        N instances of the default ObjectMover (ObjectMover-v0, or ObjectMover-v2 with noop) as one BatchObjectMover.
+    '''
+    return BatchObjectMover(n, (1,64,64), np.ones((1,12,12)), np.array([26.,26.]), 2., mode=mode_image, noop=noop, copy_obs=copy_obs)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A batched ObjectMover, N instances simulated in lockstep with (N,2) arrays of positions and velocities. All N
+frames are rendered into one (N,C,H,W) array, the sprites are placed with a single (vectorised) assignment. With
+copy_obs=False the frames are rendered incrementally in place: the previous rectangles of the sprites are erased
+and the sprites are placed at their new positions, no frames are allocated.
+
+Example:
+    env = objectmover.vector(256)
+    states = env.reset()                                              # (256, 1, 64, 64)
+    states, rewards, dones, infos = env.step(np.random.randint(0, 4, size=256))
+    states[dones] = env.reset(dones)
+
+Created on 2026-10-17 17:02:38
+
+author: Benedict Wilkins
+"""
+import gym
+import numpy as np
+
+from pyworld.toolkit.tools.gymutils import vector as V
+
+from . import mode_image, mode_position, mode_image_position
+
+class BatchObjectMover(V.VectorEnv):
+
+    '''
+        N ObjectMover environments in one, stepped with an action vector (N,). The dynamics and observations are
+        those of ObjectMover (each instance gives the same frames as an ObjectMover given the same actions). Only
+        deterministic velocity maps are supported (not ObjectMover-v3). Each step gives new frames unless copy_obs
+        is False, the same frames are then given and are modified by the next step (or reset).
+    '''
+
+    def __init__(self, n, shape, img, pos, base_vel=1.0, cinvert=False, mode=mode_image, noop=False, copy_obs=True):
+        """
+        Args:
+            n (int): number of instances.
+            shape (tuple): (C,H,W) shape of a frame.
+            img (numpy.ndarray): (C,h,w) sprite of the object.
+            pos (numpy.ndarray): initial (x,y) position of the object.
+            base_vel (float, optional): speed of the object. Defaults to 1.0.
+            cinvert (bool, optional): invert the colour of the background. Defaults to False.
+            mode (int, optional): mode_image, mode_position or mode_image_position. Defaults to mode_image.
+            noop (bool, optional): include a NOOP action. Defaults to False.
+            copy_obs (bool, optional): give new frames each step. Defaults to True.
+        """
+        assert n > 0
+        assert len(shape) == 3
+        assert shape[0] == 1 or shape[0] == 3
+        assert len(img.shape) == 3 and img.shape[0] == shape[0]
+        self._n = n
+        self.shape = tuple(shape)
+        self.img = np.asarray(img, dtype=np.float32)
+
+        self.empty = np.ones(shape, dtype=np.float32) - int(cinvert)
+        self.empty[:,1:-1,1:-1] = int(cinvert)
+        self.copy_obs = copy_obs
+
+        self.pos_init = np.asarray(pos, dtype=np.float64)
+        self.pos = np.tile(self.pos_init, (n, 1))
+        self.vel = np.zeros((n, 2), dtype=np.float64)
+
+        _, h, w = self.img.shape
+        self.max = np.array([shape[2] - w, shape[1] - h]) # maximum (x,y) of the sprite
+        self._index = np.arange(n)
+        # flat offsets (C,h,w) of the sprite pixels from its top left corner, sprites are placed and erased with
+        # flat indices into the (N,C,H,W) frames, faster than a multi-dimensional fancy index
+        C, H, W = shape
+        self._size = C * H * W
+        self._offsets = (np.arange(C)[:,None,None] * H * W + np.arange(h)[None,:,None] * W + np.arange(w)[None,None,:])
+        self._empty = self.empty.reshape(-1)
+
+        self.v_map = np.array([[0.,-base_vel], [base_vel,0.], [0.,base_vel], [-base_vel,0.], [0.,0.]])
+        self.action_labels = {0:'NORTH', 1:'EAST', 2:'SOUTH', 3:'WEST', 4:'NOOP'}
+        self.mode = [self.mode_image, self.mode_position, self.mode_image_position][mode]
+
+        self.action_space = gym.spaces.Discrete(4 + int(noop))
+        self.observation_space = gym.spaces.Box(low=np.float32(0.), high=np.float32(1.), shape=shape, dtype=np.float32)
+        self.corner = self._corner(self._index) # (x,y) of the sprites in the frames
+        self.state = self._new(self._index)
+        self._state = self.state.reshape(-1) # flat view
+
+    @property
+    def n(self):
+        return self._n
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def action_meanings(self):
+        return [self.action_labels[i] for i in range(self.action_space.n)]
+
+    def _corner(self, index):
+        # (x,y) of the top left corner of each sprite, as ObjectMover (truncated then clipped)
+        return np.clip(self.pos[index].astype(np.int64), 0, self.max)
+
+    def _rect(self, index, corner):
+        # flat indices (K,C,h,w) of the sprite pixels in a frame and in the (N,C,H,W) frames
+        rect = (corner[:,1] * self.shape[2] + corner[:,0])[:,None,None,None] + self._offsets
+        return rect, rect + (index * self._size)[:,None,None,None]
+
+    def _new(self, index):
+        ''' New frames of the given instances (rendered from scratch, cheaper than copying the frames). '''
+        self.corner[index] = self._corner(index)
+        states = np.empty((len(index), *self.shape), dtype=np.float32)
+        states[...] = self.empty
+        _, rect = self._rect(np.arange(len(index)), self.corner[index])
+        states.reshape(-1)[rect] = self.img
+        return states
+
+    def _render(self, index):
+        ''' Erase the sprites of the given instances and place them at their current positions (in place). '''
+        rect, frames_rect = self._rect(index, self.corner[index])
+        self._state[frames_rect] = self._empty[rect]
+        self.corner[index] = self._corner(index)
+        _, frames_rect = self._rect(index, self.corner[index])
+        self._state[frames_rect] = self.img
+
+    def _done(self):
+        corner = self.pos.astype(np.int64) # unclipped, as ObjectMover
+        return np.any((corner == 0) | (corner == self.max), axis=1)
+
+    def step(self, actions):
+        """ Step each instance with its action.
+
+        Args:
+            actions (numpy.ndarray): actions (N,)
+
+        Returns:
+            tuple: states (N,C,H,W), rewards (N,), dones (N,), infos (list)
+        """
+        actions = np.asarray(actions)
+        assert actions.shape == (self._n,)
+        self.vel = self.v_map[actions]
+        self.pos += self.vel
+        if self.copy_obs:
+            self.state = self._new(self._index)
+            self._state = self.state.reshape(-1)
+        else:
+            self._render(self._index)
+        return self.mode(), np.zeros(self._n, dtype=np.float32), self._done(), [None] * self._n
+
+    def reset(self, done=None):
+        """ Reset instances.
+
+        Args:
+            done (numpy.ndarray, optional): boolean mask (N,) of the instances to reset. Defaults to None (reset all).
+
+        Returns:
+            numpy.ndarray: initial observations of the K instances that were reset (in order).
+        """
+        index = self._index if done is None else np.flatnonzero(done)
+        self.pos[index] = self.pos_init
+        self.vel[index] = 0.
+        if not self.copy_obs:
+            self._render(index)
+            return self.mode(None if done is None else index)
+        states = self._new(index)
+        if done is None:
+            self.state, self._state = states, states.reshape(-1)
+            return self.mode()
+        # the frames given by the last step are not modified, self.state is rendered again by the next step
+        return self.mode(index, states)
+
+    def mode_image(self, index=None, states=None):
+        if states is not None:
+            return states
+        if index is not None:
+            return self.state[index] # a copy
+        return self.state
+
+    def mode_position(self, index=None, states=None):
+        index = self._index if index is None else index
+        return (self.pos[index] + np.array(self.img.shape[1:3]) / 2.) / np.array(self.shape[1:3])
+
+    def mode_image_position(self, index=None, states=None):
+        return self.mode_image(index, states), self.mode_position(index)
+
+    def close(self):
+        pass
+
+    def __str__(self):
+        return "BatchObjectMover({0}x{1})".format(self._n, self.shape)
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from pyworld.environment import objectmover
+
+class TestBatchObjectMover(unittest.TestCase):
+
+    def test_reset(self):
+        env = objectmover.vector(3)
+        states = env.reset()
+        self.assertEqual(states.shape, (3,1,64,64))
+        self.assertTrue(np.array_equal(states[1], objectmover.default().reset()))
+
+    def test_step(self):
+        n = 4
+        env = objectmover.vector(n, noop=True)
+        envs = [objectmover.noop() for _ in range(n)]
+        env.reset()
+        for e in envs:
+            e.reset()
+        rng = np.random.RandomState(0)
+        for t in range(40):
+            actions = rng.randint(0, 5, size=n)
+            states, rewards, dones, _ = env.step(actions)
+            for i, e in enumerate(envs):
+                state, _, done, _ = e.step(actions[i])
+                self.assertTrue(np.array_equal(states[i], state))
+                self.assertEqual(dones[i], done)
+                if done:
+                    e.reset()
+            if np.any(dones):
+                states = env.reset(dones)
+                self.assertEqual(len(states), np.count_nonzero(dones))
+
+    def test_vector_iterator(self):
+        import pyworld.toolkit.tools.gymutils as gu
+        env = objectmover.vector(8)
+        episode = gu.episode(env, mode=gu.mode.sa)
+        self.assertEqual(episode.state.shape[1:], (1,64,64))
+        self.assertEqual(len(episode.state), len(episode.action))
+
+if __name__ == "__main__":
+    unittest.main()
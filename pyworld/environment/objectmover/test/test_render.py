@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from pyworld.environment import objectmover
+
+def render(env):
+    # the frame of an ObjectMover drawn from scratch
+    state = np.ones((1,64,64), dtype=np.float32)
+    state[:,1:-1,1:-1] = 0.
+    x, y = np.clip(env.obj.pos.astype(np.int64), 0, 64 - 12)
+    state[:, y:y+12, x:x+12] = 1.
+    return state
+
+class TestRender(unittest.TestCase):
+
+    def test_incremental(self):
+        env = objectmover.noop(copy_obs=False)
+        ref = objectmover.noop()
+        state = env.reset()
+        self.assertTrue(np.array_equal(state, ref.reset()))
+        rng = np.random.RandomState(1)
+        for t in range(200):
+            action = rng.randint(0, 5)
+            state, _, done, _ = env.step(action)
+            self.assertIs(state, env.state)
+            self.assertTrue(np.array_equal(state, render(env)))
+            self.assertTrue(np.array_equal(state, ref.step(action)[0]))
+            if done:
+                state = env.reset()
+                self.assertTrue(np.array_equal(state, ref.reset()))
+
+    def test_copy_obs(self):
+        env = objectmover.default()
+        state = env.reset()
+        next_state, *_ = env.step(1)
+        self.assertIsNot(state, next_state)
+        self.assertFalse(np.array_equal(state, next_state))
+
+    def test_batch_copy_obs(self):
+        n = 4
+        env = objectmover.vector(n, copy_obs=False)
+        envs = [objectmover.default() for _ in range(n)]
+        env.reset()
+        for e in envs:
+            e.reset()
+        rng = np.random.RandomState(2)
+        for t in range(100):
+            actions = rng.randint(0, 4, size=n)
+            states, _, dones, _ = env.step(actions)
+            self.assertIs(states, env.state)
+            for i, e in enumerate(envs):
+                self.assertTrue(np.array_equal(states[i], e.step(actions[i])[0]))
+                if dones[i]:
+                    e.reset()
+            env.reset(dones)
+            for i, e in enumerate(envs):
+                self.assertTrue(np.array_equal(env.state[i], e.state))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,7 +17,8 @@ class SANet(nn.Module):
     
     '''
         A convolutional network that takes as input a state of dimension state_shape = (C,H,W) 
-        and a 1-hot representation of a discrete action of dimension action_shape = (N,). 
+        and a 1-hot representation of a discrete action of dimension action_shape = (N,). Actions may 
+        instead be given as integer indices (B,) or (B,1), the one-hot product is then a row lookup.
     '''
     
     def __init__(self, state_shape, action_shape):
@@ -49,7 +50,11 @@ class SANet(nn.Module):
     def forward(self, sa):
         s, a = sa # this is easier with the use of an optimiser (otherwise we gotta mess around with *(x,) everywhere!)
         s, a = s.to(self.device), a.to(self.device)
-        a_ = F.leaky_relu(self.action_layer1(a))
+        if a.dtype.is_floating_point:
+            a_ = self.action_layer1(a)
+        else: # action indices, equivalent to action_layer1(onehot(a))
+            a_ = F.embedding(a.reshape(-1).long(), self.action_layer1.weight.t()) + self.action_layer1.bias
+        a_ = F.leaky_relu(a_)
         a_ = F.leaky_relu(self.action_layer2(a_))
         s_ = F.leaky_relu(self.conv1(s))
         s_ = F.leaky_relu(self.conv2(s_))
@@ -17,9 +17,10 @@ from . import torchutils
 from . import fileutils
 from . import ipython
 from . import python
+from . import replay
 
 from .debugutils import assertion
 
 
-__all__ = ('gymutils', 'visutils', 'datautils', 'torchutils', 'fileutils', 'ipython', 'python', 'assertion')
+__all__ = ('gymutils', 'visutils', 'datautils', 'torchutils', 'fileutils', 'ipython', 'python', 'replay', 'assertion')
 
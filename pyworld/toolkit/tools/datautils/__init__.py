@@ -7,6 +7,7 @@ Created on Mon May 20 16:53:40 2019
 """
 import numpy as np
 import itertools
+import functools
 
 from inspect import signature
 
@@ -17,10 +18,12 @@ from . import function
 from . import random
 from . import timeseries
 from . import stat
+from . import collect
+from . import store
 
 DATASET_REPOSITORY = "/home/ben/Documents/repos/datasets/" #what ever you want...
 
-__all__ = ('accumulate', 'function', 'random', 'timeseries', 'stat')
+__all__ = ('accumulate', 'function', 'random', 'timeseries', 'stat', 'collect', 'store')
 
 ''' #meh remove them...
 def arg(args, name, default):
@@ -38,6 +41,8 @@ def exit_on(iterator, on):
 '''
 
 from .batch import batch_iterator
+from .collect import Collector
+from .store import MemmapStore
 
 def window1d(x, size, step=1):
     """ Compute a sliding window over the given 1D array. If the size/step are not compatible with tje size of, trailing elements of x will be trimmed.
@@ -159,11 +164,17 @@ def display_increments2(total):
         yield j
         i += 1        
 
+@functools.lru_cache(maxsize=32)
+def _eye(size, dtype):
+    eye = np.eye(size, dtype=dtype)
+    eye.flags.writeable = False
+    return eye
+
 def onehot(x, size, dtype=np.float32):
-    x = x.astype(np.int64)
-    r = np.zeros((x.shape[0], size), dtype=dtype)
-    r[np.arange(x.shape[0]), x] = 1
-    return r
+    '''
+        Expand integer indices (N,) to one-hot vectors (N, size), rows are gathered from a cached identity matrix.
+    '''
+    return _eye(size, np.dtype(dtype))[np.asarray(x, dtype=np.int64).reshape(-1)]
 
 def splitbylabel(x, y):
     result = {}
@@ -175,29 +186,6 @@ def splitbylabel(x, y):
         
 ''' DATASET '''
 
-def __shape__(i):
-    try:
-        return i.shape
-    except:
-        pass
-    try:
-        return (len(i),)
-    except:
-        pass
-    return (1,)
-
-def __dtype__(i):
-    try:
-        return i.dtype
-    except:
-        pass
-    try:
-        return type(i[0])
-    except:
-        pass
-    return type(i)
-
-
 def __non_singular(iterator): #TODO refactor - use zip (see batch)
     def non_singular_iterator(iterator):
         for x in iterator:
@@ -211,42 +199,21 @@ def __non_singular(iterator): #TODO refactor - use zip (see batch)
         x = (x,)
     return iterator, x    
 
-def __init_dataset(iterator, size, template=None): #TODO refactor
-    iterator, x = __non_singular(iterator)
-    
-    if template is None:
-        result = tuple([np.empty((size, *__shape__(i)), dtype=__dtype__(i)) for i in x])
-    else:
-        assertion(not isinstance(template, tuple), 'template must be a tuple (may be singleton)')
-        assertion(not len(template) == len(x), 'invalid template size')
-        for i,t in enumerate(template):
-            #print(tuple(t.shape[1:]), __shape__(x[i]))
-            assertion(not tuple(t.shape[1:]) == __shape__(x[i]), 
-                      'template shape {0} and example shape {1} do not match at position {2}'.format(t.shape[1:], __shape__(x[i]), i))
-        result = template
-        
-    for j in range(len(x)):
-        result[j][0] = x[j]
-    
-    return iterator, result
-    
 def dataset(iterator, size=1000, template=None, progress=0): #TODO refactor
-    iterator, result = __init_dataset(iterator, size, template)
+    iterator, x = __non_singular(iterator)
+    collector = Collector(size, template=template)
+    collector.append(x)
     iterator = itertools.islice(iterator, 0, size-1)
     if not progress:
-        for i, x in enumerate(iterator, 1):
-            for j in range(len(x)):
-                result[j][i] = x[j]
-        return result
+        return collector.extend(iterator).arrays()
     else:
         print("Constructing dataset of size: %d" % size)
         for i, x in enumerate(iterator, 1):
             if not i % progress:
                 print("progress: %d/%d" % (i, size))
-            for j in range(len(x)):
-                result[j][i] = x[j]
+            collector.append(x)
         print("progress: %d/%d, done" % (size, size))
-        return result
+        return collector.arrays()
 
 #refactor at some point...    
 def no_count(batch_iterator):
@@ -275,21 +242,17 @@ def pack_apply(iterable, fun, unpack=True): #TODO ?????
     iterable = apply(iterable, fun, unpack)
     return pack(iterable)
 
-def pack(iterator): #????
+def pack(iterator, size=1024): #????
     '''
         Packs the content of an iterator into numpy arrays
         Args:
             iterator: with which to iterate over and collect values
+            size: expected number of values, the arrays will grow if there are more.
     '''
     iterator, x = __non_singular(iterator)
-
-    result = tuple([[z] for z in x])
-        
-    for x in iterator:
-        for j in range(len(x)):
-            result[j].append(x[j])  
-            
-    return tuple([np.array(z) for z in result])
+    collector = Collector(size)
+    collector.append(x)
+    return collector.extend(iterator).arrays()
 
 def normalise(data, axis=None):
     maxd = np.max(data, axis=axis)
@@ -9,9 +9,18 @@ def __batch_iterate__(data, batch_size):
     if _max < data.shape[0]:
         yield data[_max:]
     
+def __batch_shuffle__(data, batch_size):
+    # gathers one batch at a time, data that are not in memory (e.g. numpy.memmap) are never fully loaded
+    m = max(len(d) for d in data)
+    indx = np.random.permutation(m)
+    for i in range(0, m, batch_size):
+        bindx = np.sort(indx[i:i+batch_size]) # sorted reads are faster for memory mapped data
+        yield tuple([d[bindx] for d in data])
+
 def batch_iterator(*data, batch_size=128, shuffle=False):
     if shuffle:
-        data = __shuffle__(*data)
+        batches = __batch_shuffle__(data, batch_size)
+        return (b[0] for b in batches) if len(data) == 1 else batches
     if len(data) == 1:
         return __batch_iterate__(data[0], batch_size)
     else:
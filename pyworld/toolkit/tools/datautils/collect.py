@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Created on 16-10-2026 12:21:05
+
+    Collect examples (tuples) into preallocated typed column arrays.
+"""
+__author__ = "Benedict Wilkins"
+__email__ = "benrjw@gmail.com"
+__status__ = "Development"
+
+import numpy as np
+
+class Collector:
+
+    '''
+        Collects examples (sequences of column values) into preallocated typed column arrays, one array per
+        column. Shapes and types of the columns are given by the first example (or a template), types may be
+        given up front (e.g. from the spaces of an environment), values are cast to the type of their column. 
+        The arrays grow by doubling when full, the collected data are given as trimmed views.
+
+        Example:
+            collector = Collector()
+            for state, action in iterator:
+                collector.append((state, action))
+            states, actions = collector.arrays()
+    '''
+
+    def __init__(self, size=1024, template=None, dtypes=None):
+        """
+        Args:
+            size (int, optional): initial capacity. Defaults to 1024.
+            template (tuple, optional): arrays to collect into, they will not be reallocated unless they are too small. Defaults to None.
+            dtypes (tuple, optional): column types, a column with type None has the type of its first value (ignored if a template is given). Defaults to None.
+        """
+        assert size > 0
+        self.size = size
+        self.dtypes = dtypes
+        self.columns = None
+        self.n = 0
+        if template is not None:
+            if not isinstance(template, tuple):
+                raise ValueError("template must be a tuple (may be singleton)")
+            self.columns = list(template)
+            self.size = min(len(t) for t in template)
+
+    def __len__(self):
+        return self.n
+
+    def __init_columns(self, x):
+        dtypes = [None] * len(x) if self.dtypes is None else self.dtypes
+        if len(x) != len(dtypes):
+            raise ValueError("invalid example size {0}, expected {1}".format(len(x), len(dtypes)))
+        self.columns = []
+        for v, dtype in zip(x, dtypes):
+            v = np.asarray(v)
+            self.columns.append(np.empty((self.size, *v.shape), dtype=v.dtype if dtype is None else dtype))
+
+    def __check_columns(self, x):
+        if len(x) != len(self.columns):
+            raise ValueError("invalid example size {0}, expected {1}".format(len(x), len(self.columns)))
+        for j, (v, c) in enumerate(zip(x, self.columns)):
+            if tuple(c.shape[1:]) != np.shape(v):
+                raise ValueError("template shape {0} and example shape {1} do not match at position {2}".format(c.shape[1:], np.shape(v), j))
+
+    def grow(self, size=None):
+        """ Grow the column arrays, the collected data are copied.
+
+        Args:
+            size (int, optional): new capacity. Defaults to None (double the capacity).
+        """
+        size = 2 * self.size if size is None else size
+        assert size >= self.n
+        for j, c in enumerate(self.columns):
+            _c = np.empty((size, *c.shape[1:]), dtype=c.dtype)
+            _c[:self.n] = c[:self.n]
+            self.columns[j] = _c
+        self.size = size
+
+    def append(self, x):
+        """ Append an example.
+
+        Args:
+            x (tuple): column values (one for each column).
+        """
+        if self.columns is None:
+            self.__init_columns(x)
+        elif self.n == 0:
+            self.__check_columns(x)
+        if self.n == self.size:
+            self.grow()
+        for j, v in enumerate(x):
+            c = self.columns[j]
+            if c.dtype.kind in 'biu' and isinstance(v, (float, np.floating)):
+                # e.g. int rewards followed by float rewards, the column is not reallocated
+                raise ValueError("float value {0} in integer column {1}, give the column types (dtypes) up front".format(v, j))
+            c[self.n] = v
+        self.n += 1
+
+    def extend(self, iterable):
+        """ Append all examples in an iterable.
+
+        Args:
+            iterable (iterable): examples
+
+        Returns:
+            Collector: self
+        """
+        for x in iterable:
+            self.append(x)
+        return self
+
+    def arrays(self):
+        """ The collected data.
+
+        Returns:
+            tuple: trimmed views of the column arrays.
+        """
+        if self.columns is None:
+            return tuple()
+        return tuple([c[:self.n] for c in self.columns])
+
+    def clear(self):
+        """ Clear the collected data, the column arrays are reused (arrays previously given by ``arrays`` will be overwritten).
+        """
+        self.n = 0
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Created on 17-10-2026 11:05:43
+
+    Appendable on-disk datasets backed by numpy.memmap.
+"""
+__author__ = "Benedict Wilkins"
+__email__ = "benrjw@gmail.com"
+__status__ = "Development"
+
+import os
+import json
+
+import numpy as np
+
+class MemmapStore:
+
+    '''
+        An appendable dataset stored on disk, one raw memory mapped file per column and a small json file of
+        meta data (column dtypes/shapes and size). The meta data are written when the columns are created and
+        each time the files grow, the number of examples is updated by flush. Data are read through the page 
+        cache, slices and views of the columns are not loaded into memory (torch.from_numpy gives a zero-copy 
+        tensor). The files grow by doubling when full, existing data are not copied.
+
+        Example:
+            with MemmapStore('~/datasets/pong', names=('state', 'action')) as store:
+                for episode in gu.episodes(env, policy, mode=gu.mode.sa, n=1000):
+                    store.write(*episode)
+
+            store = MemmapStore('~/datasets/pong', mode='r')
+            for states, actions in du.batch_iterator(*store.arrays(), batch_size=256, shuffle=True):
+                ...
+    '''
+
+    META = "meta.json"
+
+    def __init__(self, path, names=None, mode='a', size=1024):
+        """
+        Args:
+            path (str): directory of the store.
+            names (tuple, optional): column names of a new store. Defaults to None ('0', '1', ...).
+            mode (str, optional): 'r' read only, 'a' read/append (create if it does not exist), 'w' overwrite. Defaults to 'a'.
+            size (int, optional): initial capacity of a new store. Defaults to 1024.
+        """
+        if mode not in ('r', 'a', 'w'):
+            raise ValueError("Invalid mode: {0}, must be one of 'r', 'a', 'w'".format(mode))
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.mode = mode
+        self.names = None if names is None else tuple(names)
+        self.columns = None
+        self.n = 0
+        self.size = size
+        meta = os.path.join(self.path, MemmapStore.META)
+        if mode != 'w' and os.path.exists(meta):
+            with open(meta, 'r') as f:
+                meta = json.load(f)
+            self.n, self.size = meta['n'], meta['size']
+            if self.names is not None and self.names != tuple(meta['names']):
+                raise ValueError("Column names {0} do not match the store {1}".format(self.names, meta['names']))
+            self.names = tuple(meta['names'])
+            self.__open([(np.dtype(dtype), tuple(shape)) for dtype, shape in meta['columns']])
+        elif mode == 'r':
+            raise FileNotFoundError("No store found at: {0}".format(self.path))
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            if os.path.exists(meta):
+                os.remove(meta) # overwritten, the old store is gone
+
+    def __file(self, j):
+        return os.path.join(self.path, "{0}.dat".format(self.names[j]))
+
+    def __open(self, columns, create=False):
+        mode = 'r' if self.mode == 'r' else 'r+'
+        self.columns = []
+        for j, (dtype, shape) in enumerate(columns):
+            file = self.__file(j)
+            nbytes = self.size * int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            if create or os.path.getsize(file) < nbytes:
+                if mode == 'r':
+                    raise IOError("Store file {0} is truncated".format(file))
+                with open(file, 'ab') as f:
+                    f.truncate(nbytes) # grow the file (sparse), existing data are unchanged
+            self.columns.append(np.memmap(file, dtype=dtype, mode=mode, shape=(self.size, *shape)))
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, name):
+        return self.columns[self.names.index(name)][:self.n]
+
+    def __create(self, x):
+        if self.names is None:
+            self.names = tuple(str(j) for j in range(len(x)))
+        if len(self.names) != len(x):
+            raise ValueError("invalid example size {0}, expected {1} ({2})".format(len(x), len(self.names), self.names))
+        self.__open([(v.dtype, v.shape[1:]) for v in x], create=True)
+        self.__write_meta()
+
+    def __write_meta(self):
+        meta = {'n':self.n, 'size':self.size, 'names':list(self.names),
+                'columns':[(c.dtype.str, list(c.shape[1:])) for c in self.columns]}
+        path = os.path.join(self.path, MemmapStore.META)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path) # a reader never sees a partial file
+
+    def grow(self, size=None):
+        """ Grow the capacity of the store (the files).
+
+        Args:
+            size (int, optional): new capacity. Defaults to None (double the capacity).
+        """
+        size = 2 * self.size if size is None else size
+        assert size >= self.n
+        columns = [(c.dtype, c.shape[1:]) for c in self.columns]
+        self.flush()
+        self.columns = None # release the old maps
+        self.size = size
+        self.__open(columns)
+        self.__write_meta()
+
+    def write(self, *arrays):
+        """ Append a batch of examples (e.g. an episode), one array for each column.
+
+        Args:
+            arrays (numpy.ndarray): column arrays of the same length.
+        """
+        if self.mode == 'r':
+            raise IOError("Store is read only")
+        arrays = [np.asarray(a) for a in arrays]
+        if self.columns is None:
+            self.__create(arrays)
+        if len(arrays) != len(self.columns):
+            raise ValueError("invalid example size {0}, expected {1}".format(len(arrays), len(self.columns)))
+        k = len(arrays[0])
+        for j, (a, c) in enumerate(zip(arrays, self.columns)):
+            if len(a) != k or a.shape[1:] != c.shape[1:]:
+                raise ValueError("column {0} has shape {1}, expected {2}".format(j, a.shape, (k, *c.shape[1:])))
+        while self.n + k > self.size:
+            self.grow()
+        for a, c in zip(arrays, self.columns):
+            c[self.n:self.n + k] = a
+        self.n += k
+
+    def append(self, x):
+        """ Append an example.
+
+        Args:
+            x (tuple): column values (one for each column).
+        """
+        self.write(*[np.asarray(v)[np.newaxis] for v in x])
+
+    def extend(self, iterable):
+        """ Append all examples in an iterable (see datautils.Collector to batch them first).
+
+        Args:
+            iterable (iterable): examples
+
+        Returns:
+            MemmapStore: self
+        """
+        for x in iterable:
+            self.append(x)
+        return self
+
+    def arrays(self):
+        """ The stored data.
+
+        Returns:
+            tuple: memory mapped (trimmed) column arrays.
+        """
+        if self.columns is None:
+            return tuple()
+        return tuple([c[:self.n] for c in self.columns])
+
+    def flush(self):
+        """ Write data and meta data to disk. """
+        if self.mode == 'r' or self.columns is None:
+            return
+        for c in self.columns:
+            c.flush()
+        self.__write_meta()
+
+    def close(self):
+        self.flush()
+        self.columns = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __str__(self):
+        return "MemmapStore({0}, {1}/{2})".format(self.path, self.n, self.size)
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+import pyworld.toolkit.tools.datautils as du
+from pyworld.toolkit.tools.datautils.collect import Collector
+
+
+class TestCollector(unittest.TestCase):
+
+    def test_collect(self):
+        c = Collector(size=2)
+        for i in range(5):
+            c.append((np.full((2,3), i, dtype=np.uint8), i))
+        s, a = c.arrays()
+        self.assertEqual(len(c), 5)
+        self.assertEqual(s.shape, (5,2,3))
+        self.assertEqual(s.dtype, np.uint8)
+        self.assertEqual(a.tolist(), [0,1,2,3,4])
+        self.assertEqual(c.size, 8) # 2 -> 4 -> 8
+
+    def test_empty(self):
+        self.assertEqual(Collector().arrays(), tuple())
+
+    def test_dtypes(self):
+        c = Collector(size=2, dtypes=(np.float64, None)).extend([(0, 1), (0.5, 2)])
+        r, a = c.arrays()
+        self.assertEqual(r.dtype, np.float64)
+        self.assertEqual(r.tolist(), [0., 0.5])
+        self.assertEqual(a.dtype, np.asarray(1).dtype)
+        with self.assertRaises(ValueError):
+            Collector().extend([(0,), (0.5,)]) # the int column is not promoted
+
+    def test_template_dtypes(self):
+        template = (np.zeros(4, dtype=np.float32),)
+        c = Collector(template=template, dtypes=(np.int64,)).extend([(0,), (0.5,)])
+        r, = c.arrays()
+        self.assertTrue(np.shares_memory(r, template[0])) # the template is written in place
+        self.assertEqual(r.tolist(), [0., 0.5])
+
+    def test_template(self):
+        template = (np.zeros((3,2)), np.zeros(3))
+        c = Collector(template=template).extend([(np.ones(2), 1.)] * 3)
+        x, y = c.arrays()
+        self.assertTrue(np.shares_memory(x, template[0]))
+        self.assertTrue(np.all(template[1] == 1.))
+        with self.assertRaises(ValueError):
+            Collector(template=template).append((np.ones(3), 1.))
+
+    def test_clear(self):
+        c = Collector(size=4).extend([(1,),(2,)])
+        c.clear()
+        x, = c.extend([(3,)]).arrays()
+        self.assertEqual(x.tolist(), [3])
+
+    def test_pack(self):
+        x, y = du.pack(iter([(i, i * i) for i in range(10)]))
+        self.assertEqual(x.tolist(), list(range(10)))
+        self.assertEqual(y.tolist(), [i * i for i in range(10)])
+        x, = du.pack(iter(range(10)))
+        self.assertEqual(x.tolist(), list(range(10)))
+
+    def test_dataset(self):
+        x, = du.dataset(iter(range(100)), size=10)
+        self.assertEqual(x.tolist(), list(range(10)))
+        template = (np.zeros(10, dtype=np.int64),)
+        x, = du.dataset(iter(range(100)), size=10, template=template)
+        self.assertIs(x.base, template[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import tempfile
+
+import numpy as np
+import torch
+
+import pyworld.toolkit.tools.datautils as du
+from pyworld.toolkit.tools.datautils.store import MemmapStore
+
+
+class TestMemmapStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name + "/store"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write(self):
+        with MemmapStore(self.path, names=('state', 'action'), size=4) as store:
+            for i in range(3):
+                store.write(np.full((5,2,2), i, dtype=np.uint8), np.arange(5))
+            store.append((np.zeros((2,2), dtype=np.uint8), 7))
+            self.assertEqual(len(store), 16)
+            self.assertEqual(store.size, 16) # 4 -> 8 -> 16
+        store = MemmapStore(self.path, mode='r')
+        states, actions = store.arrays()
+        self.assertIsInstance(states, np.memmap)
+        self.assertEqual(states.shape, (16,2,2))
+        self.assertEqual(states[:15,0,0].tolist(), [0]*5 + [1]*5 + [2]*5)
+        self.assertEqual(store['action'][-1], 7)
+
+    def test_meta(self):
+        store = MemmapStore(self.path, names=('x',), size=4)
+        store.write(np.arange(3))
+        meta = MemmapStore(self.path, mode='r') # before flush or close
+        self.assertEqual((meta.names, meta.size), (('x',), 4))
+        store.write(np.arange(3, 6))
+        self.assertEqual(MemmapStore(self.path, mode='r').size, 8) # updated on resize
+        store.close()
+        self.assertEqual(MemmapStore(self.path, mode='r').arrays()[0].tolist(), list(range(6)))
+        MemmapStore(self.path, mode='w')
+        self.assertRaises(FileNotFoundError, MemmapStore, self.path, mode='r')
+
+    def test_append_existing(self):
+        with MemmapStore(self.path) as store:
+            store.write(np.arange(3), np.arange(3) * 2.)
+        with MemmapStore(self.path) as store:
+            store.write(np.arange(3, 6), np.arange(3, 6) * 2.)
+        x, y = MemmapStore(self.path, mode='r').arrays()
+        self.assertEqual(x.tolist(), list(range(6)))
+        self.assertEqual(y.dtype, np.float64)
+
+    def test_batch(self):
+        with MemmapStore(self.path) as store:
+            store.write(np.arange(100), np.arange(100))
+            x, y = store.arrays()
+            self.assertEqual(torch.from_numpy(x).data_ptr(), x.ctypes.data) # zero copy
+            seen = []
+            for bx, by in du.batch_iterator(x, y, batch_size=16, shuffle=True):
+                self.assertTrue(np.all(bx == by))
+                seen.extend(bx.tolist())
+            self.assertEqual(sorted(seen), list(range(100)))
+
+    def test_read_only(self):
+        with self.assertRaises(FileNotFoundError):
+            MemmapStore(self.path, mode='r')
+
+
+if __name__ == "__main__":
+    unittest.main()
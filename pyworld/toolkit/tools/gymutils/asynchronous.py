@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio counterparts of ``gymutils.episode`` and ``gymutils.episodes``. The policy may be awaitable, while a
+rollout waits for its action other rollouts (in the same event loop) step their environments. ``BatchPolicy``
+gathers the states of waiting rollouts and makes a single (batched) policy call for all of them.
+
+Example:
+    policy = BatchPolicy(lambda states: model(states).argmax(1))
+    async for s, a, r in episodes([gym.make('Pong-v0') for _ in range(8)], policy, mode=mode.sar, n=100):
+        pass
+
+Created on 2026-10-16 13:40:12
+
+author: Benedict Wilkins
+"""
+import asyncio
+import functools
+import inspect
+import numpy as np
+
+from . import mode as m
+from . import policy as P
+from .iterators import Step, _pack_trajectory
+
+class BatchPolicy:
+
+    '''
+        Batches the (awaited) policy calls of concurrent rollouts. The policy is called once on the stacked
+        states of all waiting rollouts, either when size rollouts are waiting or when the event loop has
+        nothing else to do. An awaitable policy is resolved in a task, if it fails (or is cancelled) so do 
+        the waiting rollouts. Close cancels the unresolved calls.
+    '''
+
+    def __init__(self, policy, size=None):
+        """
+        Args:
+            policy (callable): batch policy actions = policy(states), may return an awaitable.
+            size (int, optional): maximum batch size. Defaults to None (no maximum).
+        """
+        self.policy = policy
+        self.size = size
+        self._states = []
+        self._futures = []
+        self._tasks = set() # unresolved (awaitable) policy calls, the event loop only keeps weak references
+
+    def __call__(self, state):
+        future = asyncio.get_running_loop().create_future()
+        self._states.append(state)
+        self._futures.append(future)
+        if self.size is not None and len(self._states) >= self.size:
+            self._flush()
+        elif len(self._states) == 1:
+            future.get_loop().call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        if not self._states:
+            return
+        states, futures = np.stack(self._states), self._futures
+        self._states, self._futures = [], []
+        try:
+            actions = self.policy(states)
+        except Exception as e:
+            return BatchPolicy._reject(futures, e)
+        if inspect.isawaitable(actions):
+            task = asyncio.ensure_future(BatchPolicy._resolve(actions, futures))
+            self._tasks.add(task)
+            task.add_done_callback(functools.partial(self._done, futures))
+        else:
+            BatchPolicy._accept(futures, actions)
+
+    @staticmethod
+    async def _resolve(actions, futures):
+        BatchPolicy._accept(futures, await actions)
+
+    def _done(self, futures, task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            for future in futures:
+                future.cancel()
+        elif task.exception() is not None:
+            BatchPolicy._reject(futures, task.exception())
+
+    def close(self):
+        """ Cancel the unresolved policy calls and the waiting rollouts. """
+        for task in list(self._tasks):
+            task.cancel()
+        for future in self._futures:
+            future.cancel()
+        self._states, self._futures = [], []
+
+    @staticmethod
+    def _accept(futures, actions):
+        for future, action in zip(futures, actions):
+            if not future.done():
+                future.set_result(action)
+
+    @staticmethod
+    def _reject(futures, e):
+        for future in futures:
+            if not future.done():
+                future.set_exception(e)
+
+async def episode(env, policy=None, mode=m.s, max_length=10000, step=Step):
+    '''
+        Creates an episode from the given environment and policy (see ``gymutils.episode``).
+        Arguments:
+            env: to play
+            policy: to select actions from - a function with signature: action = policy(state), the action may be awaitable.
+            mode: one of `gyutils.mode`, default to state
+            max_length: number of environment steps before the episode is cut short.
+    '''
+    if policy is None:
+        policy = P.uniform(env.action_space)
+    step = step(env)
+    state, = step.reset()
+    initial, trajectory = state, []
+    done = False
+    while not done:
+        action = policy(state)
+        if inspect.isawaitable(action):
+            action = await action
+        else:
+            await asyncio.sleep(0) # let other rollouts step
+        state, action, reward, done, *_ = step.step(action)
+        done = done or len(trajectory) + 1 >= max_length
+        trajectory.append((state, action, reward, done))
+    return _pack_trajectory(mode, initial, trajectory)
+
+async def episodes(env, policy=None, mode=m.s, max_length=10000, n=10):
+    '''
+        Creates n episodes (see ``gymutils.episodes``). If env is a list of environments, an episode is played
+        in each of them concurrently, episodes are given in the order that they finish.
+
+        Example:
+            async for episode in episodes(envs, policy):
+                # do something with the episode
+    '''
+    envs = list(env) if isinstance(env, (list, tuple)) else [env]
+    tasks = {}
+    started = 0
+    def start(env):
+        nonlocal started
+        started += 1
+        tasks[asyncio.ensure_future(episode(env, policy, mode, max_length))] = env
+    for env in envs[:n]:
+        start(env)
+    try:
+        while tasks:
+            finished, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                env = tasks.pop(task)
+                if started < n:
+                    start(env)
+                yield task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
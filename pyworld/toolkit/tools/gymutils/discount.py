@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorised discounted returns and advantage estimates. All functions work on (concatenated) multi-episode
+arrays with done flags, episodes are separated by done = True at their last step. Arrays may have trailing
+dimensions, e.g. (T, N) for N environments stepped in lockstep (see gymutils.vector). Inputs may be numpy
+arrays or torch tensors, the output is of the same kind (and on the same device).
+
+Example:
+    states, actions, rewards, dones = ...  # concatenated episodes
+    values = critic(states)
+    advantages = gae(rewards, values, dones, gamma=0.99, lam=0.95)
+
+Created on 2026-10-16 14:32:08
+
+author: Benedict Wilkins
+"""
+import numpy as np
+
+try:
+    import torch
+except:
+    torch = None
+
+def _is_torch(x):
+    return torch is not None and torch.is_tensor(x)
+
+def _float(x, like=None):
+    ''' x as a float array, of the same kind, dtype and device as like if given. '''
+    if like is not None:
+        if _is_torch(like):
+            return torch.as_tensor(x, dtype=like.dtype, device=like.device)
+        return np.asarray(x, dtype=like.dtype)
+    if _is_torch(x):
+        return x if x.is_floating_point() else x.float()
+    x = np.asarray(x)
+    return x.astype(np.result_type(x.dtype, np.float32), copy=False)
+
+def _continue(dones, like):
+    ''' (1 - done) as a float array, ones if dones is None. '''
+    if dones is None:
+        return torch.ones_like(like) if _is_torch(like) else np.ones_like(like)
+    return 1. - _float(dones, like=like)
+
+def _bootstrap(bootstrap, like):
+    ''' Value of the state after the final step (broadcast to the trailing dimensions). '''
+    if bootstrap is None:
+        return 0.
+    return _float(bootstrap, like=like)
+
+def _next(values, bootstrap):
+    ''' values shifted by one step, V(s_{t+1}) with V(s_T) = bootstrap. '''
+    if _is_torch(values):
+        nvalues = torch.empty_like(values)
+    else:
+        nvalues = np.empty_like(values)
+    nvalues[:-1] = values[1:]
+    nvalues[-1] = bootstrap
+    return nvalues
+
+def scan(a, x):
+    '''
+        Solves the linear recurrence y_t = x_t + a_t y_{t+1} (with y_T = 0) along the first axis. The recurrence
+        is solved with a log-depth (Hillis-Steele) scan, each pass is a single vectorised operation over the whole
+        array, there is no loop over time steps. a and x are not modified.
+        Arguments:
+            a: discount factors (T, ...), e.g. gamma * (1 - done)
+            x: (T, ...), e.g. rewards
+    '''
+    y = x.clone() if _is_torch(x) else np.array(x)
+    a = a.clone() if _is_torch(a) else np.array(a)
+    d, T = 1, y.shape[0]
+    while d < T:
+        y[:-d] = y[:-d] + a[:-d] * y[d:]
+        a[:-d] = a[:-d] * a[d:]
+        d *= 2
+    return y
+
+def returns(rewards, dones=None, gamma=0.99, bootstrap=None):
+    '''
+        Discounted returns G_t = r_t + gamma (1 - done_t) G_{t+1}.
+        Arguments:
+            rewards: (T, ...)
+            dones: episode ends (T, ...), defaults to a single episode.
+            gamma: discount factor
+            bootstrap: value of the state after the last step (if the last episode was cut short), defaults to 0.
+    '''
+    rewards = _float(rewards)
+    a = gamma * _continue(dones, rewards)
+    x = rewards.clone() if _is_torch(rewards) else np.array(rewards)
+    x[-1] = x[-1] + a[-1] * _bootstrap(bootstrap, rewards)
+    return scan(a, x)
+
+def nstep(rewards, values, dones=None, n=5, gamma=0.99, bootstrap=None):
+    '''
+        n-step returns G_t = r_t + ... + gamma^(n-1) r_{t+n-1} + gamma^n V(s_{t+n}), truncated at the end of each episode.
+        Arguments:
+            rewards: (T, ...)
+            values: V(s_t) (T, ...)
+            dones: episode ends (T, ...), defaults to a single episode.
+            n: number of steps
+            gamma: discount factor
+            bootstrap: value of the state after the last step (if the last episode was cut short), defaults to 0.
+    '''
+    rewards = _float(rewards)
+    values = _float(values, like=rewards)
+    T, bootstrap = rewards.shape[0], _bootstrap(bootstrap, rewards)
+    # pad past the final step, the reward at T is the bootstrap value after which everything is discounted to 0
+    if _is_torch(rewards):
+        pad = torch.zeros((n,) + tuple(rewards.shape[1:]), dtype=rewards.dtype, device=rewards.device)
+        cat = torch.cat
+        result = torch.zeros_like(rewards)
+        discount = torch.ones_like(rewards)
+    else:
+        pad = np.zeros((n,) + rewards.shape[1:], dtype=rewards.dtype)
+        cat = np.concatenate
+        result = np.zeros_like(rewards)
+        discount = np.ones_like(rewards)
+    a = cat([gamma * _continue(dones, rewards), pad])
+    r = cat([rewards, pad])
+    v = cat([values, pad])
+    r[T] = r[T] + bootstrap
+    v[T] = v[T] + bootstrap
+    for k in range(n):
+        result += discount * r[k:k+T]
+        discount = discount * a[k:k+T]
+    return result + discount * v[n:n+T]
+
+def gae(rewards, values, dones=None, gamma=0.99, lam=0.95, bootstrap=None):
+    '''
+        Generalised advantage estimates A_t = sum_k (gamma lam)^k delta_{t+k} where delta_t = r_t + gamma V(s_{t+1}) - V(s_t).
+        Arguments:
+            rewards: (T, ...)
+            values: V(s_t) (T, ...)
+            dones: episode ends (T, ...), defaults to a single episode.
+            gamma: discount factor
+            lam: GAE lambda, 0 gives the TD error, 1 gives G_t - V(s_t)
+            bootstrap: value of the state after the last step (if the last episode was cut short), defaults to 0.
+    '''
+    rewards = _float(rewards)
+    values = _float(values, like=rewards)
+    c = _continue(dones, rewards)
+    delta = rewards + gamma * c * _next(values, _bootstrap(bootstrap, rewards)) - values
+    return scan(gamma * lam * c, delta)
+
+def td_lambda(rewards, values, dones=None, gamma=0.99, lam=0.95, bootstrap=None):
+    '''
+        TD(lambda) returns G_t = r_t + gamma ((1 - lam) V(s_{t+1}) + lam G_{t+1}), equal to gae(...) + values.
+        Arguments:
+            rewards: (T, ...)
+            values: V(s_t) (T, ...)
+            dones: episode ends (T, ...), defaults to a single episode.
+            gamma: discount factor
+            lam: lambda, 0 gives the one step TD target, 1 gives the discounted return
+            bootstrap: value of the state after the last step (if the last episode was cut short), defaults to 0.
+    '''
+    rewards = _float(rewards)
+    values = _float(values, like=rewards)
+    return gae(rewards, values, dones, gamma, lam, bootstrap) + values
@@ -8,88 +8,142 @@ author: Benedict Wilkins
 import numpy as np
 import copy
 import itertools
-from functools import wraps
+import functools
 
 from . import wrappers
 from . import mode as m
+from .. import datautils as du
+from . import vector as V
 
 
 from . import policy as P
+from . import timing
 from ..visutils import transform as T
 
-def _d_CHW(func):
-    @wraps(func)
-    def decorator(self, action=None):
-        r = func(self, action)
-        return (T.CHW(r[0]), *r[1:])
-    return decorator
-
-def _d_HWC(func):
-    @wraps(func)
-    def decorator(self, action=None):
-        r = func(self, action)
-        return (T.HWC(r[0]), *r[1:])
-    return decorator
-
-def _d_Float(func):
-    @wraps(func)
-    def decorator(self, action=None):
-        r = func(self, action)
-        return (T.to_float(r[0]), *r[1:])
-    return decorator
-
-def _d_Integer(func):
-    @wraps(func)
-    def decorator(self, action=None):
-        r = func(self, action)
-        return (T.to_integer(r[0]), *r[1:])
-    return decorator
-
-def _d_OneHot(func):
-    @wraps(func)
-    def decorator(self, action=None):
-        state, action, reward, done, *info = func(self, action)
-        _action = np.zeros(self.env.action_space.n, dtype=np.float32)
-        _action[action] = 1.
-        return (state, _action, reward, done, *info)
-    return decorator
+def _to_float(state):
+    out = np.empty(state.shape, dtype=np.float32) # C-contiguous, even if state is a (transposed) view
+    if T.is_integer(state):
+        np.divide(state, np.float32(255.), out=out)
+    else:
+        np.copyto(out, state, casting='unsafe')
+    return out
+
+def _to_integer(state):
+    out = np.empty(state.shape, dtype=np.uint8)
+    if T.is_float(state):
+        np.multiply(state, 255., out=out, casting='unsafe')
+    else:
+        np.copyto(out, state, casting='unsafe')
+    return out
+
+_layout_transforms = {'CHW':T.CHW, 'HWC':T.HWC}
+_dtype_transforms = {'Float':_to_float, 'Integer':_to_integer}
+
+def _fuse(transforms):
+    '''
+        Compiles a chain of state transforms into a single function. Layout transforms (CHW, HWC) give views, they 
+        are applied first as they commute with the dtype transforms (Float, Integer). A dtype transform writes the 
+        result of the whole chain in a single pass, there are no intermediate arrays.
+    '''
+    layout = [_layout_transforms[t] for t in transforms if t in _layout_transforms]
+    dtype = [_dtype_transforms[t] for t in transforms if t in _dtype_transforms]
+    if not layout and not dtype:
+        return None
+    def transform(state):
+        for t in layout:
+            state = t(state)
+        for t in dtype:
+            state = t(state)
+        return state
+    return transform
 
 class StepMeta(type):
 
+    '''
+        Each property gives a new Step type with the transform added to its chain (see Step.transforms).
+    '''
+
     def __new__(mcls, name, bases, local):
         return super(StepMeta, mcls).__new__(mcls, name, bases, local)
 
+    def _chain(self, transform):
+        return type(self.__name__ + "." + transform, (self,), {'transforms':self.transforms + (transform,)})
+
     @property
     def CHW(self):
-        return type(self.__name__ + ".CHW", (self,), {'step':_d_CHW(self.step), 'reset':_d_CHW(self.reset)})
+        return self._chain('CHW')
 
     @property
     def HWC(self):
-        return type(self.__name__ + ".HWC", (self,), {'step':_d_HWC(self.step), 'reset':_d_HWC(self.reset)})
+        return self._chain('HWC')
 
     @property
     def Float(self):
-        return type(self.__name__ + ".Float", (self,), {'step':_d_Float(self.step), 'reset':_d_Float(self.reset)})
+        return self._chain('Float')
 
     @property
     def Integer(self):
-        return type(self.__name__ + ".Integer", (self,), {'step':_d_Integer(self.step), 'reset':_d_Integer(self.reset)})
+        return self._chain('Integer')
 
     @property
     def OneHot(self):
-        return type(self.__name__ + ".Integer", (self,), {'step':_d_OneHot(self.step)})
+        return self._chain('OneHot')
 
 class Step(metaclass=StepMeta):
 
+    transforms = tuple()
+
     def __init__(self, env):
         self.env = env
+        self._transform = _fuse(self.transforms)
+        self._onehot = None
+        if 'OneHot' in self.transforms:
+            self._onehot = np.eye(env.action_space.n, dtype=np.float32)
     
     def step(self, action):
         state, reward, done, *info = self.env.step(action)
+        if self._transform is not None:
+            state = self._transform(state)
+        if self._onehot is not None:
+            action = np.take(self._onehot, action, axis=0) # a copy (indexing with an int gives a view)
         return (state, action, reward, done, *info)
 
     def reset(self, *_):
-        return (self.env.reset(),)
+        state = self.env.reset()
+        if self._transform is not None:
+            state = self._transform(state)
+        return (state,)
+
+def _timed_step(step, stats, env):
+    ''' Create a step (transform) whose (fused) state transform is timed. '''
+    step = step(env)
+    if step._transform is not None:
+        name = "transform[{0}]".format("+".join(step.transforms))
+        step._transform = timing.timed(step._transform, stats.timer(name))
+    return step
+
+def _limited_step(step, max_length, env):
+    ''' Create a step (transform) that ends the episode after max_length environment steps. '''
+    step = step(env)
+    _step, count = step.step, itertools.count(1)
+    def limited(action):
+        state, action, reward, done, *info = _step(action)
+        return (state, action, reward, done or next(count) >= max_length, *info)
+    step.step = limited
+    return step
+
+def _limit(iterator, max_length):
+    ''' Cut each episode of a GymIterator short after max_length environment steps. '''
+    iterator._step_transform = functools.partial(_limited_step, iterator._step_transform, max_length)
+    return iterator
+
+class VectorStep(Step):
+
+    def reset(self, done=None):
+        state = self.env.reset(done)
+        if self._transform is not None:
+            state = self._transform(state)
+        return (state,)
 
 class GymIteratorMeta(type):
 
@@ -117,13 +171,19 @@ class GymIteratorMeta(type):
     
     def set_step_transform(self, step): #setter for an instance of GymIterator
         self._iterator = None
-        new_iterator = copy.deepcopy(self)
+        new_iterator = copy.copy(self) # the environment and policy are shared
         new_iterator._step_transform = step.fget(new_iterator._step_transform)
         return new_iterator
 
 class GymIterator(metaclass=GymIteratorMeta):
 
-    def __init__(self, env, policy=None, mode=m.s):
+    '''
+        Iterates over the observations (see gymutils.mode) of an environment. If stats (a timing.Stats) is given, 
+        each stage of a step is timed: env.step/env.reset of each wrapper, the policy and the step transform 
+        (see gymutils.timing). The environment is instrumented in place (see timing.uninstrument).
+    '''
+
+    def __init__(self, env, policy=None, mode=m.s, stats=None):
         self._step_transform = Step
 
         assert mode in iterators
@@ -138,44 +198,190 @@ class GymIterator(metaclass=GymIteratorMeta):
             policy = P.uniform(env.action_space)
 
         self._policy = policy
+        self._stats = stats
+        if stats is not None:
+            timing.instrument(env, stats)
         
         self._iterator_type = iterators[self._mode]
         self._iterator = None
 
+    def _step_policy(self):
+        if self._stats is None:
+            return self._step_transform, self._policy
+        step = functools.partial(_timed_step, self._step_transform, self._stats)
+        return step, timing.timed(self._policy, self._stats.timer('policy'))
+
     def __iter__(self):
         self._env.reset()
-        self._iterator = self._iterator_type(self._env, self._policy, self._step_transform)
+        step, policy = self._step_policy()
+        self._iterator = self._iterator_type(self._env, policy, step)
         return self._iterator
 
+class VectorGymIterator(GymIterator):
 
-def dataset(env, policy=None, mode=m.s, size=10000):
-    pass #TODO
+    '''
+        Steps N environments in lockstep, the policy is called once per step on the stacked (N, ...) states 
+        (policy.sample_batch if it is a policy.Policy). Environments that are done are reset automatically, iteration continues indefinitely. 
 
-def episode(env, policy=None, mode=m.s, max_length=10000):
+        Example:
+            iterator = VectorGymIterator(lambda: gym.make('ObjectMover-v0'), policy, mode=mode.sars, n=8)
+            for obs in itertools.islice(iterator.Float, 0, 1000):
+                pass # obs.state, obs.action, ... are stacked, obs.state.shape = (8,1,64,64)
     '''
-        Creates an episode from the given environment and policy.
+
+    def __init__(self, env, policy=None, mode=m.s, n=None, stats=None):
+        if not isinstance(env, V.VectorEnv):
+            env = V.VectorEnv(env, n=n)
+        if policy is None:
+            policy = P.uniform(env.action_space)
+        if isinstance(policy, P.Policy):
+            policy = policy.sample_batch
+        super(VectorGymIterator, self).__init__(env, policy, mode, stats=stats)
+        self._step_transform = VectorStep
+
+    def __iter__(self):
+        step, policy = self._step_policy()
+        self._iterator = vector_iterator(self._env, policy, self._mode, step)
+        return self._iterator
+
+
+def dataset(env, policy=None, mode=m.s, size=10000, max_length=10000, template=None, progress=None, stats=None):
+    '''
+        Creates a fixed size dataset from the given environment and policy. Episodes are played one after the other, 
+        the dataset is filled across episode boundaries and the final episode is cut short when it is full.
         Arguments:
             env: to play
             policy: to select actions from - a function with signature: action = policy(state)
             mode: one of `gyutils.mode`, default to state
+            size: of the dataset
+            max_length: number of environment steps before an episode is cut short.
+            template: a dataset (previously returned), its arrays are filled in place (nothing is allocated).
+            progress: a callback progress(n, size), called at the end of each episode with the current size n.
+            stats: a timing.Stats to time each stage of the rollouts (see GymIterator).
+        Returns:
+            (data, dones): data (a ``mode.batch`` of the given mode) and a boolean done mask, True at the final 
+            observation of each episode.
+
+        Example:
+            data, dones = None, None
+            for epoch in range(epochs):
+                data, dones = dataset(env, policy, mode=mode.sa, size=10000, template=(data, dones) if data else None)
+    '''
+    if template is not None:
+        data, dones = template
+        template = (*data, dones)
+    iterator = _limit(GymIterator(env, policy, mode, stats=stats), max_length)
+    dtypes = (*m.dtypes(mode, env.observation_space, env.action_space), bool)
+    collector = du.Collector(size, template=template, dtypes=dtypes)
+    collector.clear()
+    while len(collector) < size:
+        observations = iter(iterator)
+        x = next(observations)
+        for nx in observations:
+            collector.append((*x, False))
+            x = nx
+            if len(collector) == size:
+                break
+        else:
+            collector.append((*x, True))
+        if progress is not None:
+            progress(len(collector), size)
+    *data, dones = collector.arrays()
+    return m.batch.of(mode)(*data), dones
+
+def datasets(env, policy=None, mode=m.s, size=10000, max_length=10000, epochs=1, progress=None, stats=None):
+    '''
+        Creates a fixed size dataset for each epoch (see ``dataset``). The arrays are allocated once and reused, 
+        each dataset overwrites the previous one.
+    '''
+    template = None
+    for e in range(epochs):
+        template = dataset(env, policy, mode, size, max_length, template=template, progress=progress, stats=stats)
+        yield template
+
+def episode(env, policy=None, mode=m.s, max_length=10000, stats=None):
+    '''
+        Creates an episode from the given environment and policy.
+        Arguments:
+            env: to play, if a VectorEnv the first episode to finish is given.
+            policy: to select actions from - a function with signature: action = policy(state)
+            mode: one of `gyutils.mode`, default to state
             max_length: number of environment steps before the episode is cut short.
+            stats: a timing.Stats to time each stage of the rollout (see GymIterator).
     '''
-    iterator = GymIterator(env, policy, mode)
-    iterator = itertools.islice(iterator, 0, max_length)
-    return m.pack(iterator)
+    if isinstance(env, V.VectorEnv):
+        return next(vector_episodes(env, policy, mode, max_length, stats=stats))
+    iterator = _limit(GymIterator(env, policy, mode, stats=stats), max_length)
+    return m.pack(iterator, size=min(max_length + 1, 1024))
   
-def episodes(env, policy, mode=m.s, max_length=10000, n=10):
+def episodes(env, policy, mode=m.s, max_length=10000, n=10, stats=None):
     '''
-        TODO
+        Creates n episodes from the given environment and policy. If env is a VectorEnv (e.g. a 
+        ProcessVectorEnv) episodes are collected from all of its environments at once and are given 
+        in the order that they finish.
 
         Example:
             for episode in episodes(env, policy):
                 # do something with the episode
     '''
-    iterator = GymIterator(env, policy, mode)
+    if isinstance(env, V.VectorEnv):
+        yield from itertools.islice(vector_episodes(env, policy, mode, max_length, stats=stats), 0, n)
+        return
+    iterator = _limit(GymIterator(env, policy, mode, stats=stats), max_length)
+    size = min(max_length + 1, 1024)
     for i in range(n):
-        _iterator = itertools.islice(iterator, 0, max_length)
-        yield m.pack(_iterator)
+        episode = m.pack(iterator, size=size)
+        size = max(1, len(episode[0])) # episodes are often of similar length
+        yield episode
+
+def vector_episodes(env, policy=None, mode=m.s, max_length=10000, step=VectorStep, stats=None):
+    '''
+        Creates episodes from a VectorEnv, episodes are given (packed) in the order that they finish.
+        Each episode follows the same format as the (single environment) iterator of the given mode.
+    '''
+    if policy is None:
+        policy = P.uniform(env.action_space)
+    if stats is not None:
+        timing.instrument(env, stats)
+        policy = timing.timed(policy.sample_batch if isinstance(policy, P.Policy) else policy, stats.timer('policy'))
+        step = functools.partial(_timed_step, step, stats)
+    initial = [None] * len(env)
+    trajectories = [[] for _ in range(len(env))]
+    for state, action, reward, nstate, done in _vector_transitions(env, policy, step, max_length=max_length):
+        for i, trajectory in enumerate(trajectories):
+            if not trajectory:
+                initial[i] = state[i]
+            trajectory.append((nstate[i], action[i], reward[i], done[i]))
+        for i in np.flatnonzero(done):
+            yield _pack_trajectory(mode, initial[i], trajectories[i])
+            trajectories[i] = []
+
+def _pack_trajectory(mode, state, trajectory):
+    '''
+        Packs a recorded trajectory [(nstate, action, reward, done), ...] that starts at state, in the format of the given mode.
+    '''
+    replay = _Replay(state, trajectory)
+    return m.pack(iterators[mode](None, replay.policy, lambda _: replay), size=len(trajectory) + 1)
+
+class _Replay:
+
+    '''
+        Replays a recorded trajectory [(nstate, action, reward, done), ...] through one of the mode iterators below. 
+    '''
+
+    def __init__(self, state, trajectory):
+        self.state = state
+        self.trajectory = iter(trajectory)
+
+    def policy(self, *_):
+        return None # the action is given in the trajectory
+
+    def reset(self, *_):
+        return (self.state,)
+
+    def step(self, *_):
+        nstate, action, reward, done = next(self.trajectory)
+        return (nstate, action, reward, done, None)
 
 # ============================ ITERATORS ============================ #
 # Each iterator corresponds to a mode in gymutils.mode, and is used to gather states, 
@@ -277,5 +483,33 @@ def sars_iterator(env, policy, step=Step):
 iterators = {m.s:s_iterator, m.r:r_iterator, m.sa:sa_iterator, m.ss:ss_iterator, m.sr:sr_iterator, 
              m.sar:sar_iterator, m.ars:ars_iterator, m.sas:sas_iterator, 
              m.sars:sars_iterator}
-    
 
+def vector_iterator(env, policy, mode=m.s, step=VectorStep):
+    '''
+        Iterator over a VectorEnv. Unlike the iterators above, each mode is a projection of the transition 
+        (state, action, reward, nstate) of every environment at each step. The final state of an episode 
+        is given only as the nstate of its final transition, the environment is then reset.
+    '''
+    for state, action, reward, nstate, _ in _vector_transitions(env, policy, step):
+        yield mode(state=state, action=action, reward=reward, nstate=nstate)
+
+def _vector_transitions(env, policy, step=VectorStep, max_length=None):
+    if isinstance(policy, P.Policy):
+        policy = policy.sample_batch
+    step = step(env)
+    state, = step.reset()
+    length = 0
+    while True:
+        action = policy(state)
+        nstate, action, reward, done, _ = step.step(action)
+        if max_length is not None:
+            length += 1
+            done = np.logical_or(done, length >= max_length)
+            length = np.where(done, 0, length)
+        yield state, action, reward, nstate, done
+        if np.any(done):
+            rstate, = step.reset(done)
+            state = np.copy(nstate) # nstate has been given out, dont modify it
+            state[done] = rstate
+        else:
+            state = nstate
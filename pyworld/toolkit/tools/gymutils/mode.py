@@ -27,18 +27,28 @@ sars = namedtuple('sars', ['state', 'action', 'reward', 'nstate'])
 sars.__new__.__defaults__ = (None,None,None,None)
 '''
 
+import itertools
+from operator import itemgetter
+
 import numpy as np
 
-class observation:
-    
-    def __init__(self, *data):
-        self.__data = data
-    
-    def __getitem__(self, index):
-        return self.__data[index]
+from .. import datautils as du
+
+class observation(tuple):
+
+    '''
+        Base class of the mode records. A record is a tuple (without a __dict__), its fields are read by name 
+        through properties that index the tuple. The records given by an iterator are packed into a ``batch``.
+    '''
+
+    __slots__ = ()
+    fields = ()
     
-    def __iter__(self):
-        return self.__data.__iter__()
+    def __new__(cls, *data):
+        return tuple.__new__(cls, data)
+
+    def __getnewargs__(self):
+        return tuple(self)
 
     def __str__(self):
         return "observation-{0}".format(self.__class__.__name__)
@@ -48,137 +58,212 @@ class observation:
 
 class s(observation):
     
-    def __init__(self, state=None, **kwargs):
-        super(s, self).__init__(state)
+    __slots__ = ()
+    fields = ('state',)
+
+    def __new__(cls, state=None, **kwargs):
+        return tuple.__new__(cls, (state,))
     
-    @property
-    def state(self):
-        return self[0]
+    state = property(itemgetter(0))
         
 class r(observation):
     
-    def __init__(self, reward=None, **kwargs):
-        super(r, self).__init__(reward)
+    __slots__ = ()
+    fields = ('reward',)
 
-    @property
-    def reward(self):
-        return self[0]
+    def __new__(cls, reward=None, **kwargs):
+        return tuple.__new__(cls, (reward,))
+
+    reward = property(itemgetter(0))
 
 class sa(observation):
     
-    def __init__(self, state=None, action=None, **kwargs):
-        super(sa, self).__init__(state, action)
+    __slots__ = ()
+    fields = ('state', 'action')
 
-    @property
-    def state(self):
-        return self[0]
+    def __new__(cls, state=None, action=None, **kwargs):
+        return tuple.__new__(cls, (state, action))
 
-    @property
-    def action(self):
-        return self[1]
+    state = property(itemgetter(0))
+    action = property(itemgetter(1))
 
 class ss(observation):
     
-    def __init__(self, state=None, nstate=None, **kwargs):
-        super(ss, self).__init__(state, nstate)
-
-    @property
-    def state(self):
-        return self[0] 
+    __slots__ = ()
+    fields = ('state', 'nstate')
 
-    @property
-    def nstate(self):
-        return self[1]
+    def __new__(cls, state=None, nstate=None, **kwargs):
+        return tuple.__new__(cls, (state, nstate))
 
+    state = property(itemgetter(0))
+    nstate = property(itemgetter(1))
 
 class sr(observation):
     
-    def __init__(self, state=None, reward=None, **kwargs):
-        super(sr, self).__init__(state, reward)
+    __slots__ = ()
+    fields = ('state', 'reward')
 
-    @property
-    def state(self):
-        return self[0] 
-
-    @property
-    def reward(self):
-        return self[1]
+    def __new__(cls, state=None, reward=None, **kwargs):
+        return tuple.__new__(cls, (state, reward))
 
+    state = property(itemgetter(0))
+    reward = property(itemgetter(1))
         
 class sar(observation):
     
-    def __init__(self, state=None, action=None, reward=None, **kwargs):
-        super(sar, self).__init__(state, action, reward)
+    __slots__ = ()
+    fields = ('state', 'action', 'reward')
 
-    @property
-    def state(self):
-        return self[0] 
+    def __new__(cls, state=None, action=None, reward=None, **kwargs):
+        return tuple.__new__(cls, (state, action, reward))
 
-    @property
-    def action(self):
-        return self[1]
-
-    @property
-    def reward(self):
-        return self[2] 
+    state = property(itemgetter(0))
+    action = property(itemgetter(1))
+    reward = property(itemgetter(2))
 
 class ars(observation):
     
-    def __init__(self, action=None, reward=None, nstate=None, **kwargs):
-        super(ars, self).__init__(action, reward, nstate)
+    __slots__ = ()
+    fields = ('action', 'reward', 'nstate')
 
-    @property
-    def action(self):
-        return self[0]
-
-    @property
-    def reward(self):
-        return self[1] 
+    def __new__(cls, action=None, reward=None, nstate=None, **kwargs):
+        return tuple.__new__(cls, (action, reward, nstate))
 
-    @property
-    def nstate(self):
-        return self[2] 
+    action = property(itemgetter(0))
+    reward = property(itemgetter(1))
+    nstate = property(itemgetter(2))
 
 class sas(observation):
         
-    def __init__(self, state=None, action=None, nstate=None, **kwargs):
-        super(sas, self).__init__(state, action, nstate)
-    
-    @property
-    def state(self):
-        return self[0] 
+    __slots__ = ()
+    fields = ('state', 'action', 'nstate')
 
-    @property
-    def action(self):
-        return self[1]
+    def __new__(cls, state=None, action=None, nstate=None, **kwargs):
+        return tuple.__new__(cls, (state, action, nstate))
 
-    @property
-    def nstate(self):
-        return self[2] 
+    state = property(itemgetter(0))
+    action = property(itemgetter(1))
+    nstate = property(itemgetter(2))
         
 class sars(observation):
         
-    def __init__(self, state=None, action=None, reward=None, nstate=None, **kwargs):
-        super(sars, self).__init__(state, action, reward, nstate)
+    __slots__ = ()
+    fields = ('state', 'action', 'reward', 'nstate')
+
+    def __new__(cls, state=None, action=None, reward=None, nstate=None, **kwargs):
+        return tuple.__new__(cls, (state, action, reward, nstate))
+
+    state = property(itemgetter(0))
+    action = property(itemgetter(1))
+    reward = property(itemgetter(2))
+    nstate = property(itemgetter(3))
+
+class batch(tuple):
+
+    '''
+        A struct-of-arrays batch of records of a mode, one array (column) per field. Columns are read by name 
+        (batch.state, batch.action, ...) or unpacked as a tuple, they are not copied. The batch type of a mode 
+        is given by ``batch.of(mode)``.
+
+        Example:
+            episode = gu.episode(env, policy, mode=gu.mode.sar)  # a batch of gu.mode.sar
+            states, actions, rewards = episode
+            episode.state.shape # (T, ...)
+            first = episode.take(slice(0, 10)) # views of the first 10 rows
+    '''
+
+    __slots__ = ()
+    fields = ()
+    mode = observation
+    _types = {}
+
+    def __new__(cls, *columns):
+        return tuple.__new__(cls, columns)
+
+    def __reduce__(self):
+        return (_rebuild, (self.mode, tuple(self)))
+
+    @staticmethod
+    def of(mode):
+        """ The batch type of a mode (e.g. mode.sars), its columns are named by the fields of the mode.
+
+        Args:
+            mode (type): a subclass of observation.
+
+        Returns:
+            type: a subclass of batch.
+        """
+        if mode not in batch._types:
+            attrs = {name:property(itemgetter(i)) for i, name in enumerate(mode.fields)}
+            name = "batch_{0}".format(mode.__name__)
+            attrs.update(__slots__=(), fields=mode.fields, mode=mode, __module__=__name__, __qualname__=name)
+            batch._types[mode] = globals()[name] = type(name, (batch,), attrs) # resolvable by name (e.g. by pickle)
+        return batch._types[mode]
 
     @property
-    def state(self):
-        return self[0] 
+    def size(self):
+        ''' Number of rows. '''
+        return len(self[0]) if len(self) > 0 else 0
 
-    @property
-    def action(self):
-        return self[1]
+    def take(self, index):
+        """ Rows of the batch (views if index is a slice).
 
-    @property
-    def reward(self):
-        return self[2]
+        Args:
+            index (slice, numpy.ndarray): row index.
 
-    @property
-    def nstate(self):
-        return self[3] 
+        Returns:
+            batch: a batch of the same type.
+        """
+        return type(self)(*[column[index] for column in self])
+
+    def records(self):
+        ''' Iterate over the rows as records of the mode. '''
+        for row in zip(*self):
+            yield self.mode(*row)
+
+    def __str__(self):
+        return "{0}({1})".format(self.__class__.__name__, self.size)
+
+    def __repr__(self):
+        return str(self)
+
+for _mode in (s, r, sa, ss, sr, sar, ars, sas, sars): # batch_s, batch_r, ... are defined on import
+    batch.of(_mode)
+del _mode
+
+def dtypes(mode, observation_space=None, action_space=None):
+    """ Column types of a mode (see ``datautils.Collector``). Rewards are float64, states and actions have the type of their space (if given).
+
+    Args:
+        mode (type): a subclass of observation.
+        observation_space (gym.Space, optional): of states. Defaults to None (the type of the first state).
+        action_space (gym.Space, optional): of actions. Defaults to None (the type of the first action).
+
+    Returns:
+        tuple: a type (or None) for each field of the mode.
+    """
+    state, action = getattr(observation_space, 'dtype', None), getattr(action_space, 'dtype', None)
+    types = dict(state=state, nstate=state, action=action, reward=np.float64)
+    return tuple([types[field] for field in mode.fields])
+
+def _rebuild(mode, columns):
+    ''' Unpickle a batch (see batch.__reduce__). '''
+    return batch.of(mode)(*columns)
 
-def pack(observations):
+def pack(observations, size=1024):
     """ 
-        Packs a list of observations
+        Packs a list of observations into numpy arrays (one for each field), see ``datautils.Collector``.
+        Records of a mode are packed into a ``batch`` of the mode.
+        Arguments:
+            observations: to pack (an iterable)
+            size: expected number of observations, the arrays will grow if there are more.
     """
-    return tuple([np.array(d) for d in [i for i in zip(*observations)]])
+    observations = iter(observations)
+    first = next(observations, None)
+    if first is None:
+        return du.Collector(size).arrays()
+    types = dtypes(type(first)) if isinstance(first, observation) else None # float rewards, even if the first is an int
+    arrays = du.Collector(size, dtypes=types).extend(itertools.chain((first,), observations)).arrays()
+    if isinstance(first, observation):
+        return batch.of(type(first))(*arrays)
+    return arrays
@@ -17,6 +17,50 @@ except:
     pass # torch is not installed... ehhh. make this streamlined
 
 
+def softmax(v, t=1., axis=-1):
+    """ Numerically stable softmax (the maximum is subtracted before exponentiating).
+
+    Args:
+        v (numpy.ndarray, torch.Tensor): values, e.g. (N, A) action values or logits.
+        t (float, optional): temperature. Defaults to 1.
+        axis (int, optional): axis of the actions. Defaults to -1.
+
+    Returns:
+        numpy.ndarray, torch.Tensor: probabilities
+    """
+    if not isinstance(v, np.ndarray) and hasattr(v, 'softmax'): # torch
+        return (v / t).softmax(axis)
+    v = np.asarray(v, dtype=np.float64) / t
+    e = np.exp(v - v.max(axis=axis, keepdims=True))
+    return e / e.sum(axis=axis, keepdims=True)
+
+def categorical(p, rng=None):
+    """ Sample an action for each row of a (..., A) matrix of (unnormalised) action probabilities with a single 
+        cumulative sum and binary search. 
+
+    Args:
+        p (numpy.ndarray, torch.Tensor): probabilities (..., A)
+        rng (numpy.random.RandomState, torch.Generator, optional): random number generator. Defaults to None (numpy.random/torch default).
+
+    Returns:
+        numpy.ndarray, torch.Tensor: actions (...) 
+    """
+    if not isinstance(p, np.ndarray) and hasattr(p, 'cumsum'): # torch
+        cdf = p.cumsum(-1)
+        u = torch.rand(cdf.shape[:-1] + (1,), generator=rng, device=cdf.device, dtype=cdf.dtype) * cdf[..., -1:]
+        return torch.searchsorted(cdf, u, right=True).squeeze(-1).clamp_(max=p.shape[-1] - 1)
+    rng = np.random if rng is None else rng
+    p = np.asarray(p, dtype=np.float64)
+    shape, n = p.shape[:-1], p.shape[-1]
+    cdf = np.cumsum(p.reshape(-1, n), axis=1)
+    cdf /= cdf[:, -1:]
+    # offset each row by its index so that all rows are searched with one call (each row lies in [i, i+1])
+    offset = np.arange(cdf.shape[0])
+    u = rng.random_sample(cdf.shape[0]) + offset
+    cdf += offset[:, np.newaxis]
+    actions = np.searchsorted(cdf.reshape(-1), u, side='right') - offset * n
+    return np.minimum(actions, n - 1).reshape(shape)
+
 class P:
     
     class boltzmann:
@@ -25,8 +69,7 @@ class P:
             self.t = t
         
         def __call__(self, v):
-            e = np.exp(v / self.t) 
-            return e / e.sum()
+            return softmax(v, self.t)
         
     class weighted:
         
@@ -37,9 +80,20 @@ class Policy(ABC):
 
     def __init__(self, action_space):
         self.action_space = action_space
-        def _sample(*args, **kwargs):
-            raise NotImplementedError("\"sample\" attribute must be set for abstract class Policy")
-        self.sample = _sample
+
+    def sample(self, *args, **kwargs):
+        raise NotImplementedError("\"sample\" attribute must be set for abstract class Policy")
+
+    def sample_batch(self, states):
+        """ Select an action for each state in a batch (e.g. the states of a VectorEnv).
+
+        Args:
+            states (numpy.ndarray): states (N, ...)
+
+        Returns:
+            numpy.ndarray: actions (N, ...)
+        """
+        return np.array([self.sample(state) for state in states], dtype=self.action_space.dtype)
     
     def __call__(self, *args, **kwargs):
         return self.sample(*args, **kwargs)
@@ -52,6 +106,60 @@ class DiscretePolicy(Policy):
         action_space.dtype = dtype
         super(DiscretePolicy, self).__init__(action_space)
 
+class RandomPolicy(DiscretePolicy):
+
+    '''
+        Selects actions at random (independent of the state) from a discrete action space. Actions are drawn in
+        blocks with a single call to the random number generator and served from the block until it is used up.
+    '''
+
+    def __init__(self, action_space, p=None, dtype=np.int64, block=4096, rng=None):
+        """
+        Args:
+            action_space (gym.spaces.Discrete, int): action space
+            p (sequence, optional): action probabilities. Defaults to None (uniform).
+            dtype (type, optional): dtype of a sampled action. Defaults to np.int64.
+            block (int, optional): number of actions drawn at a time. Defaults to 4096.
+            rng (numpy.random.RandomState, optional): random number generator. Defaults to None (numpy.random).
+        """
+        super(RandomPolicy, self).__init__(action_space, dtype=dtype)
+        assert block > 0
+        self.cdf = None
+        if p is not None:
+            assert len(p) == self.action_space.n
+            self.cdf = np.cumsum(p, dtype=np.float64)
+            self.cdf /= self.cdf[-1]
+        self.n = self.action_space.n
+        self.dtype = dtype
+        self.block = block
+        self.rng = np.random if rng is None else rng
+        self._actions = np.empty(0, dtype=dtype)
+        self._i = 0
+
+    def _draw(self, n):
+        n = max(n, self.block)
+        if self.cdf is None:
+            actions = self.rng.randint(0, self.n, size=n)
+        else:
+            actions = np.minimum(np.searchsorted(self.cdf, self.rng.random_sample(n), side='right'), self.n - 1)
+        self._actions = actions.astype(self.dtype, copy=False)
+        self._i = 0
+
+    def sample(self, *args, **kwargs):
+        if self._i == len(self._actions):
+            self._draw(self.block)
+        action = self._actions[self._i]
+        self._i += 1
+        return action
+
+    def sample_batch(self, states):
+        n = len(states)
+        if self._i + n > len(self._actions):
+            self._draw(n)
+        actions = self._actions[self._i:self._i + n]
+        self._i += n
+        return actions
+
 class ContinuousPolicy(Policy):
 
     def __init__(self, action_space, dtype=np.float32):
@@ -76,78 +184,138 @@ def onehot(policy, dtype=np.float32):
     assert np.issubdtype(policy.action_space.dtype, np.integer)
     assert isinstance(policy.action_space, gym.spaces.Discrete)
 
-    sample =  policy.sample
+    sample, sample_batch = policy.sample, policy.sample_batch
     policy.action_space = spaces.OneHot(policy.action_space.n, dtype)
+    eye = np.eye(policy.action_space.shape[0], dtype=policy.action_space.dtype)
 
-    def oh(x):
-        r = np.zeros(policy.action_space.shape[0], dtype=policy.action_space.dtype)
-        r[sample(x)] = 1
-        return r
+    def oh(*args, **kwargs):
+        return eye[sample(*args, **kwargs)].copy()
     policy.sample = oh
+    policy.sample_batch = lambda states: eye[sample_batch(states)]
     
     return policy
 
+onehot_policy = onehot # onehot is shadowed by the argument of the policies below
+
 
 
     
-def uniform(action_space, dtype=np.int64):
+def uniform(action_space, dtype=np.int64, block=4096, rng=None):
     """ Uniform random policy that selects an action uniformly from the given (discrete) action space.
 
     Args:
         action_space (gym.spaces.Discrete, int): action space
         dtype (type, optional): dtype of a sampled action. Defaults to np.int64.
+        block (int, optional): number of actions drawn at a time (see RandomPolicy). Defaults to 4096.
+        rng (numpy.random.RandomState, optional): random number generator. Defaults to None (numpy.random).
 
     Returns:
         DiscretePolicy: the policy
     """
-    policy = DiscretePolicy(action_space, dtype=dtype)
-    action_space = policy.action_space
-    policy.sample = lambda *args, **kwargs: action_space.dtype(np.random.randint(0, action_space.n))
-    return policy
+    return RandomPolicy(action_space, dtype=dtype, block=block, rng=rng)
 
-def random(action_space, p=None, dtype=np.int64): #TODO assume discrete action_space?
+def random(action_space, p=None, dtype=np.int64, block=4096, rng=None): #TODO assume discrete action_space?
     """ Random policy that selects an action from the given (discrete) action space according to the given probabilities p.
 
     Args:
         action_space (gym.spaces.Discrete, int): action space
         p (sequence, optional): action probabilities associated with each action. Defaults to uniform probability.
         dtype (type, optional): dtype of a sampled action. Defaults to np.int64.
+        block (int, optional): number of actions drawn at a time (see RandomPolicy). Defaults to 4096.
+        rng (numpy.random.RandomState, optional): random number generator. Defaults to None (numpy.random).
 
     Returns:
         DiscretePolicy: the policy
     """
-    if p is None:
-        return uniform(action_space, dtype=dtype)
-    
-    policy = DiscretePolicy(action_space, dtype=dtype)
-    assert len(p) == policy.action_space.n
-    sample_space = np.arange(0, policy.action_space.n)
-    policy.sample = lambda *args, **kwargs: action_space.dtype(np.random.choice(sample_space, p=p))
-    return policy
+    return RandomPolicy(action_space, p=p, dtype=dtype, block=block, rng=rng)
     
 
-# TODO update others to follow DiscretePolicy!
+class CategoricalPolicy(DiscretePolicy):
+
+    '''
+        Samples actions from the action probabilities given by an actor. The actor is called on a batch of
+        states (N, ...) and gives (N, A) probabilities (or logits), see ``categorical``.
+    '''
+
+    def __init__(self, action_space, actor, logits=False, dtype=np.int64, rng=None):
+        super(CategoricalPolicy, self).__init__(action_space, dtype=dtype)
+        self.actor = actor
+        self.logits = logits
+        self.dtype = dtype
+        self.rng = rng
+
+    def probabilities(self, states):
+        p = self.actor(states)
+        return softmax(p) if self.logits else p
+
+    def sample(self, state):
+        return self.sample_batch(np.asarray(state)[np.newaxis])[0]
+
+    def sample_batch(self, states):
+        actions = categorical(self.probabilities(states), rng=self.rng)
+        if not isinstance(actions, np.ndarray): # torch
+            actions = actions.cpu().numpy()
+        return actions.astype(self.dtype, copy=False)
+
+class EGreedyPolicy(DiscretePolicy):
+
+    '''
+        Selects the action with the highest value (given by a critic) with probability 1 - epsilon, and otherwise an
+        action uniformly at random. The critic is called on a batch of states (N, ...) and gives (N, A) values.
+    '''
+
+    def __init__(self, action_space, critic, epsilon=0.01, dtype=np.int64, rng=None):
+        super(EGreedyPolicy, self).__init__(action_space, dtype=dtype)
+        self.critic = critic
+        self.epsilon = epsilon
+        self.n = self.action_space.n
+        self.dtype = dtype
+        self.rng = np.random if rng is None else rng
+
+    def sample(self, state):
+        return self.sample_batch(np.asarray(state)[np.newaxis])[0]
+
+    def sample_batch(self, states):
+        values = self.critic(states)
+        if not isinstance(values, np.ndarray): # torch
+            values = values.detach().cpu().numpy()
+        actions = np.argmax(values, axis=-1)
+        explore = self.rng.random_sample(len(actions)) < self.epsilon
+        actions[explore] = self.rng.randint(0, self.n, size=np.count_nonzero(explore))
+        return actions.astype(self.dtype, copy=False)
 
 def e_greedy_policy(action_space, critic, epsilon=0.01, onehot=False): 
-    def __policy(state):
-        if np.random.uniform() > epsilon:
-            return action_space.sample()
-        else:
-            return np.argmax(critic(state))
-    
-    policy = __policy 
-    
+    """ Epsilon greedy policy (see EGreedyPolicy).
+
+    Args:
+        action_space (gym.spaces.Discrete, int): action space
+        critic (callable): action values (N, A) of a batch of states (N, ...)
+        epsilon (float, optional): probability of a random action. Defaults to 0.01.
+        onehot (bool, optional): sample onehot actions. Defaults to False.
+
+    Returns:
+        DiscretePolicy: the policy
+    """
+    policy = EGreedyPolicy(action_space, critic, epsilon=epsilon)
     if onehot:
-        policy = onehot_policy(policy, action_space.n)
+        policy = onehot_policy(policy)
     return policy
 
-def probabilistic_policy(action_space, actor, onehot=False):
-    actions = np.arange(action_space.n)
-    def __policy(s):
-        return np.random.choice(actions, p = actor(s))
-    policy = __policy
+def probabilistic_policy(action_space, actor, logits=False, onehot=False):
+    """ Policy that samples actions according to the probabilities given by an actor (see CategoricalPolicy).
+
+    Args:
+        action_space (gym.spaces.Discrete, int): action space
+        actor (callable): action probabilities (N, A) of a batch of states (N, ...), numpy or torch.
+        logits (bool, optional): the actor gives logits (a softmax is applied). Defaults to False.
+        onehot (bool, optional): sample onehot actions. Defaults to False.
+
+    Returns:
+        DiscretePolicy: the policy
+    """
+    policy = CategoricalPolicy(action_space, actor, logits=logits)
     if onehot:
-        policy = onehot_policy(policy, action_space.n)
+        policy = onehot_policy(policy)
     return policy
 
 if __name__ == "__main__":
@@ -155,7 +323,7 @@ if __name__ == "__main__":
     action_space = Discrete(3)
     
     
-    policy = e_greedy_policy(action_space)
+    policy = e_greedy_policy(action_space, lambda states: np.zeros((len(states), action_space.n)))
     
     
     
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Environments that run in worker processes. Each worker writes its observations straight into a block of
+shared memory, only actions, rewards, dones and infos are sent (pickled) through a pipe.
+
+Created on 2026-10-16 11:03:27
+
+author: Benedict Wilkins
+"""
+import gym
+import weakref
+import functools
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+
+from . import vector as V
+
+def _worker(index, remote, parent_remote, factory):
+    parent_remote.close()
+    shm, buffer = None, None
+    try:
+        env = factory()
+        remote.send((env.observation_space, env.action_space))
+        name, shape, dtype = remote.recv()
+        shm = shared_memory.SharedMemory(name=name)
+        buffer = np.ndarray(shape, dtype=dtype, buffer=shm.buf)[index]
+        while True:
+            command, data = remote.recv()
+            if command == 'step':
+                state, reward, done, info = env.step(data)
+                buffer[...] = state
+                remote.send((reward, done, info))
+            elif command == 'reset':
+                buffer[...] = env.reset()
+                remote.send(None)
+            elif command == 'close':
+                env.close()
+                break
+            else:
+                raise ValueError("Invalid command: {0}".format(command))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        remote.send(e)
+    finally:
+        if shm is not None:
+            buffer = None # release the view before closing
+            shm.close()
+        remote.close()
+
+def _shutdown(remotes, processes, shm, timeout=5):
+    ''' Stop the workers and free the shared memory (see ProcessVectorEnv.close), also called if the environment is garbage collected. '''
+    for remote in remotes:
+        try:
+            remote.send(('close', None))
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+    try:
+        shm.close()
+    except BufferError:
+        pass # a view of the buffer is still alive, the memory is released with it
+    shm.unlink()
+
+class ProcessVectorEnv(V.VectorEnv):
+
+    '''
+        A VectorEnv whose environments each run in their own worker process. Observations are written by the
+        workers into a shared (N, ...) numpy array sized from the observation_space of the environment.
+
+        Example:
+            venv = ProcessVectorEnv('ObjectMover-v0', n=8)
+            venv = ProcessVectorEnv(functools.partial(gu.make, 'Pong-v0', binary=0.5, stack=3), n=8)
+            with venv:
+                for episode in gu.episodes(venv, policy, mode=gu.mode.sar):
+                    pass
+
+        The workers and shared memory are also freed if the environment is garbage collected (or at exit) without being closed.
+    '''
+
+    def __init__(self, env, n=None, context=None):
+        """
+        Args:
+            env (str, callable, list): environment id (see gym.make), a factory (with no arguments) that creates an environment, or a list of either.
+            n (int, optional): number of workers, required if env is not a list. Defaults to None.
+            context (str, optional): multiprocessing start method ('fork', 'spawn' or 'forkserver'), factories must be picklable if not 'fork'. Defaults to None (platform default).
+        """
+        if not isinstance(env, (list, tuple)):
+            assert n is not None and n > 0 # number of environments must be given with a factory
+            env = [env] * n
+        factories = [functools.partial(gym.make, e) if isinstance(e, str) else e for e in env]
+        assert n is None or n == len(factories)
+
+        ctx = mp.get_context(context)
+        resource_tracker.ensure_running() # workers must share the tracker, otherwise they will each try to clean up the shared memory
+        self.remotes, work_remotes = zip(*[ctx.Pipe() for _ in factories])
+        self.processes = []
+        for i, (remote, work_remote, factory) in enumerate(zip(self.remotes, work_remotes, factories)):
+            process = ctx.Process(target=_worker, args=(i, work_remote, remote, factory), daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        spaces = self.__recv_all()
+        self.observation_space, self.action_space = spaces[0]
+
+        shape = (len(self.remotes), *self.observation_space.shape)
+        dtype = np.dtype(self.observation_space.dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self._buffer = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        self._finalizer = weakref.finalize(self, _shutdown, self.remotes, self.processes, self._shm)
+        for remote in self.remotes:
+            remote.send((self._shm.name, shape, dtype))
+        self.closed = False
+
+    @property
+    def envs(self):
+        return self.processes
+
+    def __recv_all(self, remotes=None):
+        results = [remote.recv() for remote in (self.remotes if remotes is None else remotes)]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def reset(self, done=None):
+        index = np.arange(len(self.remotes)) if done is None else np.flatnonzero(done)
+        remotes = [self.remotes[i] for i in index]
+        for remote in remotes:
+            remote.send(('reset', None))
+        self.__recv_all(remotes)
+        return self._buffer[index] # copy
+
+    def step(self, actions):
+        assert len(actions) == len(self.remotes)
+        for remote, action in zip(self.remotes, actions):
+            remote.send(('step', action))
+        rewards, dones, infos = zip(*self.__recv_all())
+        return np.copy(self._buffer), np.array(rewards), np.array(dones, dtype=bool), list(infos)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        del self._buffer
+        self._finalizer()
+
+    def __str__(self):
+        return "ProcessVectorEnv({0})".format(len(self.remotes))
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recording episodes to HDF5 files. Each episode is a group (episode-0, episode-1, ...) with one resizable dataset
+per column (state, action, reward), written in chunks from a background thread (ChunkWriter). Recorded episodes
+are read with random access by an EpisodeReader. Episodes of deterministic environments can instead be recorded
+as action logs (wrappers.ActionRecordWrapper), their states are regenerated on demand by an ActionLogReader.
+
+Created on 2026-10-17 12:14:09
+
+author: Benedict Wilkins
+"""
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import gym
+
+import h5py
+import numpy as np
+
+COMPRESSION = {True:'lzf', False:None, None:None}
+
+def episode_name(i):
+    return "episode-{0}".format(i)
+
+def episode_index(name):
+    return int(name.rsplit('-', 1)[-1])
+
+class ChunkWriter:
+
+    '''
+        Appends chunks of episode data to an HDF5 file from a background thread. Chunks are given to the thread
+        through a bounded queue, if the thread falls behind ``write`` blocks. The file is flushed after each
+        chunk, so a crash loses at most the chunks that are still queued. If writing fails the thread stops 
+        writing, the error is raised by the next call of write, end, flush or close.
+
+        Example:
+            with ChunkWriter('episodes.hdf5') as writer:
+                writer.write(0, state=states, action=actions, reward=rewards)
+                writer.end(0)
+    '''
+
+    def __init__(self, path, compress=None, maxsize=8, chunk=None):
+        """
+        Args:
+            path (str): path of the HDF5 file, episodes are appended if it exists.
+            compress (bool, str, optional): compression of the state column, True for lzf (fast), or any h5py compression filter e.g. 'gzip'. Defaults to None.
+            maxsize (int, optional): maximum number of queued chunks. Defaults to 8.
+            chunk (int, optional): number of rows of each HDF5 chunk. Defaults to None (the length of the first write to a column).
+        """
+        self.path = path
+        self.chunk = chunk
+        self.compression = COMPRESSION.get(compress, compress)
+        self.file = h5py.File(path, 'a')
+        # index of the next episode, the indices in a file may have gaps (an episode is only created when it is written to)
+        self.episodes = max([episode_index(name) for name in self.file.keys()], default=-1) + 1
+        self.error = None
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def __raise(self):
+        if self.error is not None:
+            raise self.error
+
+    def __put(self, item):
+        self.__raise()
+        self.queue.put(item)
+
+    def write(self, episode, **columns):
+        """ Append a chunk of data to an episode. The arrays are given to the writer thread and must not be modified.
+
+        Args:
+            episode (int): index of the episode.
+            columns (numpy.ndarray): column name -> chunk of data (all of the same length).
+        """
+        self.__put(('write', episode, columns))
+
+    def end(self, episode, **attrs):
+        """ Mark the end of an episode, its length (and any other attributes) are written as attributes.
+
+        Args:
+            episode (int): index of the episode.
+            attrs: attributes of the episode, length defaults to the length of its shortest column.
+        """
+        self.__put(('end', episode, attrs))
+
+    def flush(self):
+        """ Wait until all queued chunks are written, raises the error of the writer thread (if writing failed). """
+        self.queue.join()
+        self.__raise()
+
+    def __run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            if self.error is not None: # writing failed, the remaining chunks are discarded
+                self.queue.task_done()
+                continue
+            try:
+                command, episode, columns = item
+                group = self.file.require_group(episode_name(episode))
+                if command == 'write':
+                    for name, data in columns.items():
+                        self.__append(group, name, data)
+                else:
+                    if 'length' not in columns:
+                        group.attrs['length'] = min([len(d) for d in group.values()], default=0)
+                    group.attrs.update(columns)
+                self.file.flush()
+            except Exception as e:
+                self.error = e
+            self.queue.task_done()
+
+    def __append(self, group, name, data):
+        data = np.asarray(data)
+        if name not in group:
+            compression = self.compression if name == 'state' else None
+            rows = max(1, len(data)) if self.chunk is None else self.chunk
+            group.create_dataset(name, data=data, maxshape=(None, *data.shape[1:]), chunks=(rows, *data.shape[1:]), compression=compression)
+        else:
+            dataset = group[name]
+            n = dataset.shape[0]
+            dataset.resize(n + len(data), axis=0)
+            dataset[n:] = data
+
+    def close(self):
+        """ Write all queued chunks and close the file. """
+        if self.file is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        self.file = None
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+def _map(path, dataset):
+    ''' Memory map an HDF5 dataset if it is stored contiguously and uncompressed, otherwise it is read lazily by h5py. '''
+    offset = dataset.id.get_offset()
+    if dataset.chunks is not None or dataset.compression is not None or offset is None:
+        return dataset
+    return np.memmap(path, dtype=dataset.dtype, mode='r', offset=offset, shape=dataset.shape)
+
+def compact(path, out):
+    """ Copy the episodes of a recording into contiguous uncompressed datasets, so that they can be memory mapped by an EpisodeReader.
+
+    Args:
+        path (str): recording (HDF5 file).
+        out (str): new HDF5 file.
+    """
+    with h5py.File(path, 'r') as src, h5py.File(out, 'w') as dst:
+        for name, group in src.items():
+            cgroup = dst.create_group(name)
+            cgroup.attrs.update(group.attrs)
+            for column, dataset in group.items():
+                cgroup.create_dataset(column, data=dataset[...])
+
+class EpisodeReader:
+
+    '''
+        Random access to the episodes in HDF5 files written by ``ChunkWriter`` (or ``wrappers.EpisodeRecordWrapper``). 
+        Only the index (episode lengths) is read when the files are opened, data are read (only) when they are requested. 
+        Uncompressed contiguous datasets are memory mapped, chunked datasets are read a chunk at a time by h5py. 
+
+        Transitions are indexed globally, transition i of episode e is (state[i], action[i], reward[i+1], state[i+1], done)
+        (see ``EpisodeRecordWrapper`` for the layout of an episode).
+
+        Example:
+            with EpisodeReader(glob.glob('recordings/*.hdf5')) as reader:
+                states, actions, rewards, nstates, dones = reader.sample(64)
+                window = reader.window(3, 100, 16) # 16 steps of episode 3 from step 100
+    '''
+
+    columns = ('state', 'action', 'reward')
+
+    def __init__(self, paths):
+        """
+        Args:
+            paths (str, list): HDF5 file(s).
+        """
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        self.files = []
+        self.episodes = [] # tuple of column arrays (memmap or h5py.Dataset) for each episode
+        lengths, finished = [], []
+        for path in paths:
+            file = h5py.File(path, 'r')
+            self.files.append(file)
+            names = sorted(file.keys(), key=episode_index)
+            for name in names:
+                group = file[name]
+                length = group.attrs.get('length', min([len(group[c]) for c in EpisodeReader.columns]))
+                self.episodes.append(tuple([_map(path, group[c]) for c in EpisodeReader.columns]))
+                lengths.append(length)
+                finished.append('length' in group.attrs)
+        self.lengths = np.array(lengths, dtype=np.int64)
+        self.finished = np.array(finished, dtype=bool) # unfinished episodes were cut short (their final transition is not done)
+        # global transition index, episode e has lengths[e] - 1 transitions
+        self.offsets = np.concatenate([[0], np.cumsum(np.maximum(self.lengths - 1, 0))])
+
+    def __len__(self):
+        ''' Number of transitions. '''
+        return int(self.offsets[-1])
+
+    def locate(self, index):
+        """ Episode and step of global transition indices.
+
+        Args:
+            index (numpy.ndarray, int): global transition indices.
+
+        Returns:
+            tuple: episode indices, step indices
+        """
+        index = np.asarray(index)
+        if np.any((index < 0) | (index >= len(self))):
+            raise IndexError("transition index out of range [0, {0})".format(len(self)))
+        episode = np.searchsorted(self.offsets, index, side='right') - 1
+        return episode, index - self.offsets[episode]
+
+    def episode(self, e):
+        """ All steps of an episode.
+
+        Returns:
+            tuple: state, action, reward arrays
+        """
+        return self.window(e, 0, self.lengths[e])
+
+    def window(self, e, t, n):
+        """ A contiguous window of steps (only the window is read).
+
+        Args:
+            e (int): episode index
+            t (int): first step
+            n (int): number of steps (the window is cut short at the end of the episode).
+
+        Returns:
+            tuple: state, action, reward arrays
+        """
+        end = min(t + n, self.lengths[e])
+        return tuple([np.asarray(c[t:end]) for c in self.episodes[e]])
+
+    def __getitem__(self, index):
+        """ Transitions by global index. The steps of each episode are read together, 
+            with one (sorted) read per column.
+
+        Args:
+            index (numpy.ndarray, int): global transition indices.
+
+        Returns:
+            tuple: states, actions, rewards, nstates, dones
+        """
+        episodes, steps = self.locate(index)
+        if np.ndim(index) == 0:
+            (state, nstate), (action, _), (_, reward) = self.window(episodes, steps, 2)
+            return state, action, reward, nstate, bool(self.finished[episodes] and steps + 2 == self.lengths[episodes])
+        episodes, steps = episodes.ravel(), steps.ravel()
+        dones = self.finished[episodes] & (steps + 2 == self.lengths[episodes])
+        states = actions = rewards = nstates = None
+        order = np.argsort(episodes, kind='stable')
+        split = np.flatnonzero(np.diff(episodes[order])) + 1
+        for where in np.split(order, split):
+            if len(where) == 0:
+                continue
+            step = steps[where]
+            rows = np.unique(np.concatenate([step, step + 1])) # h5py requires increasing indices
+            state, action, reward = [np.asarray(c[rows]) for c in self.episodes[episodes[where[0]]]]
+            if states is None:
+                states = np.empty((len(episodes),) + state.shape[1:], dtype=state.dtype)
+                nstates = np.empty_like(states)
+                actions = np.empty((len(episodes),) + action.shape[1:], dtype=action.dtype)
+                rewards = np.empty((len(episodes),) + reward.shape[1:], dtype=reward.dtype)
+            i = np.searchsorted(rows, step) # rows[i + 1] == step + 1
+            states[where], nstates[where] = state[i], state[i + 1]
+            actions[where], rewards[where] = action[i], reward[i + 1]
+        return states, actions, rewards, nstates, dones
+
+    def sample(self, batch_size=64, rng=np.random):
+        """ Sample transitions uniformly (with replacement).
+
+        Returns:
+            tuple: states, actions, rewards, nstates, dones
+        """
+        return self[rng.randint(0, len(self), size=batch_size)]
+
+    def close(self):
+        for file in self.files:
+            file.close()
+        self.files = []
+        self.episodes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __str__(self):
+        return "EpisodeReader({0} episodes, {1} transitions)".format(len(self.lengths), len(self))
+
+    def __repr__(self):
+        return str(self)
+
+def _make(env):
+    if isinstance(env, str):
+        return gym.make(env)
+    if isinstance(env, gym.Env):
+        return env
+    return env() # factory
+
+class ActionLogReader:
+
+    '''
+        Reads action logs written by ``wrappers.ActionRecordWrapper``. Only the seed, actions, rewards and periodic
+        checkpoints of the environment state are stored, states are regenerated by restoring the nearest checkpoint
+        (``env.unwrapped.restore_full_state``) and replaying the actions. The environment must be deterministic
+        given its full state. A window of n steps costs at most n + interval environment steps.
+
+        Example:
+            with ActionLogReader('actions.hdf5', 'ObjectMover-v0') as reader:
+                states, actions, rewards = reader.episode(0)
+                window = reader.window(3, 100, 16) # 16 steps of episode 3 from step 100
+                episodes = reader.episodes(workers=4) # regenerate all episodes in parallel
+    '''
+
+    def __init__(self, path, env):
+        """
+        Args:
+            path (str): HDF5 file.
+            env (str, gym.Env, callable): environment id, environment or environment factory (a picklable id or factory is required for parallel regeneration).
+        """
+        self.path = path
+        self.env_spec = env
+        self.env = _make(env)
+        self.file = h5py.File(path, 'r')
+        names = sorted(self.file.keys(), key=episode_index)
+        self.groups = [self.file[name] for name in names]
+        self.lengths = np.array([g.attrs['length'] for g in self.groups], dtype=np.int64)
+
+    def __len__(self):
+        ''' Number of episodes. '''
+        return len(self.groups)
+
+    def episode(self, e):
+        """ All steps of an episode.
+
+        Returns:
+            tuple: state, action, reward arrays
+        """
+        return self.window(e, 0, self.lengths[e])
+
+    def window(self, e, t, n):
+        """ A contiguous window of steps, regenerated from the nearest checkpoint at or before t.
+
+        Args:
+            e (int): episode index
+            t (int): first step
+            n (int): number of steps (the window is cut short at the end of the episode).
+
+        Returns:
+            tuple: state, action, reward arrays
+        """
+        group = self.groups[e]
+        end = min(t + n, self.lengths[e])
+        if t < 0 or t >= end:
+            raise IndexError("step {0} out of range [0, {1})".format(t, self.lengths[e]))
+        interval = int(group.attrs['interval'])
+        k = min(t // interval, len(group['checkpoint']) - 1)
+        actions = np.asarray(group['action'][k * interval:end])
+        env = self.env.unwrapped
+        if 'seed' in group.attrs:
+            self.env.seed(int(group.attrs['seed']))
+        self.env.reset()
+        env.restore_full_state(np.asarray(group['checkpoint'][k]))
+        state = np.asarray(env._get_obs())
+        states = np.empty((end - t, *state.shape), dtype=state.dtype)
+        i = k * interval
+        for action in actions[:-1]:
+            if i >= t:
+                states[i - t] = state
+            state, *_ = self.env.step(action)
+            state = np.asarray(state)
+            i += 1
+        states[i - t] = state
+        return states, actions[t - k * interval:], np.asarray(group['reward'][t:end])
+
+    def episodes(self, index=None, workers=None):
+        """ Regenerate episodes, in parallel with one environment per worker process.
+
+        Args:
+            index (list, optional): episode indices. Defaults to None (all episodes).
+            workers (int, optional): number of worker processes. Defaults to None (regenerate in this process).
+
+        Returns:
+            list: (state, action, reward) for each episode.
+        """
+        index = range(len(self)) if index is None else index
+        if workers is None or workers <= 1:
+            return [self.episode(e) for e in index]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.path, self.env_spec)) as pool:
+            return list(pool.map(_regenerate, index))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.groups = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __str__(self):
+        return "ActionLogReader({0} episodes, {1} steps)".format(len(self), int(self.lengths.sum()))
+
+    def __repr__(self):
+        return str(self)
+
+_reader = None # ActionLogReader of a worker process
+
+def _init_worker(path, env):
+    global _reader
+    _reader = ActionLogReader(path, env)
+
+def _regenerate(e):
+    return _reader.episode(e)
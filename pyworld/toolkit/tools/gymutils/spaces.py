@@ -7,20 +7,38 @@ import numpy as np
 
 class OneHot(gym.Space):
 
+    '''
+        Space of one-hot vectors of a discrete action. Actions are best kept as integer indices during rollouts
+        and in storage, and expanded only when a batch is used (see encode, datautils.onehot, torchutils.onehot).
+    '''
+
     def __init__(self, size, dtype=np.float32):
         assert isinstance(size, int) and size > 0
         self.size = size
         super(OneHot, self).__init__((size,), dtype)
+        self._eye = np.eye(size, dtype=self.dtype)
+        self._eye.flags.writeable = False
+
+    def sample(self, n=None):
+        """ Sample a one-hot vector (size,), or n one-hot vectors (n, size). """
+        if n is None:
+            return self._eye[np.random.randint(self.size)].copy()
+        return self._eye[np.random.randint(self.size, size=n)]
+
+    def encode(self, index):
+        """ One-hot vectors (..., size) of integer indices (...). """
+        if np.ndim(index) == 0:
+            return self._eye[index].copy() # a view of the (read only) identity otherwise
+        return self._eye[index]
 
-    def sample(self):
-        r = np.zeros(self.size, dtype=self.dtype)
-        r[np.random.randint(self.size)] = 1
-        return r
+    def decode(self, x):
+        """ Integer indices (...) of one-hot vectors (..., size). """
+        return np.argmax(x, axis=-1)
 
     def contains(self, x):
-        if isinstance(x, (list, tuple, np.ndarray)) and len(x) == self.size:
-            u, c = np.unique(x, return_counts=True)
-            return u[0] == 0 and u[1] == 1 and c[int(u[0])] == self.size - 1
+        if isinstance(x, (list, tuple, np.ndarray)):
+            x = np.asarray(x)
+            return x.shape == self.shape and np.count_nonzero(x) == 1 and x.max() == 1
         else:
             return False
 
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Created on 2026-10-17 14:02:51
+
+    A small environment shared by the tests.
+
+    author: Benedict Wilkins
+"""
+
+import numpy as np
+import gym
+
+class DummyEnv(gym.Env):
+
+    '''
+        A small deterministic environment. The state at step i of an episode is filled with i (or sampled from the
+        observation space), every step has reward 1 and info {'i':i}, the episode is done after limit steps.
+    '''
+
+    def __init__(self, limit=5, shape=(1,5,5), dtype=np.float32, sample=False):
+        """
+        Args:
+            limit (int, optional): number of steps in an episode. Defaults to 5.
+            shape (tuple, optional): observation shape. Defaults to (1,5,5).
+            dtype (type, optional): observation dtype, observations are in [0,1] for float and [0,255] for integer types. Defaults to np.float32.
+            sample (bool, optional): sample states from the observation space. Defaults to False.
+        """
+        super(DummyEnv, self).__init__()
+        high = 1. if np.issubdtype(dtype, np.floating) else 255
+        self.action_space = gym.spaces.Discrete(3)
+        self.observation_space = gym.spaces.Box(np.dtype(dtype).type(0), np.dtype(dtype).type(high), shape=shape, dtype=dtype)
+        self.limit = limit
+        self.sample = sample
+        self.i = 0
+
+    def step(self, action):
+        self.i += 1
+        return self.state(), 1., self.i >= self.limit, {'i':self.i}
+
+    def reset(self):
+        self.i = 0
+        return self.state()
+
+    def state(self):
+        if self.sample:
+            return self.observation_space.sample()
+        return np.full(self.observation_space.shape, self.i, dtype=self.observation_space.dtype)
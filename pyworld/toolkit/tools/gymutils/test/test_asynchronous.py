@@ -0,0 +1,87 @@
+import unittest
+import asyncio
+
+import numpy as np
+
+
+import pyworld.toolkit.tools.gymutils as gu
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
+
+class TestEpisode(unittest.TestCase):
+
+    def test_episode(self):
+        s, a, r = asyncio.run(gu.asynchronous.episode(DummyEnv(), mode=gu.mode.sar))
+        _s, _a, _r = gu.episode(DummyEnv(), mode=gu.mode.sar)
+        self.assertTrue(np.all(s == _s))
+        self.assertEqual(a.shape, _a.shape)
+        self.assertTrue(np.all(r == _r))
+
+    def test_awaitable_policy(self):
+        async def policy(state):
+            await asyncio.sleep(0)
+            return 1
+        s, a = asyncio.run(gu.asynchronous.episode(DummyEnv(), policy, mode=gu.mode.sa))
+        self.assertEqual(a.tolist(), [1] * 6)
+    
+    def test_max_length(self):
+        s, = asyncio.run(gu.asynchronous.episode(DummyEnv(limit=10), mode=gu.mode.s, max_length=3))
+        self.assertEqual(s[:,0,0,0].tolist(), [0,1,2,3])
+        s, = gu.episode(DummyEnv(limit=10), mode=gu.mode.s, max_length=3) # 3 environment steps, as gu.episode
+        self.assertEqual(s[:,0,0,0].tolist(), [0,1,2,3])
+
+class TestEpisodes(unittest.TestCase):
+
+    def test_episodes(self):
+        async def run():
+            envs = [DummyEnv(limit=2), DummyEnv(limit=5)]
+            return [len(r) async for s, r in gu.asynchronous.episodes(envs, mode=gu.mode.sr, n=4)]
+        lengths = asyncio.run(run())
+        self.assertEqual(len(lengths), 4)
+        self.assertEqual(lengths[0], 2) # the shorter episode finishes first
+        self.assertEqual(set(lengths), {2,5})
+
+    def test_batch_policy(self):
+        batches = []
+        def model(states):
+            batches.append(states.shape[0])
+            return np.zeros(states.shape[0], dtype=np.int64)
+        async def run():
+            policy = gu.asynchronous.BatchPolicy(model)
+            envs = [DummyEnv(limit=3) for _ in range(4)]
+            return [len(s) async for s, in gu.asynchronous.episodes(envs, policy, n=4)]
+        self.assertEqual(asyncio.run(run()), [4,4,4,4])
+        self.assertEqual(batches, [4,4,4])
+
+    def test_batch_policy_exception(self):
+        def model(states):
+            raise ValueError()
+        async def run():
+            return await gu.asynchronous.episode(DummyEnv(), gu.asynchronous.BatchPolicy(model))
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_batch_policy_awaitable(self):
+        async def model(states):
+            await asyncio.sleep(0)
+            raise ValueError()
+        async def run():
+            return await gu.asynchronous.episode(DummyEnv(), gu.asynchronous.BatchPolicy(model))
+        with self.assertRaises(ValueError): # raised in the task, given to the waiting rollout
+            asyncio.run(run())
+
+    def test_batch_policy_close(self):
+        async def run():
+            pending = asyncio.get_running_loop().create_future() # a policy that never resolves
+            policy = gu.asynchronous.BatchPolicy(lambda states: pending)
+            rollout = asyncio.ensure_future(gu.asynchronous.episode(DummyEnv(), policy))
+            await asyncio.sleep(0.01)
+            self.assertEqual(len(policy._tasks), 1) # the task is referenced by the policy
+            policy.close()
+            with self.assertRaises(asyncio.CancelledError):
+                await rollout
+            self.assertEqual(len(policy._tasks), 0)
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import torch
+
+import pyworld.toolkit.tools.gymutils as gu
+
+def reference_returns(rewards, dones, gamma, bootstrap=0.):
+    returns = np.zeros_like(rewards)
+    g = bootstrap
+    for t in reversed(range(len(rewards))):
+        g = rewards[t] + gamma * (1 - dones[t]) * g
+        returns[t] = g
+    return returns
+
+def reference_gae(rewards, values, dones, gamma, lam, bootstrap=0.):
+    advantages = np.zeros_like(rewards)
+    a, nvalue = 0., bootstrap
+    for t in reversed(range(len(rewards))):
+        delta = rewards[t] + gamma * (1 - dones[t]) * nvalue - values[t]
+        a = delta + gamma * lam * (1 - dones[t]) * a
+        advantages[t] = a
+        nvalue = values[t]
+    return advantages
+
+def reference_nstep(rewards, values, dones, n, gamma, bootstrap=0.):
+    T = len(rewards)
+    returns = np.zeros_like(rewards)
+    for t in range(T):
+        g, discount = 0., 1.
+        for k in range(n):
+            if t + k == T:
+                g += discount * bootstrap
+                discount = 0.
+                break
+            g += discount * rewards[t+k]
+            discount *= gamma * (1 - dones[t+k])
+        if discount > 0:
+            g += discount * (values[t+n] if t + n < T else bootstrap)
+        returns[t] = g
+    return returns
+
+class TestDiscount(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.rewards = rng.randn(100)
+        self.values = rng.randn(100)
+        self.dones = np.zeros(100, dtype=bool)
+        self.dones[[9, 40, 41, 77]] = True
+
+    def test_returns(self):
+        returns = gu.discount.returns(self.rewards, self.dones, gamma=0.9, bootstrap=2.)
+        self.assertTrue(np.allclose(returns, reference_returns(self.rewards, self.dones, 0.9, 2.)))
+        # single episode (gymutils.returns)
+        self.assertTrue(np.allclose(gu.returns(self.rewards, 0.9), reference_returns(self.rewards, np.zeros(100), 0.9)))
+
+    def test_gae(self):
+        advantages = gu.discount.gae(self.rewards, self.values, self.dones, gamma=0.9, lam=0.8, bootstrap=1.)
+        self.assertTrue(np.allclose(advantages, reference_gae(self.rewards, self.values, self.dones, 0.9, 0.8, 1.)))
+        returns = gu.discount.td_lambda(self.rewards, self.values, self.dones, gamma=0.9, lam=1.)
+        self.assertTrue(np.allclose(returns, reference_returns(self.rewards, self.dones, 0.9)))
+
+    def test_nstep(self):
+        for n in [1, 3, 10]:
+            returns = gu.discount.nstep(self.rewards, self.values, self.dones, n=n, gamma=0.9, bootstrap=1.5)
+            self.assertTrue(np.allclose(returns, reference_nstep(self.rewards, self.values, self.dones, n, 0.9, 1.5)))
+
+    def test_batch(self):
+        rewards = np.stack([self.rewards, self.rewards[::-1]], axis=1) # (T, N)
+        dones = np.stack([self.dones, self.dones[::-1]], axis=1)
+        returns = gu.discount.returns(rewards, dones, gamma=0.9)
+        self.assertTrue(np.allclose(returns[:,1], reference_returns(self.rewards[::-1], self.dones[::-1], 0.9)))
+
+    def test_torch(self):
+        rewards = torch.as_tensor(self.rewards, dtype=torch.float32)
+        advantages = gu.discount.gae(rewards, self.values, self.dones, gamma=0.9, lam=0.8)
+        self.assertTrue(torch.is_tensor(advantages))
+        self.assertEqual(advantages.dtype, torch.float32)
+        self.assertTrue(np.allclose(advantages.numpy(), reference_gae(self.rewards, self.values, self.dones, 0.9, 0.8), atol=1e-4))
+
+    def test_integer(self):
+        returns = gu.returns(np.ones(10, dtype=np.int64), 0.5)
+        self.assertEqual(returns.dtype, np.float64)
+        self.assertAlmostEqual(returns[0], 2 - 0.5 ** 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
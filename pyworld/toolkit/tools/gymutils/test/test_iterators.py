@@ -1,49 +1,61 @@
 import unittest
 
 import numpy as np
-import gym
 
 
 import pyworld.toolkit.tools.gymutils as gu
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
 
 ITER_LIMIT = 25
 
-class TestEnv(gym.Env):
-
-    def __init__(self):
-        super(TestEnv, self).__init__()
-        self.action_space = gym.spaces.Discrete(3)
-        self.observation_space = gym.spaces.Box(np.float32(0), np.float32(1), shape=(1,5,5))
-        self.i = 0
-
-    def step(self, action):
-        self.i += 1
-        return self.observation_space.sample(), 0., self.i >= ITER_LIMIT, None
-    
-    def reset(self):
-        self.i = 0
-        return self.observation_space.sample()
-
-
 class TestIterator(unittest.TestCase):
 
     def test_GymIterator(self):
-        env = TestEnv()
+        env = DummyEnv(limit=ITER_LIMIT, sample=True)
         policy = gu.policy.uniform(env.action_space)
         iterator = gu.iterators.GymIterator(env, policy)
         iterator = gu.iterators.itertools.islice(iterator, 0, ITER_LIMIT + 2)
         self.assertEqual(len([i for i in iterator]), ITER_LIMIT+1)
 
-
-    
-
-        
-
-        
-
-
-
-
+    def test_transform_chain(self):
+        env = DummyEnv(limit=ITER_LIMIT, sample=True)
+        iterator = gu.iterators.GymIterator(env, mode=gu.mode.sars).HWC.Integer
+        self.assertIs(iterator._env, env) # the environment is not copied
+        self.assertEqual(iterator._step_transform.transforms, ('HWC', 'Integer'))
+        for obs in gu.iterators.itertools.islice(iterator, 0, ITER_LIMIT):
+            self.assertEqual(obs.state.shape, (5,5,1))
+            self.assertEqual(obs.state.dtype, np.uint8)
+            self.assertTrue(obs.nstate.flags['C_CONTIGUOUS'])
+            self.assertIsNot(obs.state, obs.nstate)
+
+    def test_transform_float(self):
+        step = gu.iterators.Step.HWC.Integer.CHW.Float(DummyEnv(limit=ITER_LIMIT, sample=True))
+        state, = step.reset()
+        self.assertEqual(state.shape, (1,5,5))
+        self.assertEqual(state.dtype, np.float32)
+        self.assertTrue(np.all((state >= 0) & (state <= 1)))
+
+    def test_transform_onehot(self):
+        iterator = gu.iterators.GymIterator(DummyEnv(limit=ITER_LIMIT, sample=True), mode=gu.mode.sa).OneHot
+        for obs in gu.iterators.itertools.islice(iterator, 0, ITER_LIMIT):
+            self.assertEqual(obs.action.shape, (3,))
+            self.assertEqual(obs.action.sum(), 1.)
+            obs.action[:] = 0. # the one-hot encoding of later actions is not modified
+
+    def test_dataset(self):
+        progress = []
+        data, dones = gu.iterators.dataset(DummyEnv(limit=ITER_LIMIT, sample=True), mode=gu.mode.sars, size=60, progress=lambda n, size: progress.append(n))
+        self.assertEqual(data.state.shape, (60,1,5,5))
+        self.assertEqual(data.action.shape, (60,))
+        self.assertEqual(np.flatnonzero(dones).tolist(), [ITER_LIMIT-1, 2*ITER_LIMIT-1])
+        self.assertEqual(progress, [ITER_LIMIT, 2*ITER_LIMIT, 60])
+
+    def test_datasets(self):
+        datasets = gu.iterators.datasets(DummyEnv(limit=ITER_LIMIT, sample=True), mode=gu.mode.s, size=30, epochs=3)
+        states = [data.state for data, dones in datasets]
+        self.assertEqual(len(states), 3)
+        self.assertTrue(all(np.shares_memory(states[0], s) for s in states)) # nothing is reallocated
+        self.assertEqual(states[0].shape, (30,1,5,5))
 
 
 if __name__ == "__main__":
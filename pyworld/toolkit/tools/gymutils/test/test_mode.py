@@ -1,4 +1,5 @@
 import unittest
+import pickle
 
 import numpy as np
 
@@ -39,6 +40,45 @@ class TetObservation(unittest.TestCase):
         self.assertTrue(np.all(a == xa))
         self.assertTrue(np.all(s == xs))
 
+    def test_record(self):
+        obs = mode.sars(1, 2, reward=3, nstate=4, done=True)
+        self.assertEqual((obs.state, obs.action, obs.reward, obs.nstate), (1, 2, 3, 4))
+        self.assertEqual(tuple(obs), (1, 2, 3, 4))
+        self.assertFalse(hasattr(obs, '__dict__'))
+        self.assertEqual(pickle.loads(pickle.dumps(obs)).nstate, 4)
+
+    def test_pack_batch(self):
+        batch = mode.pack(mode.sa(np.array([i, i]), i) for i in range(10))
+        self.assertIsInstance(batch, mode.batch.of(mode.sa))
+        self.assertEqual(batch.fields, ('state', 'action'))
+        self.assertEqual(batch.size, 10)
+        self.assertEqual(batch.state.shape, (10, 2))
+        self.assertTrue(np.all(batch.action == np.arange(10)))
+        states, actions = batch
+        self.assertIs(states, batch.state)
+
+    def test_pack_rewards(self):
+        batch = mode.pack([mode.sr(0, 0), mode.sr(1, 0.5)]) # int rewards followed by float rewards
+        self.assertEqual(batch.reward.dtype, np.float64)
+        self.assertEqual(batch.reward.tolist(), [0., 0.5])
+        self.assertEqual(batch.state.dtype, np.asarray(0).dtype)
+        self.assertEqual(mode.dtypes(mode.sar), (None, None, np.float64))
+
+    def test_pickle_batch(self):
+        batch = mode.pack(mode.sars(np.array([i, i]), i, float(i), np.array([i, i]) + 1) for i in range(10))
+        batch = pickle.loads(pickle.dumps(batch))
+        self.assertIsInstance(batch, mode.batch.of(mode.sars))
+        self.assertEqual(batch.action.tolist(), list(range(10)))
+        self.assertIs(pickle.loads(pickle.dumps(type(batch))), mode.batch.of(mode.sars))
+
+    def test_batch_take(self):
+        batch = mode.batch.of(mode.sa)(np.arange(10), np.arange(10) * 2)
+        rows = batch.take(slice(2, 5))
+        self.assertEqual(rows.action.tolist(), [4, 6, 8])
+        self.assertTrue(np.shares_memory(rows.state, batch.state))
+        record = next(rows.records())
+        self.assertIsInstance(record, mode.sa)
+        self.assertEqual((record.state, record.action), (2, 4))
 
 if __name__ == "__main__":
     unittest.main()
@@ -48,6 +48,58 @@ class TestUniform(unittest.TestCase):
         p = policy.uniform(1, dtype=np.float32)
         self.assertEqual(type(p(None)), np.float32)
 
+    def test_batch(self):
+        p = policy.uniform(3, block=8)
+        actions = np.concatenate([p.sample_batch(np.zeros((5,2))) for _ in range(4)])
+        self.assertEqual(actions.shape, (20,))
+        self.assertEqual(actions.dtype, np.int64)
+        self.assertTrue(np.all((actions >= 0) & (actions < 3)))
+        self.assertEqual(len(p.sample_batch(np.zeros((20,2)))), 20) # larger than a block
+
+    def test_rng(self):
+        p1 = policy.uniform(5, rng=np.random.RandomState(0))
+        p2 = policy.uniform(5, rng=np.random.RandomState(0))
+        self.assertEqual([p1(None) for _ in range(10)], p2.sample_batch(np.zeros(10)).tolist())
+
+class TestRandom(unittest.TestCase):
+
+    def test_p(self):
+        p = policy.random(3, p=[0.2, 0., 0.8], rng=np.random.RandomState(0))
+        counts = np.bincount(p.sample_batch(np.zeros(10000)), minlength=3)
+        self.assertEqual(counts[1], 0)
+        self.assertAlmostEqual(counts[2] / 10000, 0.8, places=1)
+
+class TestCategorical(unittest.TestCase):
+
+    def test_softmax(self):
+        p = policy.softmax(np.array([[1000., 1000.], [0., np.log(3)]]))
+        self.assertTrue(np.allclose(p, [[0.5, 0.5], [0.25, 0.75]]))
+
+    def test_sample(self):
+        p = np.array([[0., 1., 0.], [0.5, 0., 0.5]])
+        actions = policy.categorical(np.repeat(p, 5000, axis=0), rng=np.random.RandomState(0)).reshape(2, 5000)
+        self.assertTrue(np.all(actions[0] == 1))
+        self.assertTrue(np.all(actions[1] != 1))
+        self.assertAlmostEqual(np.mean(actions[1] == 2), 0.5, places=1)
+
+    def test_torch(self):
+        import torch
+        p = torch.tensor([[0., 1., 0.], [0., 0., 2.]])
+        self.assertEqual(policy.categorical(p).tolist(), [1, 2])
+
+    def test_probabilistic(self):
+        p = policy.probabilistic_policy(3, lambda states: np.tile([0., -np.inf, 0.], (len(states), 1)), logits=True)
+        actions = p.sample_batch(np.zeros((100, 2)))
+        self.assertEqual(actions.shape, (100,))
+        self.assertTrue(np.all(actions != 1))
+        self.assertIn(p(np.zeros(2)), (0, 2))
+
+    def test_e_greedy(self):
+        critic = lambda states: np.tile([0., 1., 0.], (len(states), 1))
+        self.assertTrue(np.all(policy.e_greedy_policy(3, critic, epsilon=0.).sample_batch(np.zeros(10)) == 1))
+        actions = policy.e_greedy_policy(3, critic, epsilon=1.).sample_batch(np.zeros(1000))
+        self.assertEqual(set(actions.tolist()), {0, 1, 2})
+
 class TestOneHot(unittest.TestCase):
 
     def test_1(self):
@@ -65,6 +117,12 @@ class TestOneHot(unittest.TestCase):
         p = policy.onehot(policy.uniform(1), dtype=np.uint8)
         self.assertEqual(p(None).dtype, np.uint8)
 
+    def test_batch(self):
+        p = policy.onehot(policy.uniform(3))
+        actions = p.sample_batch(np.zeros(4))
+        self.assertEqual(actions.shape, (4,3))
+        self.assertTrue(np.all(actions.sum(1) == 1))
+
     def test_policy_int(self):
         with self.assertRaises(AssertionError):
             policy.onehot(policy.uniform(1, dtype=np.float32))
@@ -0,0 +1,64 @@
+import unittest
+import gc
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+import pyworld.toolkit.tools.gymutils as gu
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
+
+class TestProcessVectorEnv(unittest.TestCase):
+
+    def test_step(self):
+        with gu.process.ProcessVectorEnv(DummyEnv, n=3) as venv:
+            self.assertEqual(venv.observation_space.shape, (1,5,5))
+            self.assertEqual(venv.reset().shape, (3,1,5,5))
+            states, rewards, dones, infos = venv.step([0,1,2])
+            self.assertTrue(np.all(states == 1.))
+            self.assertEqual(rewards.tolist(), [1.,1.,1.])
+            self.assertEqual(infos, [{'i':1}] * 3)
+
+    def test_reset_done(self):
+        with gu.process.ProcessVectorEnv([DummyEnv, DummyEnv]) as venv:
+            venv.reset()
+            states, *_ = venv.step([0,0])
+            rstates = venv.reset(np.array([True, False]))
+            self.assertEqual(rstates.shape, (1,1,5,5))
+            self.assertTrue(np.all(rstates == 0.))
+            self.assertTrue(np.all(states == 1.)) # states are not shared
+
+    def test_exception(self):
+        def factory():
+            raise ValueError()
+        with self.assertRaises(ValueError):
+            gu.process.ProcessVectorEnv(factory, n=1)
+
+    def test_collect(self):
+        venv = gu.process.ProcessVectorEnv(DummyEnv, n=2)
+        venv.reset()
+        name, processes = venv._shm.name, venv.processes
+        del venv # not closed
+        gc.collect()
+        self.assertFalse(any(p.is_alive() for p in processes))
+        with self.assertRaises(FileNotFoundError): # the shared memory is unlinked
+            shared_memory.SharedMemory(name=name)
+
+    def test_episodes(self):
+        with gu.process.ProcessVectorEnv([lambda: DummyEnv(limit=3), lambda: DummyEnv(limit=4)]) as venv:
+            lengths = [len(s) for s, a, r in gu.episodes(venv, None, mode=gu.mode.sar, n=4)]
+            self.assertEqual(lengths, [3,4,3,4])
+
+    def test_episode(self):
+        s, = gu.episode(gu.vector.VectorEnv([DummyEnv(limit=6)]), mode=gu.mode.s)
+        self.assertEqual(s[:,0,0,0].tolist(), [0,1,2,3,4,5,6]) # same as a single environment
+        s, = gu.episode(DummyEnv(limit=6), mode=gu.mode.s)
+        self.assertEqual(s[:,0,0,0].tolist(), [0,1,2,3,4,5,6])
+
+    def test_max_length(self):
+        s, a = gu.episode(gu.vector.VectorEnv([DummyEnv(limit=10)]), mode=gu.mode.ss, max_length=4)
+        self.assertEqual(s.shape, (4,1,5,5))
+
+
+if __name__ == "__main__":
+    unittest.main()
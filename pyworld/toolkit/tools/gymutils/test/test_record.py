@@ -0,0 +1,152 @@
+import unittest
+import tempfile
+
+import gym
+import h5py
+import numpy as np
+
+import pyworld.environment
+
+import pyworld.toolkit.tools.gymutils as gu
+
+
+class TestEpisodeReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name + "/episodes.hdf5"
+        with gu.record.ChunkWriter(self.path, compress=True) as writer:
+            for e, length in enumerate([4, 6, 3]):
+                for t in range(0, length, 2):
+                    n = min(2, length - t)
+                    steps = np.arange(t, t + n)
+                    writer.write(e, state=np.full((n,2,2), 10 * e, dtype=np.uint8) + steps[:,None,None].astype(np.uint8), 
+                                 action=steps, reward=steps.astype(np.float32))
+                if e < 2:
+                    writer.end(e)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_index(self):
+        with gu.record.EpisodeReader(self.path) as reader:
+            self.assertEqual(reader.lengths.tolist(), [4, 6, 3])
+            self.assertEqual(len(reader), 3 + 5 + 2)
+            episodes, steps = reader.locate([0, 2, 3, 7, 9])
+            self.assertEqual(episodes.tolist(), [0, 0, 1, 1, 2])
+            self.assertEqual(steps.tolist(), [0, 2, 0, 4, 1])
+
+    def test_transitions(self):
+        with gu.record.EpisodeReader(self.path) as reader:
+            states, actions, rewards, nstates, dones = reader[np.array([2, 7, 9])]
+            self.assertEqual(states[:,0,0].tolist(), [2, 14, 21])
+            self.assertEqual(nstates[:,0,0].tolist(), [3, 15, 22])
+            self.assertEqual(actions.tolist(), [2, 4, 1])
+            self.assertEqual(rewards.tolist(), [3., 5., 2.])
+            self.assertEqual(dones.tolist(), [True, True, False]) # episode 2 is unfinished
+            states, *_ = reader.sample(32)
+            self.assertEqual(states.shape, (32,2,2))
+
+    def test_batch(self):
+        index = np.array([9, 2, 7, 2, 0, 8, 9, 3]) # unsorted, repeated and spanning episodes
+        with gu.record.EpisodeReader(self.path) as reader:
+            batch = reader[index]
+            for j, i in enumerate(index):
+                for x, y in zip(batch, reader[int(i)]):
+                    np.testing.assert_array_equal(x[j], y)
+
+    def test_window(self):
+        with gu.record.EpisodeReader(self.path) as reader:
+            states, actions, rewards = reader.window(1, 3, 10)
+            self.assertEqual(actions.tolist(), [3, 4, 5])
+            self.assertEqual(reader.episode(0)[0].shape, (4,2,2))
+
+    def test_compact(self):
+        out = self.directory.name + "/compact.hdf5"
+        gu.record.compact(self.path, out)
+        with gu.record.EpisodeReader(out) as reader:
+            self.assertIsInstance(reader.episodes[0][0], np.memmap)
+            states, *_ = reader[np.array([2, 7])]
+            self.assertEqual(states[:,0,0].tolist(), [2, 14])
+
+class TestEpisodeRecordWrapper(unittest.TestCase):
+
+    def test_append(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = directory + "/episodes.hdf5"
+            lengths = []
+            for _ in range(2): # a second session appends to the file
+                env = gu.wrappers.EpisodeRecordWrapper(gym.make('ObjectMover-v0'), path, chunk=4)
+                for _ in range(2):
+                    lengths.append(len(gu.episode(env, gu.policy.uniform(env.action_space), mode=gu.mode.s).state))
+                env.close()
+            with gu.record.EpisodeReader(path) as reader:
+                self.assertEqual(reader.lengths.tolist(), lengths)
+
+    def test_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = directory + "/episodes.hdf5"
+            env = gu.wrappers.EpisodeRecordWrapper(gym.make('ObjectMover-v0'), path, chunk=64)
+            gu.episode(env, gu.policy.uniform(env.action_space), max_length=10) # shorter than a chunk
+            env.close()
+            with h5py.File(path, 'r') as file:
+                for dataset in file['episode-1'].values():
+                    self.assertEqual(dataset.chunks[0], 64)
+
+    def test_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = gu.record.ChunkWriter(directory + "/episodes.hdf5")
+            writer.write(0, state=np.zeros((2,3)))
+            writer.write(0, state=np.zeros((2,4))) # a different shape, writing fails
+            self.assertRaises(Exception, writer.flush)
+            self.assertRaises(Exception, writer.write, 0, state=np.zeros((2,3)))
+            self.assertRaises(Exception, writer.close)
+
+class TestActionLogReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name + "/actions.hdf5"
+        env = gu.wrappers.ActionRecordWrapper(gym.make('ObjectMover-v0'), self.path, seed=0, checkpoint=4)
+        self.episodes = []
+        rng = np.random.RandomState(0)
+        for _ in range(2):
+            states, actions = [env.reset()], []
+            for _ in range(10):
+                actions.append(rng.randint(env.action_space.n))
+                state, _, done, _ = env.step(actions[-1])
+                states.append(state)
+            self.episodes.append((np.stack(states), np.array(actions)))
+        env.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_episode(self):
+        with gu.record.ActionLogReader(self.path, 'ObjectMover-v0') as reader:
+            self.assertEqual(reader.lengths.tolist(), [11, 11])
+            for e, (states, actions) in enumerate(self.episodes):
+                rstates, ractions, rewards = reader.episode(e)
+                self.assertTrue(np.array_equal(rstates, states))
+                self.assertEqual(ractions[:-1].tolist(), actions.tolist())
+                self.assertEqual(ractions[-1], -1)
+                self.assertEqual(len(rewards), 11)
+
+    def test_iterator(self):
+        path = self.directory.name + "/iterator.hdf5"
+        env = gu.wrappers.ActionRecordWrapper(gym.make('ObjectMover-v0'), path, seed=0)
+        lengths = [len(gu.episode(env, gu.policy.uniform(env.action_space), mode=gu.mode.s).state) for _ in range(2)]
+        env.close()
+        with gu.record.ActionLogReader(path, 'ObjectMover-v0') as reader:
+            self.assertEqual(reader.lengths.tolist(), lengths)
+
+    def test_window(self):
+        with gu.record.ActionLogReader(self.path, 'ObjectMover-v0') as reader:
+            states, actions, _ = reader.window(1, 5, 4)
+            self.assertTrue(np.array_equal(states, self.episodes[1][0][5:9]))
+            self.assertEqual(actions.tolist(), self.episodes[1][1][5:9].tolist())
+            states, _, _ = reader.window(0, 9, 4) # cut short
+            self.assertEqual(len(states), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,6 +39,24 @@ class TestOneHot(unittest.TestCase):
         space = spaces.OneHot(3, dtype=np.uint8)
         self.assertTrue(space.contains(np.array([1,0,0], dtype=np.float32))) #maybe we want this behaviour?
 
+    def test_sample_n(self):
+        space = spaces.OneHot(3, dtype=np.uint8)
+        x = space.sample(10)
+        self.assertEqual(x.shape, (10,3))
+        self.assertTrue(np.all(x.sum(1) == 1))
+        self.assertTrue(all(space.contains(v) for v in x))
+
+    def test_encode_decode(self):
+        space = spaces.OneHot(4)
+        index = np.array([3, 0, 2], dtype=np.int8)
+        x = space.encode(index)
+        self.assertEqual(x.tolist(), [[0,0,0,1],[1,0,0,0],[0,0,1,0]])
+        self.assertEqual(space.decode(x).tolist(), index.tolist())
+        x = space.encode(2)
+        self.assertEqual(x.tolist(), [0,0,1,0])
+        x[:] = 0 # writeable, the encoding of later actions is not modified
+        self.assertEqual(space.encode(2).tolist(), [0,0,1,0])
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+import pyworld.toolkit.tools.gymutils as gu
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
+
+ITER_LIMIT = 10
+
+class TestTiming(unittest.TestCase):
+
+    def test_timer(self):
+        timer = gu.timing.Timer('t', size=4)
+        for i in range(6):
+            timer.add(float(i), float(i) + i)
+        self.assertEqual(timer.count, 6)
+        self.assertEqual(timer.total, 15.)
+        self.assertEqual(timer.percentile(100), 5.) # only the 4 most recent samples are kept
+        self.assertEqual(timer.percentile(0), 2.)
+
+    def test_iterator(self):
+        env = gu.wrappers.CHW(DummyEnv(limit=ITER_LIMIT, shape=(5,6,1), sample=True))
+        stats = gu.timing.Stats()
+        episode = gu.episode(env, gu.policy.uniform(env.action_space), mode=gu.mode.sa, stats=stats)
+        self.assertEqual(len(episode.state), ITER_LIMIT + 1)
+        self.assertEqual(stats['0:CHW.step'].count, ITER_LIMIT)
+        self.assertEqual(stats['1:DummyEnv.step'].count, ITER_LIMIT)
+        self.assertEqual(stats['policy'].count, ITER_LIMIT)
+        self.assertGreater(stats.steps_per_second(), 0)
+        self.assertIn('p99', stats.summary()['policy'])
+
+    def test_transform(self):
+        env = DummyEnv(limit=ITER_LIMIT, shape=(5,6,1), sample=True)
+        stats = gu.timing.Stats()
+        iterator = gu.iterators.GymIterator(env, mode=gu.mode.s, stats=stats).CHW
+        self.assertEqual(len(list(iterator)), ITER_LIMIT + 1)
+        self.assertEqual(stats['transform[CHW]'].count, ITER_LIMIT + 1)
+
+    def test_uninstrument(self):
+        env = gu.wrappers.CHW(DummyEnv(limit=ITER_LIMIT, shape=(5,6,1), sample=True))
+        gu.timing.instrument(env, gu.timing.Stats())
+        self.assertIn('step', env.__dict__)
+        gu.timing.uninstrument(env)
+        self.assertNotIn('step', env.__dict__)
+        self.assertNotIn('step', env.env.__dict__)
+
+if __name__ == "__main__":
+    unittest.main()
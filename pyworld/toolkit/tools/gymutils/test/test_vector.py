@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+
+import pyworld.toolkit.tools.gymutils as gu
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
+
+ITER_LIMIT = 5
+
+def make_env(limit=ITER_LIMIT):
+    return DummyEnv(limit, shape=(5,5,1)) # HWC
+
+class TestVectorEnv(unittest.TestCase):
+
+    def test_factory(self):
+        venv = gu.vector.VectorEnv(make_env, n=4)
+        self.assertEqual(len(venv), 4)
+        self.assertEqual(venv.reset().shape, (4,5,5,1))
+
+    def test_step(self):
+        venv = gu.vector.VectorEnv([make_env(), make_env()])
+        venv.reset()
+        states, rewards, dones, infos = venv.step(np.zeros(2, dtype=np.int64))
+        self.assertEqual(states.shape, (2,5,5,1))
+        self.assertEqual(rewards.shape, (2,))
+        self.assertEqual(dones.dtype, bool)
+        self.assertEqual(len(infos), 2)
+
+    def test_reset_done(self):
+        venv = gu.vector.VectorEnv([make_env(), make_env()])
+        venv.reset()
+        venv.step([0,0])
+        states = venv.reset(np.array([False, True]))
+        self.assertEqual(states.shape, (1,5,5,1))
+        self.assertEqual(venv.envs[0].i, 1)
+        self.assertEqual(venv.envs[1].i, 0)
+
+
+class TestVectorGymIterator(unittest.TestCase):
+
+    def test_max_length(self):
+        # max_length is the number of environment steps, for a single environment and a VectorEnv
+        for mode, length in [(gu.mode.s, 4), (gu.mode.sars, 3)]:
+            single = gu.episode(make_env(limit=10), mode=mode, max_length=3)
+            vector = gu.episode(gu.vector.VectorEnv([make_env(limit=10)]), mode=mode, max_length=3)
+            self.assertEqual(len(single.state), length)
+            self.assertTrue(np.array_equal(single.state, vector.state))
+        lengths = [len(e.state) for e in gu.episodes(make_env(limit=10), None, mode=gu.mode.s, max_length=3, n=2)]
+        self.assertEqual(lengths, [4, 4])
+
+    def test_sars(self):
+        iterator = gu.iterators.VectorGymIterator(make_env, mode=gu.mode.sars, n=3)
+        for obs in gu.iterators.itertools.islice(iterator, 0, 2 * ITER_LIMIT):
+            self.assertEqual(obs.state.shape, (3,5,5,1))
+            self.assertEqual(obs.action.shape, (3,))
+            self.assertEqual(obs.reward.shape, (3,))
+            self.assertEqual(obs.nstate.shape, (3,5,5,1))
+            self.assertTrue(np.all(obs.nstate == obs.state + 1))
+
+    def test_auto_reset(self):
+        envs = [make_env(limit=2), make_env(limit=3)]
+        iterator = gu.iterators.VectorGymIterator(envs, mode=gu.mode.ss)
+        states = [obs.state[:,0,0,0] for obs in gu.iterators.itertools.islice(iterator, 0, 6)]
+        self.assertEqual(np.stack(states)[:,0].tolist(), [0,1,0,1,0,1])
+        self.assertEqual(np.stack(states)[:,1].tolist(), [0,1,2,0,1,2])
+
+    def test_policy_batch(self):
+        calls = []
+        def policy(states):
+            calls.append(states.shape)
+            return np.zeros(states.shape[0], dtype=np.int64)
+        iterator = gu.iterators.VectorGymIterator(make_env, policy, mode=gu.mode.sa, n=4)
+        for obs in gu.iterators.itertools.islice(iterator, 0, 3):
+            self.assertEqual(obs.action.tolist(), [0,0,0,0])
+        self.assertEqual(calls, [(4,5,5,1)] * 3)
+
+    def test_transform(self):
+        iterator = gu.iterators.VectorGymIterator(make_env, mode=gu.mode.s, n=2).CHW
+        for obs in gu.iterators.itertools.islice(iterator, 0, 2 * ITER_LIMIT):
+            self.assertEqual(obs.state.shape, (2,1,5,5))
+
+
+if __name__ == "__main__":
+    unittest.main()
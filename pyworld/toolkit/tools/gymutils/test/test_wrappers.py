@@ -11,36 +11,17 @@ __status__ = "Development"
 
 import unittest
 
+import tempfile
+
 import numpy as np
-import gym
+import h5py
 import pyworld.toolkit.tools.gymutils.wrappers as wrappers 
-
-class TestEnv(gym.Env):
-
-    def __init__(self):
-        super(TestEnv, self).__init__()
-        self.iter_limit = 10
-        self.i = 0
-
-    def step(self, action):
-        self.i += 1
-        return self.observation_space.sample(), 0., self.i >= self.iter_limit, None
-    
-    def reset(self):
-        self.i = 0
-        return self.observation_space.sample()
-
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
 
 class Test(unittest.TestCase):
 
     def test_Float(self):
-        class TestFloat(TestEnv):
-
-            def __init__(self):
-                super(TestFloat,self).__init__()
-                self.observation_space = gym.spaces.Box(0,255, shape=(1,5,5), dtype=np.uint8)
-
-        env = TestFloat()
+        env = DummyEnv(limit=10, sample=True, shape=(1,5,5), dtype=np.uint8)
         env = wrappers.Float(env)
         self.assertTrue((env.observation_space.high == 1.).all())
         self.assertTrue((env.observation_space.low == 0.).all())
@@ -54,13 +35,7 @@ class Test(unittest.TestCase):
 
 
     def test_Integer(self):
-        class TestInteger(TestEnv):
-
-            def __init__(self):
-                super(TestInteger,self).__init__()
-                self.observation_space = gym.spaces.Box(np.float32(0.), np.float32(1.), shape=(1,5,5), dtype=np.float32)
-
-        env = TestInteger()
+        env = DummyEnv(limit=10, sample=True, shape=(1,5,5))
         env = wrappers.Integer(env)
         self.assertTrue((env.observation_space.high == 255).all())
         self.assertTrue((env.observation_space.low == 0).all())
@@ -74,13 +49,7 @@ class Test(unittest.TestCase):
 
 
     def test_CHW(self):
-        class TestCHW(TestEnv):
-
-            def __init__(self):
-                super(TestCHW,self).__init__()
-                self.observation_space = gym.spaces.Box(np.float32(0.), np.float32(1.), shape=(4,5,1), dtype=np.float32)
-
-        env = TestCHW()
+        env = DummyEnv(limit=10, sample=True, shape=(4,5,1))
         env = wrappers.CHW(env)
         self.assertTrue((env.observation_space.high == 1).all())
         self.assertTrue((env.observation_space.low == 0).all())
@@ -95,13 +64,7 @@ class Test(unittest.TestCase):
 
     
     def test_HWC(self):
-        class TestHWC(TestEnv):
-
-            def __init__(self):
-                super(TestHWC,self).__init__()
-                self.observation_space = gym.spaces.Box(np.float32(0.), np.float32(1.), shape=(1,5,4), dtype=np.float32)
-
-        env = TestHWC()
+        env = DummyEnv(limit=10, sample=True, shape=(1,5,4))
         env = wrappers.HWC(env)
         self.assertTrue((env.observation_space.high == 1).all())
         self.assertTrue((env.observation_space.low == 0).all())
@@ -113,7 +76,95 @@ class Test(unittest.TestCase):
         self.assertLessEqual(env.step(0)[0].max(), 1)
         self.assertGreaterEqual(env.step(0)[0].min(), 0)
 
-
+    def test_MaxSkip(self):
+        class TestMaxSkip(DummyEnv):
+
+            def state(self):
+                observation = np.zeros(self.observation_space.shape, dtype=np.uint8)
+                observation[self.i % 2] = self.i # flicker
+                return observation
+
+        env = wrappers.MaxSkip(TestMaxSkip(limit=10, shape=(5,6,1), dtype=np.uint8), n=4)
+        self.assertEqual(env.observation_space.shape, (5,6,1))
+        env.reset()
+        observation, reward, done, _ = env.step(0)
+        self.assertEqual(reward, 4.)
+        self.assertEqual(observation[0].max(), 4)
+        self.assertEqual(observation[1].max(), 3)
+        env.step(0)
+        observation, reward, done, _ = env.step(0) # cut short at the limit
+        self.assertTrue(done)
+        self.assertEqual(reward, 2.)
+        self.assertIsNot(observation, env.step(0)[0]) 
+
+        env = wrappers.Stack(wrappers.CHW(wrappers.MaxSkip(TestMaxSkip(limit=10, shape=(5,6,1), dtype=np.uint8), n=2)), n=3)
+        self.assertEqual(env.reset().shape, (3,5,6))
+        self.assertEqual(env.step(0)[0].shape, (3,5,6))
+
+    def test_Stack(self):
+        env = wrappers.Stack(DummyEnv(limit=10, shape=(1,5,6), dtype=np.uint8), n=3, lazy=True)
+        self.assertEqual(env.observation_space.shape, (3,5,6))
+        state = env.reset()
+        self.assertEqual(state.shape, (3,5,6))
+        state1, *_ = env.step(0)
+        state2, *_ = env.step(0)
+        self.assertIs(state1.frames[-1], state2.frames[-2]) # frames are shared
+        self.assertEqual(np.asarray(state2)[1:,0,0].tolist(), [1,2])
+        self.assertEqual(np.asarray(state1, dtype=np.float32).dtype, np.float32)
+
+        env = wrappers.Stack(DummyEnv(limit=10, shape=(1,5,6), dtype=np.uint8), n=3) # numpy arrays by default
+        env.reset()
+        self.assertIsInstance(env.step(0)[0], np.ndarray)
+
+        env = wrappers.ObservationWrapper(DummyEnv(limit=10, shape=(1,5,6), dtype=np.uint8), wrappers.ObservationWrapper.mode.stack, stack=3)
+        self.assertEqual(len(set(map(id, env.reset().frames))), 3) # padding frames are not aliased
+
+        env = wrappers.CHW(wrappers.Stack(wrappers.HWC(DummyEnv(limit=10, shape=(1,5,6), dtype=np.uint8)), n=3, lazy=True)) # stack HWC frames, then to CHW
+        self.assertEqual(env.reset().shape, (3,5,6))
+        state, *_ = env.step(0)
+        self.assertEqual(state[-1,0,0], 1)
+
+        from pyworld.toolkit.tools.gymutils import iterators, mode
+        env = wrappers.Stack(wrappers.HWC(DummyEnv(limit=10, shape=(1,5,6), dtype=np.uint8)), n=3, lazy=True)
+        for state, *_ in iterators.GymIterator(env, lambda _: 0, mode=mode.sars).CHW:
+            self.assertEqual(state.shape, (3,5,6))
+
+    def test_Atari(self):
+        env = wrappers.ObservationWrapper(DummyEnv(limit=10, sample=True, shape=(210,160,3), dtype=np.uint8), wrappers.ObservationWrapper.mode.atari)
+        self.assertEqual(env.observation_space.shape, (84,84,1))
+        self.assertEqual(env.observation_space.dtype, np.uint8)
+        state, *_ = env.step(0)
+        self.assertEqual(state.shape, (84,84,1))
+        self.assertEqual(state.dtype, np.uint8)
+        self.assertIsNot(state, env.step(0)[0])
+
+        env = wrappers.Atari(DummyEnv(limit=10, sample=True, shape=(210,160,3), dtype=np.uint8), integer=True)
+        self.assertEqual(env.observation_space.shape, (3,105,80))
+        self.assertEqual(env.reset().dtype, np.uint8)
+        self.assertEqual(env.reset().shape, env.observation_space.shape)
+
+    def test_EpisodeRecordWrapper(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = directory + "/episodes.hdf5"
+            env = wrappers.EpisodeRecordWrapper(DummyEnv(limit=10, shape=(1,5,6), dtype=np.uint8), path, chunk=4)
+            for _ in range(2):
+                env.reset()
+                done = False
+                while not done:
+                    _, _, done, _ = env.step(1)
+            env.reset()
+            env.step(2) # unfinished episode
+            env.close()
+            with h5py.File(path, 'r') as f:
+                self.assertEqual(sorted(f.keys()), ['episode-0', 'episode-1', 'episode-2'])
+                episode = f['episode-1']
+                self.assertEqual(episode.attrs['length'], 11)
+                self.assertEqual(episode['state'].shape, (11,1,5,6))
+                self.assertEqual(episode['state'][1:,0,0,0].tolist(), list(range(1, 11)))
+                self.assertEqual(episode['action'][:].tolist(), [1] * 10 + [-1])
+                self.assertEqual(episode['reward'][:].tolist(), [0.] + [1.] * 10)
+                self.assertEqual(f['episode-2']['action'][:].tolist(), [2])
+                self.assertNotIn('length', f['episode-2'].attrs)
 
 
 if __name__ == "__main__":
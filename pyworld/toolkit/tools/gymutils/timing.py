@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in timing of rollouts. Each stage (env.step and env.reset of every wrapper, observation transforms, the
+policy, step transforms) is timed by a Timer of a Stats object. Nothing is timed (or changed) unless a Stats
+object is given, e.g. to a GymIterator or to ``instrument``.
+
+Example:
+    stats = timing.Stats()
+    for obs in GymIterator(env, policy, mode=mode.sars, stats=stats):
+        ...
+    print(stats)              # table of count/total/mean/percentiles for each stage
+    stats['policy'].percentile(99)
+    stats.steps_per_second()
+
+Created on 2026-10-17 15:41:26
+
+author: Benedict Wilkins
+"""
+import time
+
+import numpy as np
+
+clock = time.perf_counter
+
+class Timer:
+
+    '''
+        Cumulative time and count of a stage. The most recent samples (durations in seconds) are kept in a ring
+        buffer for percentiles.
+    '''
+
+    def __init__(self, name, size=4096):
+        self.name = name
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self.total = 0.
+        self.first = None # clock at the start of the first sample
+        self.last = None  # clock at the end of the most recent sample
+
+    def add(self, start, end):
+        duration = end - start
+        self.samples[self.count % len(self.samples)] = duration
+        self.count += 1
+        self.total += duration
+        if self.first is None:
+            self.first = start
+        self.last = end
+
+    @property
+    def mean(self):
+        return self.total / max(self.count, 1)
+
+    def percentile(self, q):
+        """ Percentile(s) of the recent durations (seconds).
+
+        Args:
+            q (float, list): percentile(s) in [0, 100]
+
+        Returns:
+            float, numpy.ndarray: duration(s)
+        """
+        n = min(self.count, len(self.samples))
+        if n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        return np.percentile(self.samples[:n], q)
+
+    def rate(self):
+        ''' Number of samples per second of wall time (between the first and the most recent sample). '''
+        if self.count == 0 or self.last <= self.first:
+            return 0.
+        return self.count / (self.last - self.first)
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.
+        self.first = self.last = None
+
+    def __str__(self):
+        return "Timer({0}, {1}, {2:.6f}s)".format(self.name, self.count, self.total)
+
+    def __repr__(self):
+        return str(self)
+
+class Stats:
+
+    '''
+        A collection of named Timers. Timers are created on first use and reported in that order.
+    '''
+
+    def __init__(self, size=4096):
+        """
+        Args:
+            size (int, optional): number of recent samples kept by each timer for percentiles. Defaults to 4096.
+        """
+        self.size = size
+        self.timers = {}
+        self.steps = None # name of the timer used for steps/sec
+
+    def timer(self, name):
+        if name not in self.timers:
+            self.timers[name] = Timer(name, size=self.size)
+        return self.timers[name]
+
+    def __getitem__(self, name):
+        return self.timers[name]
+
+    def __contains__(self, name):
+        return name in self.timers
+
+    def __iter__(self):
+        return iter(self.timers.values())
+
+    def steps_per_second(self):
+        ''' Environment steps per second (of the outermost environment). '''
+        if self.steps is None or self.steps not in self.timers:
+            return 0.
+        return self.timers[self.steps].rate()
+
+    def summary(self, q=(50, 90, 99)):
+        """ Summary of each timer.
+
+        Args:
+            q (tuple, optional): percentiles. Defaults to (50, 90, 99).
+
+        Returns:
+            dict: name -> {'count', 'total', 'mean', 'p50', ...} (seconds)
+        """
+        result = {}
+        for name, timer in self.timers.items():
+            result[name] = dict(count=timer.count, total=timer.total, mean=timer.mean)
+            result[name].update({"p{0}".format(p):v for p, v in zip(q, np.atleast_1d(timer.percentile(list(q))))})
+        return result
+
+    def reset(self):
+        for timer in self.timers.values():
+            timer.reset()
+
+    def __str__(self):
+        lines = ["{0:<40} {1:>9} {2:>10} {3:>10} {4:>10} {5:>10}".format('stage', 'count', 'total(s)', 'mean(ms)', 'p50(ms)', 'p99(ms)')]
+        for name, s in self.summary(q=(50, 99)).items():
+            lines.append("{0:<40} {1:>9} {2:>10.4f} {3:>10.4f} {4:>10.4f} {5:>10.4f}".format(name, s['count'], s['total'], 1000 * s['mean'], 1000 * s['p50'], 1000 * s['p99']))
+        lines.append("steps/sec: {0:.1f}".format(self.steps_per_second()))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return str(self)
+
+def timed(fn, timer):
+    """ Time each call of a function.
+
+    Args:
+        fn (callable): function
+        timer (Timer): records the duration of each call.
+
+    Returns:
+        callable: the timed function
+    """
+    add = timer.add
+    def _timed(*args, **kwargs):
+        start = clock()
+        result = fn(*args, **kwargs)
+        add(start, clock())
+        return result
+    _timed.__wrapped__ = fn
+    return _timed
+
+METHODS = ('step', 'reset', 'observation', 'fast_transform')
+
+def _label(env):
+    mode = getattr(env, 'mode', None) # e.g. wrappers.ObservationWrapper
+    if hasattr(mode, 'observation_space'):
+        return "{0}[{1}]".format(type(env).__name__, type(mode).__name__.split('_')[-1].lower())
+    return type(env).__name__
+
+def instrument(env, stats):
+    """ Time the step, reset and observation (transform) methods of each layer of a wrapped environment. The
+        methods are replaced on the instances (see ``uninstrument``), times are inclusive of the inner layers
+        e.g. '0:Stack.step' includes '1:ObservationWrapper[atari].step'. Timers are named '<depth>:<layer>.<method>'.
+
+    Args:
+        env (gym.Env): environment (possibly wrapped).
+        stats (Stats): to record times.
+
+    Returns:
+        gym.Env: env
+    """
+    uninstrument(env)
+    layer, depth = env, 0
+    while layer is not None:
+        label = "{0}:{1}".format(depth, _label(layer))
+        for method in METHODS:
+            if callable(getattr(type(layer), method, None)): # not forwarded by gym.Wrapper.__getattr__
+                fn = getattr(layer, method)
+                setattr(layer, method, timed(fn, stats.timer("{0}.{1}".format(label, method))))
+        if depth == 0:
+            stats.steps = "{0}.step".format(label)
+        layer, depth = getattr(layer, 'env', None), depth + 1
+    return env
+
+def uninstrument(env):
+    """ Remove the timing of an environment (see ``instrument``).
+
+    Args:
+        env (gym.Env): environment (possibly wrapped).
+
+    Returns:
+        gym.Env: env
+    """
+    layer = env
+    while layer is not None:
+        for method in METHODS:
+            if hasattr(layer.__dict__.get(method, None), '__wrapped__'):
+                del layer.__dict__[method]
+        layer = getattr(layer, 'env', None)
+    return env
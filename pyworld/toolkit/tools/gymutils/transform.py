@@ -9,7 +9,7 @@ author: Benedict Wilkins
 import gym
 import numpy as np
 import cv2
-from collections import namedtuple
+from collections import namedtuple, deque
 #from enum import Enum
 
 from ..visutils import transform as T
@@ -36,9 +36,63 @@ def stack(states, frames=3, copy=True):
         stacked = np.copy(stacked)
     return stacked
 
+class LazyFrames(np.lib.mixins.NDArrayOperatorsMixin):
 
+    '''
+        A lazy stack of frames, frames are concatenated along axis only when converted to an array (np.asarray, 
+        torch.from_numpy via torchutils.from_numpy, arithmetic, indexing, transpose, reshape). Consecutive stacks 
+        share their frames, so storing stacks (e.g. in a replay buffer) stores each frame once. Frames must not be 
+        modified after they are stacked.
+    '''
+
+    __slots__ = ('frames', 'axis')
+
+    def __init__(self, frames, axis=0):
+        self.frames = tuple(frames)
+        self.axis = axis
+
+    def __array__(self, dtype=None):
+        array = np.concatenate(self.frames, axis=self.axis)
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = [np.asarray(x) if isinstance(x, LazyFrames) else x for x in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    @property
+    def shape(self):
+        shape = list(self.frames[0].shape)
+        shape[self.axis] = sum(frame.shape[self.axis] for frame in self.frames)
+        return tuple(shape)
+
+    @property
+    def dtype(self):
+        return self.frames[0].dtype
+
+    @property
+    def ndim(self):
+        return self.frames[0].ndim
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        return np.asarray(self)[index]
+
+    def astype(self, dtype):
+        return np.asarray(self, dtype=dtype)
+
+    def transpose(self, *axes):
+        return np.asarray(self).transpose(*axes)
 
+    def reshape(self, *shape, **kwargs):
+        return np.asarray(self).reshape(*shape, **kwargs)
 
+    def __str__(self):
+        return "LazyFrames({0}, {1})".format(self.shape, self.dtype)
+
+    def __repr__(self):
+        return str(self)
 
 def maxpool(state, factor=2): #TODO...
     input_size = 128
@@ -102,14 +156,12 @@ class __OM_Stack:
         self.observation_space = gym.spaces.Box(low=low, high=high, shape=(
             env.observation_space.shape[0] * stack, *env.observation_space.shape[1:]), dtype=env.observation_space.dtype)
 
-        self.states = np.zeros(
-            (stack*channels, *env.observation_space.shape[1:]), dtype=self.observation_space.dtype)
-        self.indx = (np.arange(0, stack) - 1) % stack
+        # ring buffer of frames, most recent first, each frame is a distinct array (frames are compared by identity)
+        self.states = deque([np.zeros(env.observation_space.shape, dtype=self.observation_space.dtype) for _ in range(stack)], maxlen=stack)
 
     def __call__(self, state):
-        self.states = self.states[self.indx]  # this will make a copy
-        self.states[0] = state[0]
-        return self.states
+        self.states.appendleft(state[:1])
+        return LazyFrames(self.states, axis=0)
 
 
 class __OM_Gray:
@@ -196,6 +248,33 @@ class __OM_Default:
         return img.reshape((*img.shape, 1)).astype(np.float32)
 
 
+class __OM_Atari:
+
+    '''
+        The same preprocessing as __OM_Default (grey, crop, resize to 84x84) but frames stay uint8 [0-255] and the 
+        operations are done in the cheapest order: the crop (a view) is done first on the raw frame, greyscale 
+        conversion writes into a reused buffer, only the final (small) resized frame is allocated. Normalise at 
+        batch time, e.g. with GymIterator(...).Float.
+    '''
+
+    def __init__(self, env, shape=(84, 84), rows=(34, 195)):
+        assert_box(env.observation_space)
+        assert_interval(env.observation_space)
+        h, w, c = env.observation_space.shape
+        assert c == 3
+        self.rows = slice(*rows) # rows 18:102 of the frame resized to (84, 110), in raw frame coordinates
+        self.shape = shape
+        self.grey = np.empty((rows[1] - rows[0], w), dtype=np.uint8)
+        self.observation_space = gym.spaces.Box(
+            low=0, high=255, shape=(*shape, 1), dtype=np.uint8)
+
+    def __call__(self, state):
+        cv2.cvtColor(state[self.rows], cv2.COLOR_RGB2GRAY, dst=self.grey)
+        img = np.empty(self.observation_space.shape, dtype=np.uint8) # new array, frames may be kept (see LazyFrames)
+        cv2.resize(self.grey, self.shape[::-1], dst=img[:, :, 0], interpolation=cv2.INTER_AREA)
+        return img
+
+
 class __OM_CHW:
 
     '''
@@ -251,5 +330,5 @@ class observation_mode(Enum):
     default = __OM_Default
 '''
 
-mode = namedtuple('observation_transform', 'gray interval crop resize binary chw stack default')(
-    __OM_Gray, __OM_Interval, __OM_Crop, __OM_Resize, __OM_Binary, __OM_CHW, __OM_Stack, __OM_Default)
+mode = namedtuple('observation_transform', 'gray interval crop resize binary chw stack default atari')(
+    __OM_Gray, __OM_Interval, __OM_Crop, __OM_Resize, __OM_Binary, __OM_CHW, __OM_Stack, __OM_Default, __OM_Atari)
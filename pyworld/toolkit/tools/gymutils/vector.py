@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorised environments - N environments that are stepped in lockstep. States, rewards and dones are
+stacked along a new leading (batch) axis so that a policy can be called once per step on a (N, ...) batch.
+
+Created on 2026-10-16 10:12:41
+
+author: Benedict Wilkins
+"""
+import numpy as np
+
+from . import policy as P
+
+class VectorEnv:
+
+    '''
+        A collection of N environments that are stepped in lockstep.
+
+        Example:
+            venv = VectorEnv(lambda: gym.make('ObjectMover-v0'), n=8)
+            states = venv.reset()                     # (8, 1, 64, 64)
+            states, rewards, dones, infos = venv.step(np.zeros(8, dtype=np.int64))
+    '''
+
+    def __init__(self, envs, n=None):
+        """
+        Args:
+            envs (list, callable): a list of environments, or a factory (with no arguments) that creates an environment.
+            n (int, optional): number of environments to create when envs is a factory. Defaults to None.
+        """
+        if callable(envs):
+            assert n is not None and n > 0 # number of environments must be given with a factory
+            envs = [envs() for _ in range(n)]
+        self.envs = list(envs)
+        assert len(self.envs) > 0
+        assert n is None or n == len(self.envs)
+
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+
+    @property
+    def n(self):
+        return len(self.envs)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self, done=None):
+        """ Reset environments.
+
+        Args:
+            done (numpy.ndarray, optional): boolean mask (N,) of the environments to reset. Defaults to None (reset all).
+
+        Returns:
+            numpy.ndarray: initial states (K, ...) of the K environments that were reset (in order).
+        """
+        if done is None:
+            return np.stack([env.reset() for env in self.envs])
+        return np.stack([self.envs[i].reset() for i in np.flatnonzero(done)])
+
+    def step(self, actions):
+        """ Step each environment with its action.
+
+        Args:
+            actions (numpy.ndarray, list): actions (N, ...)
+
+        Returns:
+            tuple: states (N, ...), rewards (N,), dones (N,), infos (list)
+        """
+        assert len(actions) == len(self.envs)
+        states, rewards, dones, infos = zip(*[env.step(action) for env, action in zip(self.envs, actions)])
+        return np.stack(states), np.array(rewards), np.array(dones, dtype=bool), list(infos)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __str__(self):
+        return "VectorEnv({0}x{1})".format(len(self.envs), self.envs[0])
+
+    def __repr__(self):
+        return str(self)
+
+def uniform(action_space):
+    """ Uniform random (batch) policy for a discrete action space, selects one action per state in a batch.
+
+    Args:
+        action_space (gym.spaces.Discrete): action space
+
+    Returns:
+        callable: the policy, actions = policy(states)
+    """
+    return P.uniform(action_space).sample_batch
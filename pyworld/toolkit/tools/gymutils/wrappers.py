@@ -12,62 +12,161 @@ import copy
 from collections import deque
 
 from . import transform
+from . import record
 
-from ..fileutils import save as fu_save
+from .. import datautils as du
 from ..visutils import transform as T
 
 import skimage
 
 class EpisodeRecordWrapper(gym.Wrapper):
 
-    def __init__(self, env, path, compress=True):
+    '''
+        Records episodes (state, action, reward) to an HDF5 file (see ``record.ChunkWriter``). Steps are 
+        collected into fixed size chunks that are written by a background thread. At index t: the state, the 
+        action taken in it, and the reward received on arriving in it. The final action of an episode is -1 
+        (nan for continuous actions), the first reward is 0. Call close to write any remaining data.
+    '''
+
+    def __init__(self, env, path, compress=True, chunk=256, maxsize=8):
+        """
+        Args:
+            env (gym.Env): environment to record.
+            path (str): HDF5 file, episodes are appended if it exists.
+            compress (bool, str, optional): compression of states, True for lzf or any h5py filter. Defaults to True.
+            chunk (int, optional): number of steps in each chunk. Defaults to 256.
+            maxsize (int, optional): maximum number of chunks queued for writing. Defaults to 8.
+        """
         super(EpisodeRecordWrapper, self).__init__(env)
-        self.states = []
-        self.actions = []
-        self.rewards = []
+        self.writer = record.ChunkWriter(path, compress=compress, maxsize=maxsize, chunk=chunk)
+        self.chunk = chunk
+        self.collector = None
+        self.episode = self.writer.episodes - 1
 
         self.state_t = None
         self.reward_t = None
-
         self.path = path
-
         self.already_done = False
 
+        action_dtype = np.dtype(self.action_space.dtype if self.action_space.dtype is not None else np.int64)
+        self.final_action = np.nan if action_dtype.kind == 'f' else -1
+        self.dtypes = (self.observation_space.dtype, action_dtype, np.float64) # rewards may begin as ints
+
+    def __append(self, state, action, reward):
+        self.collector.append((state, action, reward))
+        if len(self.collector) == self.chunk:
+            self.__flush()
+
+    def __flush(self):
+        if self.collector is not None and len(self.collector) > 0:
+            state, action, reward = self.collector.arrays()
+            self.writer.write(self.episode, state=state, action=action, reward=reward)
+            self.collector = du.Collector(self.chunk, dtypes=self.dtypes) # the arrays now belong to the writer
+
     def step(self, action_t):
         assert not self.already_done #dont save multiple times just because someone isnt calling reset!
          
         state, reward, done, info = self.env.step(action_t)
-        state = np.copy(state)
-
-
-        self.states.append(self.state_t)
-        self.actions.append(action_t)
-        self.rewards.append(self.reward_t)
 
+        self.__append(self.state_t, action_t, self.reward_t)
         self.state_t = state
         self.reward_t = reward
 
         if done:
-            self.states.append(self.state_t)
-            self.actions.append(np.nan)
-            self.rewards.append(self.reward_t)
-            
-            print("SAVING: {0:<5} frames (states, actions, rewards)".format(len(self.states)))
-            fu_save(self.path, {"state":self.states,"action":self.actions,"reward":self.rewards}, overwrite=False, force=True)
-
-            self.states.clear()
-            self.actions.clear()
-            self.rewards.clear()
+            self.__append(self.state_t, self.final_action, self.reward_t)
+            self.__flush()
+            self.writer.end(self.episode)
             self.already_done = True
         
         return state, reward, done, info
 
     def reset(self, **kwargs):
+        self.__flush() # an unfinished episode
         self.state_t = self.env.reset(**kwargs)
         self.reward_t = 0.
         self.already_done = False
+        self.episode += 1
+        self.collector = du.Collector(self.chunk, dtypes=self.dtypes)
         return self.state_t
 
+    def close(self):
+        try:
+            self.__flush()
+        finally:
+            self.writer.close()
+        return self.env.close()
+
+class ActionRecordWrapper(gym.Wrapper):
+
+    '''
+        Records episodes of a deterministic environment as action logs (see ``record.ActionLogReader``): the seed, 
+        actions, rewards and a checkpoint of the environment state every ``checkpoint`` steps. States are not 
+        stored, they are regenerated by replaying the actions. The (unwrapped) environment must implement 
+        clone_full_state, restore_full_state and _get_obs (as Atari environments do).
+    '''
+
+    def __init__(self, env, path, seed=None, checkpoint=100, maxsize=8):
+        """
+        Args:
+            env (gym.Env): deterministic environment to record, e.g. ObjectMover.
+            path (str): HDF5 file, episodes are appended if it exists.
+            seed (int, optional): seed of the environment. Defaults to None.
+            checkpoint (int, optional): number of steps between checkpoints. Defaults to 100.
+            maxsize (int, optional): maximum number of episodes queued for writing. Defaults to 8.
+        """
+        super(ActionRecordWrapper, self).__init__(env)
+        assert checkpoint > 0
+        self.writer = record.ChunkWriter(path, maxsize=maxsize)
+        self.episode = self.writer.episodes - 1
+        self.path = path
+        self.record_seed = seed
+        if seed is not None:
+            self.env.seed(seed)
+        self.checkpoint = checkpoint
+        self.action_dtype = np.int8 if isinstance(self.action_space, gym.spaces.Discrete) and self.action_space.n <= 127 else np.int64
+        self.already_done = True
+
+    def __checkpoint(self):
+        self.checkpoints.append(np.asarray(self.env.unwrapped.clone_full_state()))
+
+    def __write(self, done):
+        if self.already_done or len(self.actions) == 0: # nothing to write (e.g. reset twice)
+            return
+        actions = np.array(self.actions + [-1], dtype=self.action_dtype)
+        self.writer.write(self.episode, action=actions, reward=np.array(self.rewards, dtype=np.float32), checkpoint=np.stack(self.checkpoints))
+        attrs = dict(length=len(actions), interval=self.checkpoint, done=done)
+        if self.record_seed is not None:
+            attrs['seed'] = self.record_seed
+        if self.env.spec is not None:
+            attrs['env'] = self.env.spec.id
+        self.writer.end(self.episode, **attrs)
+        self.already_done = True
+
+    def step(self, action):
+        assert not self.already_done
+        state, reward, done, info = self.env.step(action)
+        self.actions.append(action)
+        self.rewards.append(reward)
+        if len(self.actions) % self.checkpoint == 0:
+            self.__checkpoint()
+        if done:
+            self.__write(True)
+        return state, reward, done, info
+
+    def reset(self, **kwargs):
+        self.__write(False) # an unfinished episode
+        state = self.env.reset(**kwargs)
+        self.episode += 1
+        self.actions, self.rewards, self.checkpoints = [], [0.], []
+        self.already_done = False
+        self.__checkpoint()
+        return state
+
+    def close(self):
+        self.__write(False)
+        self.writer.close()
+        return self.env.close()
+
 class ResetEnvWrapper(gym.Wrapper): #TODO refactor
     
     def __init__(self, env_name, env_snapshot):
@@ -193,14 +292,17 @@ class Crop(gym.Wrapper):
 
 class Atari(gym.Wrapper):
 
-    def __init__(self, env):
+    def __init__(self, env, integer=False):
         super(Atari, self).__init__(env)
         h,w,c = self.observation_space.shape
         assert c == 3 # invalid channels
         h -= (h//2)
         w -= (w//2)
-        self.observation_space = gym.spaces.Box(np.float32(0), np.float32(1), shape=(1,h,w), dtype=np.float32)
-       
+        self.integer = integer
+        if integer: # uint8 [0-255], normalise at batch time
+            self.observation_space = gym.spaces.Box(np.uint8(0), np.uint8(255), shape=(c,h,w), dtype=np.uint8)
+        else:
+            self.observation_space = gym.spaces.Box(np.float32(0), np.float32(1), shape=(c,h,w), dtype=np.float32)
 
     def fast_transform(self, observation):
         observation = observation.transpose((2,0,1)) #to CHW
@@ -209,8 +311,10 @@ class Atari(gym.Wrapper):
         #observation = (observation[0, ...] * components[0] + 
         #               observation[1, ...] * components[1] + 
         #               observation[2, ...] * components[2])[np.newaxis, ...]
-        observation = observation.astype(np.float32) / 255. #to float
-        return observation
+        if self.integer:
+            return np.ascontiguousarray(observation)
+        out = np.empty(observation.shape, dtype=np.float32)
+        return np.divide(observation, np.float32(255.), out=out) #to float, in a single pass
 
     def step(self, action, *args, **kwargs):
         observation, *rest = self.env.step(action)
@@ -225,28 +329,37 @@ class Atari(gym.Wrapper):
 
 class Stack(gym.Wrapper):
 
-    def __init__(self, env, n=3):
+    '''
+        Stacks the n most recent observations along the channel axis. With lazy=True observations are given as 
+        ``transform.LazyFrames`` which share their frames (e.g. for a replay.ReplayBuffer), otherwise as numpy arrays.
+    '''
+
+    def __init__(self, env, n=3, lazy=False):
         super(Stack, self).__init__(env)
         shape = list(self.observation_space.shape)
         channel = np.isin(shape, [1,3,4])
-        print(channel, np.sum(channel))
         if np.sum(channel) != 1:
             raise ValueError("Invalid channels in observation space: {0}".format(self.observation_space))
         self.__channel = np.argwhere(channel).item()
         shape[self.__channel] = n * shape[self.__channel]
         self.__buffer = deque(maxlen=n)
+        self.lazy = lazy
         self.observation_space = gym.spaces.Box(self.observation_space.low.flat[0], self.observation_space.high.flat[0], shape=shape, dtype=self.observation_space.dtype)
 
+    def __stack(self):
+        frames = transform.LazyFrames(self.__buffer, axis=self.__channel)
+        return frames if self.lazy else np.asarray(frames)
+
     def step(self, *args, **kwargs):
         state, *rest = super(Stack, self).step(*args, **kwargs)
         self.__buffer.append(state)
-        return (np.concatenate(self.__buffer, axis=self.__channel), *rest)
+        return (self.__stack(), *rest)
 
     def reset(self, *args, **kwargs):
         state = super(Stack, self).reset(*args, **kwargs)
         for i in range(self.__buffer.maxlen):
             self.__buffer.append(state)
-        return np.concatenate(self.__buffer, axis=self.__channel)
+        return self.__stack()
 
 class ResetSkip(gym.Wrapper):
 
@@ -263,6 +376,37 @@ class ResetSkip(gym.Wrapper):
             state, *rest = self.step(0)
         return state
 
+class MaxSkip(gym.Wrapper):
+
+    '''
+        Repeats each action n times, rewards are summed and the observation is the (pixel-wise) max of the 
+        last two raw frames (removes flickering in Atari games). Apply before any observation transform, e.g. 
+        Stack(Float(Atari(MaxSkip(gym.make('PongNoFrameskip-v4'), n=4))), n=3)
+    '''
+
+    def __init__(self, env, n=4):
+        super(MaxSkip, self).__init__(env)
+        assert n > 0
+        self.n = n
+        self.__buffer = np.zeros((2, *self.observation_space.shape), dtype=self.observation_space.dtype)
+
+    def step(self, action, *args, **kwargs):
+        total_reward = 0.
+        for i in range(self.n):
+            observation, reward, done, info = self.env.step(action)
+            self.__buffer[i % 2] = observation
+            total_reward += reward
+            if done:
+                break
+        if i == 0: # only one frame
+            observation = self.__buffer[0].copy()
+        else:
+            observation = np.maximum(self.__buffer[0], self.__buffer[1]) # last two frames
+        return observation, total_reward, done, info
+
+    def reset(self, *args, **kwargs):
+        return self.env.reset(*args, **kwargs)
+
 import inspect
 import sys
 import re
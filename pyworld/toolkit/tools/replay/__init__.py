@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Created on 17-10-2026 09:10:21
+
+    Replay memory.
+"""
+__author__ = "Benedict Wilkins"
+__email__ = "benrjw@gmail.com"
+__status__ = "Development"
+
+from . import buffer
+from . import tree
+from . import prioritised
+
+from .buffer import ReplayBuffer
+from .prioritised import PrioritisedReplayBuffer
+
+__all__ = ('buffer', 'tree', 'prioritised', 'ReplayBuffer', 'PrioritisedReplayBuffer')
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ring buffer replay memory. Observations are stored once (as frames), states and next states of transitions are
+rebuilt from indices when sampled.
+
+Example:
+    buffer = ReplayBuffer(100000, env.observation_space, env.action_space)
+    for state, action, reward, nstate in gu.iterators.GymIterator(env, policy, mode=gu.mode.sars):
+        buffer.append(state, action, reward, nstate, done)
+    states, actions, rewards, nstates, dones = buffer.sample(64)
+
+Created on 2026-10-17 09:12:45
+
+author: Benedict Wilkins
+"""
+import numpy as np
+
+class ReplayBuffer:
+
+    '''
+        A fixed size replay memory of transitions (state, action, reward, nstate, done). Each observation is stored
+        once as a frame in a preallocated ring buffer, the next state of a transition is the frame that follows
+        its state. With stack > 1 observations are stacks of frames ordered oldest to newest (as given by 
+        gymutils.wrappers.Stack), only the most recent frame of each observation is stored and stacks are rebuilt 
+        from the preceding frames of the episode. Stacks in any other order (e.g. the newest first stacks of the 
+        ObservationWrapper stack mode) are rejected.
+    '''
+
+    def __init__(self, size, observation_space, action_space, stack=1, axis=0, rng=None):
+        """
+        Args:
+            size (int): maximum number of frames (and transitions) stored.
+            observation_space (gym.spaces.Box): observation space of the environment.
+            action_space (gym.spaces.Space): action space of the environment.
+            stack (int, optional): number of frames in each observation. Defaults to 1.
+            axis (int, optional): axis along which frames are stacked. Defaults to 0 (CHW format).
+            rng (numpy.random.RandomState, optional): used to sample. Defaults to None (numpy.random).
+        """
+        assert size > stack
+        shape = list(observation_space.shape)
+        if shape[axis] % stack != 0:
+            raise ValueError("Observation space {0} cannot be split into {1} frames along axis {2}".format(observation_space, stack, axis))
+        self.channels = shape[axis] // stack
+        shape[axis] = self.channels
+        self.size = size
+        self.stack = stack
+        self.axis = axis
+        self.rng = np.random if rng is None else rng
+
+        self.frames = np.empty((size, *shape), dtype=observation_space.dtype)
+        self.actions = np.empty((size, *action_space.shape), dtype=action_space.dtype)
+        self.rewards = np.empty(size, dtype=np.float32)
+        self.dones = np.zeros(size, dtype=bool)
+        self.first = np.zeros(size, dtype=bool)  # frame is the first of its episode
+        self.valid = np.zeros(size, dtype=bool)  # frame is the state of a transition (its next state is stored)
+
+        self.head = 0       # next frame to write
+        self.count = 0      # number of frames stored
+        self.n = 0          # number of (valid) transitions stored
+        self._last = None   # most recent observation (the next state of the most recent transition)
+
+    def __len__(self):
+        return self.n
+
+    def _frame(self, observation):
+        if self.stack == 1:
+            return observation
+        if hasattr(observation, 'frames'): # gymutils.transform.LazyFrames, nothing is copied
+            return observation.frames[-1]
+        index = [slice(None)] * np.ndim(observation)
+        index[self.axis] = slice(-self.channels, None)
+        return np.asarray(observation)[tuple(index)]
+
+    def _check(self, state, nstate):
+        # the frames of nstate must be those of state shifted by one (oldest to newest), otherwise the stacks 
+        # rebuilt from the stored (most recent) frames would be wrong
+        if hasattr(state, 'frames') and hasattr(nstate, 'frames'): # gymutils.transform.LazyFrames
+            ordered = nstate.frames[-2] is state.frames[-1]
+        else:
+            index, nindex = [slice(None)] * np.ndim(state), [slice(None)] * np.ndim(nstate)
+            index[self.axis], nindex[self.axis] = slice(self.channels, None), slice(None, -self.channels)
+            ordered = np.array_equal(np.asarray(state)[tuple(index)], np.asarray(nstate)[tuple(nindex)])
+        if not ordered:
+            raise ValueError("Stacked observations must be ordered oldest to newest (see gymutils.wrappers.Stack)")
+
+    def _write(self, observation, first):
+        i = self.head
+        self.n -= self.valid[i]
+        self.valid[i] = False
+        self.first[i] = first
+        self.frames[i] = self._frame(observation)
+        self.head = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        return i
+
+    def append(self, state, action, reward, nstate, done):
+        """ Append a transition. A new episode is started if state is not the next state of the previous transition.
+
+        Args:
+            state (numpy.ndarray): state
+            action (numpy.ndarray, int): action
+            reward (float): reward
+            nstate (numpy.ndarray): next state
+            done (bool): whether nstate is the final state of the episode
+
+        Returns:
+            int: index of the transition
+        """
+        if self.stack > 1:
+            self._check(state, nstate)
+        if self._last is None or state is not self._last:
+            self._write(state, True)
+        i = (self.head - 1) % self.size
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self._write(nstate, False)
+        self.valid[i] = True
+        self.n += 1
+        self._last = None if done else nstate
+        return i
+
+    def _index(self, batch_size):
+        ''' Sample indices of valid transitions whose states (all of their frames) are still stored. '''
+        if self.n == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        # age of the oldest state whose frames are all still stored, until the buffer is full the oldest frame 
+        # is the first of its episode
+        oldest = self.count - 1 if self.count < self.size else self.size - self.stack
+        # sample ages (1 is the most recent state that has a next state) in the filled range, only the final 
+        # states of episodes are rejected
+        index = np.empty(batch_size, dtype=np.int64)
+        invalid = np.arange(batch_size)
+        while len(invalid) > 0:
+            index[invalid] = (self.head - 1 - self.rng.randint(1, oldest + 1, size=len(invalid))) % self.size
+            invalid = invalid[~self.valid[index[invalid]]]
+        return index
+
+    def _stack(self, index):
+        ''' Rebuild (stacked) observations from the frames that end at index. '''
+        if self.stack == 1:
+            return self.frames[index]
+        indices = np.empty((len(index), self.stack), dtype=np.int64)
+        indices[:, -1] = index
+        for k in range(self.stack - 2, -1, -1): # repeat the first frame of an episode (as gymutils.wrappers.Stack)
+            i = indices[:, k+1]
+            indices[:, k] = np.where(self.first[i], i, (i - 1) % self.size)
+        frames = self.frames[indices] # (B, stack, *frame_shape)
+        frames = np.moveaxis(frames, 1, self.axis + 1)
+        shape = list(frames.shape)
+        shape[self.axis + 1:self.axis + 3] = [shape[self.axis + 1] * shape[self.axis + 2]]
+        return frames.reshape(shape)
+
+    def sample(self, batch_size=64):
+        """ Sample a batch of transitions (uniformly, with replacement).
+
+        Args:
+            batch_size (int, optional): number of transitions. Defaults to 64.
+
+        Returns:
+            tuple: states, actions, rewards, nstates, dones as (contiguous) arrays.
+        """
+        index = self._index(batch_size)
+        return self.get(index)
+
+    def get(self, index):
+        """ Get transitions by index (see ``sample``).
+
+        Args:
+            index (numpy.ndarray): indices of (valid) transitions.
+
+        Returns:
+            tuple: states, actions, rewards, nstates, dones
+        """
+        nindex = (index + 1) % self.size
+        return self._stack(index), self.actions[index], self.rewards[index], self._stack(nindex), self.dones[index]
+
+    def clear(self):
+        """ Remove all transitions, the arrays are reused. """
+        self.valid[:] = False
+        self.head = self.count = self.n = 0
+        self._last = None
+
+    def __str__(self):
+        return "ReplayBuffer({0}/{1})".format(self.n, self.size)
+
+    def __repr__(self):
+        return str(self)
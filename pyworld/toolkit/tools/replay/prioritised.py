@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prioritised experience replay (Schaul et al. 2015) backed by a sum-tree (sampling) and a min-tree (importance
+weights). Sampling and batched priority updates are O(log N).
+
+Example:
+    buffer = PrioritisedReplayBuffer(100000, env.observation_space, env.action_space, alpha=0.6, beta=0.4)
+    ...
+    states, actions, rewards, nstates, dones, weights, index = buffer.sample(64)
+    td = ...
+    buffer.update(index, td)
+
+Created on 2026-10-17 10:21:40
+
+author: Benedict Wilkins
+"""
+import numpy as np
+
+from .buffer import ReplayBuffer
+from .tree import SumTree, MinTree
+
+class PrioritisedReplayBuffer(ReplayBuffer):
+
+    '''
+        A ReplayBuffer whose transitions are sampled in proportion to their priority. In proportional mode the
+        priority of a transition is (|td| + eps)^alpha, in rank mode it is (1 / rank)^alpha where rank is the rank
+        of |td| among the stored transitions. Ranks are recomputed (sorted) after every N updates, in between
+        the rank of an updated transition is found by binary search in the last sorted priorities. New
+        transitions are given the maximum priority.
+    '''
+
+    modes = ('proportional', 'rank')
+
+    def __init__(self, size, observation_space, action_space, alpha=0.6, beta=0.4, eps=1e-6, mode='proportional', stack=1, axis=0, rng=None):
+        """
+        Args:
+            size (int): maximum number of frames (and transitions) stored.
+            observation_space (gym.spaces.Box): observation space of the environment.
+            action_space (gym.spaces.Space): action space of the environment.
+            alpha (float, optional): prioritisation exponent, 0 is uniform sampling. Defaults to 0.6.
+            beta (float, optional): importance weight exponent, 1 fully compensates for non-uniform sampling. Defaults to 0.4.
+            eps (float, optional): added to |td| so that no transition has 0 priority. Defaults to 1e-6.
+            mode (str, optional): 'proportional' or 'rank'. Defaults to 'proportional'.
+            stack (int, optional): number of frames in each observation (see ReplayBuffer). Defaults to 1.
+            axis (int, optional): axis along which frames are stacked. Defaults to 0.
+            rng (numpy.random.RandomState, optional): used to sample. Defaults to None (numpy.random).
+        """
+        if mode not in PrioritisedReplayBuffer.modes:
+            raise ValueError("Invalid mode: {0}, must be one of {1}".format(mode, PrioritisedReplayBuffer.modes))
+        super(PrioritisedReplayBuffer, self).__init__(size, observation_space, action_space, stack=stack, axis=axis, rng=rng)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.mode = mode
+        self.sum_tree = SumTree(size)
+        self.min_tree = MinTree(size)
+        self.priorities = np.zeros(size, dtype=np.float64) # |td| + eps
+        self.max_priority = 1.
+        self._sorted = np.empty(0) # priorities at the last sort (rank mode)
+        self._updates = 0
+        self._stale = [] # transitions that can no longer be sampled, their priorities are set to 0 by append
+
+    def _set(self, index, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.sum_tree.update(index, values)
+        self.min_tree.update(index, np.where(values > 0, values, np.inf))
+
+    def _write(self, observation, first):
+        i = super(PrioritisedReplayBuffer, self)._write(observation, first)
+        # the transition at i (and those whose stacks include frame i) can no longer be sampled
+        self._stale.extend((i + k) % self.size for k in range(self.stack))
+        return i
+
+    def append(self, state, action, reward, nstate, done):
+        i = super(PrioritisedReplayBuffer, self).append(state, action, reward, nstate, done)
+        self.priorities[i] = self.max_priority
+        # a single update of each tree, the new transition is last (it is also stale, its frame was overwritten)
+        index, self._stale = self._stale + [i], []
+        values = [0.] * (len(index) - 1) + [1. if self.mode == 'rank' else self.max_priority ** self.alpha] # rank 1
+        self._set(index, values)
+        return i
+
+    def update(self, index, td):
+        """ Update the priorities of (sampled) transitions.
+
+        Args:
+            index (numpy.ndarray): indices of the transitions (as given by ``sample``).
+            td (numpy.ndarray): td errors (or any other priority) of the transitions.
+        """
+        index = np.asarray(index)
+        priorities = np.abs(np.asarray(td, dtype=np.float64)) + self.eps
+        self.priorities[index] = priorities
+        self.max_priority = max(self.max_priority, priorities.max())
+        if self.mode == 'proportional':
+            self._set(index, priorities ** self.alpha)
+        else:
+            self._updates += len(index)
+            if self._updates >= len(self):
+                self._sort()
+            else: # rank (1 = highest priority) among the priorities at the last sort
+                rank = len(self._sorted) - np.searchsorted(self._sorted, priorities, side='right') + 1
+                self._set(index, (1. / rank) ** self.alpha)
+
+    def _sort(self):
+        index = np.flatnonzero(self.sum_tree[np.arange(self.size)] > 0)
+        priorities = self.priorities[index]
+        rank = np.empty(len(index), dtype=np.float64)
+        rank[np.argsort(-priorities, kind='stable')] = np.arange(1, len(index) + 1)
+        self._set(index, (1. / rank) ** self.alpha)
+        self._sorted = np.sort(priorities)
+        self._updates = 0
+
+    def _index(self, batch_size):
+        if self.n == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        total = self.sum_tree.total()
+        # stratified sampling, one sample from each of batch_size equal segments of the total priority
+        values = (np.arange(batch_size) + self.rng.uniform(size=batch_size)) * (total / batch_size)
+        index = self.sum_tree.find(values)
+        invalid = np.flatnonzero(self.sum_tree[index] <= 0) # possible due to floating point error
+        while len(invalid) > 0:
+            index[invalid] = self.sum_tree.find(self.rng.uniform(size=len(invalid)) * total)
+            invalid = invalid[self.sum_tree[index[invalid]] <= 0]
+        return index
+
+    def sample(self, batch_size=64, beta=None):
+        """ Sample a batch of transitions in proportion to their priority.
+
+        Args:
+            batch_size (int, optional): number of transitions. Defaults to 64.
+            beta (float, optional): importance weight exponent. Defaults to None (self.beta).
+
+        Returns:
+            tuple: states, actions, rewards, nstates, dones, importance weights (normalised by their maximum) and indices (see ``update``).
+        """
+        beta = self.beta if beta is None else beta
+        index = self._index(batch_size)
+        # w_i = (N P(i))^-beta / max_j (N P(j))^-beta = (p_i / min_j p_j)^-beta
+        weights = (self.sum_tree[index] / self.min_tree.min()) ** (-beta)
+        return (*self.get(index), weights.astype(np.float32), index)
+
+    def clear(self):
+        super(PrioritisedReplayBuffer, self).clear()
+        self.sum_tree.clear()
+        self.min_tree.clear()
+        self.max_priority = 1.
+        self._sorted = np.empty(0)
+        self._updates = 0
+        self._stale = []
+
+    def __str__(self):
+        return "PrioritisedReplayBuffer({0}/{1}, {2})".format(self.n, self.size, self.mode)
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+import pyworld.toolkit.tools.gymutils as gu
+from pyworld.toolkit.tools.replay import ReplayBuffer
+from pyworld.toolkit.tools.gymutils.test.dummy import DummyEnv
+
+ITER_LIMIT = 5
+
+class EpisodeEnv(DummyEnv):
+
+    ''' The state at step i of episode e is filled with 10 * e + i, the reward of step i is i. '''
+
+    def __init__(self):
+        super(EpisodeEnv, self).__init__(ITER_LIMIT, shape=(1,2,2), dtype=np.uint8)
+        self.episode = 0
+
+    def step(self, action):
+        state, _, done, info = super(EpisodeEnv, self).step(action)
+        return state, float(self.i), done, info
+
+    def reset(self):
+        self.episode += 1
+        return super(EpisodeEnv, self).reset()
+
+    def state(self):
+        return super(EpisodeEnv, self).state() + np.uint8(10 * self.episode)
+
+def fill(buffer, env, episodes):
+    for _ in range(episodes):
+        for state, action, reward, nstate in gu.iterators.GymIterator(env, mode=gu.mode.sars):
+            buffer.append(state, action, reward, nstate, env.i >= ITER_LIMIT)
+
+class TestReplayBuffer(unittest.TestCase):
+
+    def test_append(self):
+        env = EpisodeEnv()
+        buffer = ReplayBuffer(100, env.observation_space, env.action_space)
+        fill(buffer, env, 2)
+        self.assertEqual(len(buffer), 2 * ITER_LIMIT)
+        self.assertEqual(buffer.count, 2 * (ITER_LIMIT + 1)) # each frame is stored once
+
+    def test_sample(self):
+        env = EpisodeEnv()
+        buffer = ReplayBuffer(100, env.observation_space, env.action_space)
+        fill(buffer, env, 3)
+        states, actions, rewards, nstates, dones = buffer.sample(256)
+        self.assertEqual(states.shape, (256,1,2,2))
+        self.assertEqual(actions.shape, (256,))
+        self.assertTrue(np.all(nstates == states + 1))
+        self.assertTrue(np.all(rewards == nstates[:,0,0,0] % 10))
+        self.assertTrue(np.all(dones == (rewards == ITER_LIMIT)))
+
+    def test_overwrite(self):
+        env = EpisodeEnv()
+        buffer = ReplayBuffer(8, env.observation_space, env.action_space)
+        fill(buffer, env, 4)
+        self.assertLessEqual(len(buffer), 8)
+        states, _, _, nstates, _ = buffer.sample(256)
+        self.assertTrue(np.all(nstates == states + 1))
+        self.assertTrue(np.all(states[:,0,0,0] >= 30)) # only the most recent episodes remain
+
+    def test_stack(self):
+        env = gu.wrappers.Stack(EpisodeEnv(), n=3, lazy=True)
+        buffer = ReplayBuffer(100, env.observation_space, env.action_space, stack=3, axis=0)
+        self.assertEqual(buffer.frames.shape, (100,1,2,2))
+        expected = {}
+        for _ in range(2):
+            for state, action, reward, nstate in gu.iterators.GymIterator(env, mode=gu.mode.sars):
+                expected[int(np.asarray(state)[-1,0,0])] = (np.asarray(state), np.asarray(nstate))
+                buffer.append(state, action, reward, nstate, env.unwrapped.i >= ITER_LIMIT)
+        states, _, _, nstates, _ = buffer.sample(64)
+        self.assertEqual(states.shape, (64,3,2,2))
+        for state, nstate in zip(states, nstates):
+            self.assertTrue(np.all(expected[int(state[-1,0,0])][0] == state))
+            self.assertTrue(np.all(expected[int(state[-1,0,0])][1] == nstate))
+
+    def test_stack_order(self):
+        env = gu.wrappers.Stack(EpisodeEnv(), n=3, lazy=False)
+        buffer = ReplayBuffer(100, env.observation_space, env.action_space, stack=3, axis=0)
+        fill(buffer, env, 1)
+        self.assertEqual(buffer.sample(8)[0].shape, (8,3,2,2))
+        # the stack mode of ObservationWrapper gives the newest frame first
+        env = gu.wrappers.ObservationWrapper(EpisodeEnv(), gu.wrappers.ObservationWrapper.mode.stack, stack=3)
+        buffer = ReplayBuffer(100, env.observation_space, env.action_space, stack=3, axis=0)
+        self.assertRaises(ValueError, fill, buffer, env, 1)
+
+    def test_sample_sparse(self):
+        env = EpisodeEnv()
+        buffer = ReplayBuffer(10 ** 6, env.observation_space, env.action_space)
+        fill(buffer, env, 1)
+        states, _, _, nstates, _ = buffer.sample(256) # only the filled range is sampled
+        self.assertTrue(np.all(nstates == states + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import unittest
+
+import numpy as np
+import gym
+
+from pyworld.toolkit.tools.replay import PrioritisedReplayBuffer
+from pyworld.toolkit.tools.replay.tree import SumTree, MinTree
+
+class TestTree(unittest.TestCase):
+
+    def test_sum(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), np.array([1., 2., 0., 3., 4.]))
+        self.assertEqual(tree.total(), 10.)
+        self.assertEqual(tree.find([0., 0.99, 1., 2.99, 3., 5.99, 6., 9.99]).tolist(), [0,0,1,1,3,3,4,4])
+        tree.update([1, 1], [5., 0.]) # last value is used
+        self.assertEqual(tree.total(), 8.)
+
+    def test_batch(self):
+        # a batched update (vectorised) and updates of a few leaves (scalar) give the same tree
+        rng = np.random.RandomState(0)
+        index, values = rng.randint(0, 100, size=64), rng.uniform(size=64)
+        batched, scalar = SumTree(100), SumTree(100)
+        batched.update(index, values)
+        for i in range(0, 64, 4):
+            scalar.update(index[i:i+4], values[i:i+4])
+        self.assertTrue(np.allclose(batched.tree, scalar.tree))
+
+    def test_min(self):
+        tree = MinTree(3)
+        tree.update([0, 2], [3., 1.])
+        self.assertEqual(tree.min(), 1.)
+        tree[2] = np.inf
+        self.assertEqual(tree.min(), 3.)
+
+class TestPrioritisedReplayBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.observation_space = gym.spaces.Box(0, 255, shape=(2,), dtype=np.uint8)
+        self.action_space = gym.spaces.Discrete(2)
+
+    def fill(self, buffer, n):
+        state = np.zeros(2, dtype=np.uint8)
+        for i in range(n):
+            nstate = np.full(2, i + 1, dtype=np.uint8)
+            buffer.append(state, 0, float(i), nstate, False)
+            state = nstate
+
+    def test_proportional(self):
+        buffer = PrioritisedReplayBuffer(64, self.observation_space, self.action_space, alpha=1., rng=np.random.RandomState(0))
+        self.fill(buffer, 10)
+        *_, weights, index = buffer.sample(10)
+        self.assertTrue(np.allclose(weights, 1.)) # all have the max priority
+        buffer.update(np.arange(10), np.array([0.] * 9 + [1000.]))
+        states, _, rewards, _, _, weights, index = buffer.sample(100)
+        self.assertGreater(np.mean(index == 9), 0.9)
+        self.assertTrue(np.all(rewards == index))
+        self.assertTrue(np.allclose(weights[index == 9], ((1000. + buffer.eps) / buffer.eps) ** -buffer.beta))
+        self.assertEqual(buffer.max_priority, 1000. + buffer.eps)
+
+    def test_rank(self):
+        buffer = PrioritisedReplayBuffer(64, self.observation_space, self.action_space, alpha=1., mode='rank', rng=np.random.RandomState(0))
+        self.fill(buffer, 10)
+        buffer.update(np.arange(10), np.arange(10)) # sorted, rank of i is 10 - i
+        self.assertTrue(np.allclose(buffer.sum_tree[np.arange(10)], 1. / (10 - np.arange(10))))
+        buffer.update([0], [5.5]) # between 5 and 6
+        self.assertAlmostEqual(buffer.sum_tree[0], 1. / 5) # 6, 7, 8 and 9 are higher
+
+    def test_overwrite(self):
+        buffer = PrioritisedReplayBuffer(8, self.observation_space, self.action_space)
+        self.fill(buffer, 20)
+        *_, index = buffer.sample(100)
+        age = (buffer.head - 1 - index) % buffer.size
+        self.assertTrue(np.all((age >= 1) & (age < 8)))
+
+    def test_append_cost(self):
+        # each append is a single (scalar) update of each tree
+        buffer = PrioritisedReplayBuffer(2 ** 20, self.observation_space, self.action_space)
+        updates = []
+        update = buffer.sum_tree.update
+        buffer.sum_tree.update = lambda index, values: updates.append(len(np.atleast_1d(index))) or update(index, values)
+        self.fill(buffer, 500)
+        self.assertEqual(len(updates), 500)
+        self.assertLessEqual(max(updates), 2 * buffer.stack + 1) # frames of state and nstate, the new transition
+        start = time.perf_counter()
+        self.fill(buffer, 500)
+        self.assertLess((time.perf_counter() - start) / 500, 5e-4) # ~2ms per append with vectorised updates
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Array-backed segment trees (sum and min) with batched O(log N) updates and queries.
+
+Created on 2026-10-17 10:02:17
+
+author: Benedict Wilkins
+"""
+import operator
+
+import numpy as np
+
+class SegmentTree:
+
+    '''
+        A complete binary tree stored in an array, leaves hold values and each node holds op(left, right). 
+        Updates of many leaves are batched, each level of the tree is updated with a single vectorised operation. 
+        Updates of a few leaves (e.g. a new transition) walk up the tree with scalar operations (no numpy overhead).
+    '''
+
+    small = 8 # maximum number of leaves updated with scalar operations
+
+    def __init__(self, size, op, neutral, scalar_op=None):
+        """
+        Args:
+            size (int): number of leaves
+            op (numpy.ufunc): associative binary operation, e.g. numpy.add
+            neutral (float): neutral element of op, the value of empty leaves.
+            scalar_op (callable, optional): op for scalars, e.g. operator.add. Defaults to None (op).
+        """
+        self.size = size
+        self.capacity = 1 << max(0, int(size - 1).bit_length())
+        self.op = op
+        self.scalar_op = op if scalar_op is None else scalar_op
+        self.neutral = neutral
+        self.tree = np.full(2 * self.capacity, neutral, dtype=np.float64)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        return self.tree[self.capacity + np.asarray(index)]
+
+    def __setitem__(self, index, values):
+        self.update(index, values)
+
+    def update(self, index, values):
+        """ Set the values of leaves.
+
+        Args:
+            index (numpy.ndarray, int): leaf indices, if an index is repeated the last value is used.
+            values (numpy.ndarray, float): values
+        """
+        i = self.capacity + np.atleast_1d(index)
+        if len(i) <= SegmentTree.small:
+            return self.__update_small(i.tolist(), np.broadcast_to(values, i.shape).tolist())
+        self.tree[i] = values
+        for _ in range(self.capacity.bit_length() - 1):
+            i = i // 2 # repeated nodes are given the same value
+            self.tree[i] = self.op(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def __update_small(self, nodes, values):
+        tree, item, op = self.tree, self.tree.item, self.scalar_op # python floats, faster than numpy scalars
+        for i, value in zip(nodes, values):
+            tree[i] = value
+        nodes = sorted(set(nodes))
+        while nodes and nodes[0] > 1: # walk up the tree one level at a time, nodes with a common parent are merged
+            parents = []
+            for i in nodes:
+                i //= 2
+                if not parents or parents[-1] != i:
+                    parents.append(i)
+                    tree[i] = op(item(2 * i), item(2 * i + 1))
+            nodes = parents
+
+    def reduce(self):
+        """ op over all leaves. """
+        return self.tree[1]
+
+    def clear(self):
+        self.tree[:] = self.neutral
+
+class SumTree(SegmentTree):
+
+    def __init__(self, size):
+        super(SumTree, self).__init__(size, np.add, 0., operator.add)
+
+    def total(self):
+        return self.tree[1]
+
+    def find(self, values):
+        """ Find leaves by prefix sum, the leaf i such that sum(leaves[:i]) <= value < sum(leaves[:i+1]).
+
+        Args:
+            values (numpy.ndarray): values in [0, total)
+
+        Returns:
+            numpy.ndarray: leaf indices
+        """
+        values = np.array(values, dtype=np.float64)
+        i = np.ones(values.shape, dtype=np.int64)
+        for _ in range(self.capacity.bit_length() - 1): # depth of the tree
+            left = self.tree[2 * i]
+            right = values >= left
+            values -= left * right
+            i = 2 * i + right
+        return i - self.capacity
+
+class MinTree(SegmentTree):
+
+    def __init__(self, size):
+        super(MinTree, self).__init__(size, np.minimum, np.inf, min)
+
+    def min(self):
+        return self.tree[1]
@@ -80,6 +80,8 @@ def from_numpy(x, *y, device='cpu'):
             return tuple([_from_numpy(y) for y in x])
         if isinstance(x, np.ndarray):
             return torch.from_numpy(x).to(device)
+        elif hasattr(x, '__array__'): # e.g. gymutils.transform.LazyFrames
+            return torch.from_numpy(np.asarray(x)).to(device)
         else:
             raise TypeError(type(x))
         
@@ -132,9 +134,19 @@ def to_torch(x):
         return x
     elif isinstance(x, np.ndarray):
         return torch.from_numpy(x)
+    elif hasattr(x, '__array__'): # e.g. gymutils.transform.LazyFrames
+        return torch.from_numpy(np.asarray(x))
     else:
         return torch.Tensor(x) #???
 
+def onehot(x, size, dtype=torch.float32):
+    '''
+        Expand (integer) action indices (N,) or (N,1) to a batch of one-hot vectors (N, size). Actions can be
+        stored as indices (see gymutils.spaces.OneHot) and expanded only when a batch is given to a network.
+    '''
+    x = to_torch(x).reshape(-1).long()
+    return torch.nn.functional.one_hot(x, size).to(dtype)
+
     
 def device(display=True):
     device = None
@@ -30,6 +30,7 @@ from . import colour
 from . import transform
 from . import animation
 from . import detection
+from . import codec
 from . import plot # plotly
 from . import jupyter #IPython visuals that only work well in jupyter...
 
@@ -39,7 +40,7 @@ try: #TODO move somewhere
 except:
     mpy = None
 
-__all__ = ('transform', 'animation', 'detection', 'plot')
+__all__ = ('transform', 'animation', 'detection', 'plot', 'codec')
 
 
 def hstitch(images):
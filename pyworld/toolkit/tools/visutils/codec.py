@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Created on 17-10-2026 13:02:51
+
+    Lossless frame codecs for compact storage of episodes and datasets. Frames are encoded one at a time to bytes,
+    batches are encoded/decoded by a pool of threads (cv2 and zlib release the GIL).
+
+    Example:
+        codec = Delta(states.shape[1:], states.dtype, keyframe=32)
+        blobs = codec.encode(states)
+        states = codec.decode(blobs)
+"""
+__author__ = "Benedict Wilkins"
+__email__ = "benrjw@gmail.com"
+__status__ = "Development"
+
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+class Codec:
+
+    '''
+        Encodes frames of a fixed shape and dtype to bytes.
+    '''
+
+    def __init__(self, shape, dtype, workers=4):
+        """
+        Args:
+            shape (tuple): shape of a frame.
+            dtype (numpy.dtype): dtype of a frame.
+            workers (int, optional): number of threads used to encode/decode batches. Defaults to 4.
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.workers = workers
+
+    def encode_frame(self, frame):
+        raise NotImplementedError()
+
+    def decode_frame(self, blob, out):
+        raise NotImplementedError()
+
+    def _map(self, fn, *args):
+        if self.workers is None or self.workers <= 1 or len(args[0]) <= 1:
+            return list(map(fn, *args))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(fn, *args))
+
+    def encode(self, frames):
+        """ Encode a batch of frames.
+
+        Args:
+            frames (numpy.ndarray): frames (N, *shape)
+
+        Returns:
+            list: bytes for each frame.
+        """
+        frames = np.asarray(frames, dtype=self.dtype)
+        return self._map(self.encode_frame, frames)
+
+    def decode(self, blobs):
+        """ Decode a batch of frames.
+
+        Args:
+            blobs (list): bytes for each frame.
+
+        Returns:
+            numpy.ndarray: frames (N, *shape)
+        """
+        out = np.empty((len(blobs), *self.shape), dtype=self.dtype)
+        self._map(self.decode_frame, blobs, out)
+        return out
+
+class PNG(Codec):
+
+    '''
+        Lossless PNG (see visutils.transform.to_bytes) of each frame, frames must be uint8 or uint16. CHW frames
+        are encoded as HWC images, any other shape as a 2D image (rows of the last axis).
+    '''
+
+    def __init__(self, shape, dtype, workers=4, level=3):
+        super(PNG, self).__init__(shape, dtype, workers=workers)
+        if self.dtype not in (np.uint8, np.uint16):
+            raise ValueError("PNG frames must be uint8 or uint16, not {0}".format(self.dtype))
+        self.chw = len(self.shape) == 3 and self.shape[0] in (1,3,4) and self.shape[2] not in (1,3,4)
+        self.params = [cv2.IMWRITE_PNG_COMPRESSION, level]
+
+    def __image(self, frame):
+        if self.chw:
+            return frame.transpose((1,2,0))
+        if len(self.shape) == 3 and self.shape[2] in (1,3,4):
+            return frame
+        return frame.reshape(-1, self.shape[-1] if len(self.shape) > 1 else 1)
+
+    def encode_frame(self, frame):
+        success, blob = cv2.imencode('.png', self.__image(frame), self.params)
+        if not success:
+            raise ValueError("failed to encode frame of shape {0}".format(frame.shape))
+        return blob.tobytes()
+
+    def decode_frame(self, blob, out):
+        image = cv2.imdecode(np.frombuffer(blob, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        self.__image(out)[...] = image.reshape(self.__image(out).shape)
+
+class Delta(Codec):
+
+    '''
+        Each frame is XOR-ed with the previous frame and compressed with zlib, frames that change little (a static
+        background) give long runs of zeros. Every keyframe-th frame is encoded without a delta, batches are
+        decoded in parallel one keyframe segment at a time. Any dtype is supported. The deltas depend on the
+        order of the batch, blobs must be decoded in the batch that they were encoded in.
+    '''
+
+    def __init__(self, shape, dtype, workers=4, keyframe=32, level=1):
+        super(Delta, self).__init__(shape, dtype, workers=workers)
+        assert keyframe > 0
+        self.keyframe = keyframe
+        self.level = level
+        self.udtype = np.dtype('u{0}'.format(self.dtype.itemsize)) if self.dtype.itemsize in (1,2,4,8) else np.dtype(np.uint8)
+
+    def __bits(self, frames):
+        return np.ascontiguousarray(frames).view(self.udtype)
+
+    def encode(self, frames):
+        frames = self.__bits(np.asarray(frames, dtype=self.dtype))
+        deltas = frames.copy()
+        deltas[1:] ^= frames[:-1]
+        deltas[::self.keyframe] = frames[::self.keyframe]
+        return self._map(self.encode_frame, deltas)
+
+    def encode_frame(self, delta):
+        return zlib.compress(delta.tobytes(), self.level)
+
+    def decode(self, blobs):
+        out = np.empty((len(blobs), *self.shape), dtype=self.dtype)
+        bits = out.view(self.udtype)
+        segments = [slice(i, i + self.keyframe) for i in range(0, len(blobs), self.keyframe)]
+        def decode_segment(segment):
+            for blob, delta in zip(blobs[segment], bits[segment]):
+                delta.reshape(-1)[...] = np.frombuffer(zlib.decompress(blob), dtype=self.udtype)
+            np.bitwise_xor.accumulate(bits[segment], axis=0, out=bits[segment])
+        self._map(decode_segment, segments)
+        return out
+
+class PackBits(Codec):
+
+    '''
+        Binary frames (e.g. ObservationWrapper binary mode) are packed to 1 bit per value with numpy.packbits and
+        compressed with zlib. Non-zero values are decoded as high.
+    '''
+
+    def __init__(self, shape, dtype, workers=4, high=1, level=1):
+        super(PackBits, self).__init__(shape, dtype, workers=workers)
+        self.high = np.asarray(high, dtype=self.dtype)
+        self.level = level
+        self.size = int(np.prod(self.shape))
+
+    def encode_frame(self, frame):
+        return zlib.compress(np.packbits(frame.reshape(-1) != 0).tobytes(), self.level)
+
+    def decode_frame(self, blob, out):
+        bits = np.unpackbits(np.frombuffer(zlib.decompress(blob), dtype=np.uint8), count=self.size)
+        np.multiply(bits.reshape(self.shape), self.high, out=out, casting='unsafe')
+
+codecs = {'png':PNG, 'delta':Delta, 'packbits':PackBits}
+
+def codec(name, shape, dtype, **kwargs):
+    """ Create a codec by name.
+
+    Args:
+        name (str): one of 'png', 'delta', 'packbits'
+        shape (tuple): shape of a frame.
+        dtype (numpy.dtype): dtype of a frame.
+
+    Returns:
+        Codec: the codec
+    """
+    if name not in codecs:
+        raise ValueError("Invalid codec: {0}, must be one of {1}".format(name, tuple(codecs.keys())))
+    return codecs[name](shape, dtype, **kwargs)
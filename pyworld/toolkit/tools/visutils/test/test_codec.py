@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from pyworld.toolkit.tools.visutils import codec
+
+
+def frames(n=40):
+    x = np.zeros((n,1,32,32), dtype=np.uint8)
+    x[:, :, 8:24, 8:24] = 100 # static background
+    for i in range(n):
+        x[i, :, i % 28:i % 28 + 4, 2:6] = 255
+    return x
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_png(self):
+        x = frames()
+        c = codec.codec('png', x.shape[1:], x.dtype)
+        blobs = c.encode(x)
+        self.assertEqual(len(blobs), len(x))
+        self.assertTrue(np.array_equal(c.decode(blobs), x))
+        x = np.random.randint(0, 255, size=(3,16,16,3)).astype(np.uint8) # HWC
+        c = codec.PNG(x.shape[1:], x.dtype)
+        self.assertTrue(np.array_equal(c.decode(c.encode(x)), x))
+
+    def test_delta(self):
+        x = frames()
+        c = codec.Delta(x.shape[1:], x.dtype, keyframe=8)
+        blobs = c.encode(x)
+        self.assertLess(sum(len(b) for b in blobs) * 20, x.nbytes)
+        self.assertTrue(np.array_equal(c.decode(blobs), x))
+        x = np.random.rand(10,3,5).astype(np.float32)
+        c = codec.Delta(x.shape[1:], x.dtype, keyframe=3, workers=1)
+        self.assertTrue(np.array_equal(c.decode(c.encode(x)), x))
+
+    def test_packbits(self):
+        x = (frames() > 150).astype(np.float32)
+        c = codec.PackBits(x.shape[1:], x.dtype, high=1.)
+        blobs = c.encode(x)
+        self.assertLess(sum(len(b) for b in blobs) * 32, x.nbytes)
+        self.assertTrue(np.array_equal(c.decode(blobs), x))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            codec.PNG((2,2), np.float32)
+        with self.assertRaises(ValueError):
+            codec.codec('jpg', (2,2), np.uint8)
+
+
+if __name__ == "__main__":
+    unittest.main()